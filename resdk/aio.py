@@ -0,0 +1,519 @@
+""".. Ignore pydocstyle D400.
+
+=============
+Async Resolwe
+=============
+
+Asynchronous client of the Resolwe server built on `aiohttp`_.
+
+The client requires Python 3.5 or newer and aiohttp, install it with
+``pip install resdk[async]``.
+
+.. autoclass:: resdk.aio.AsyncResolwe
+   :members:
+
+.. autoclass:: resdk.aio.AsyncResolweQuery
+   :members:
+
+.. _aiohttp: https://aiohttp.readthedocs.io
+
+"""
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import asyncio
+import logging
+import math
+import os
+import uuid
+from urllib.parse import urljoin
+
+from .constants import ASYNC_MAX_CONCURRENCY, CHUNK_SIZE, UPLOAD_INFLIGHT_CHUNKS
+from .exceptions import ResolweServerError
+from .resolwe import Resolwe
+from .transfer import Downloader, MultipartChunk, Uploader, replace_file, upload_chunk_size
+
+try:
+    import aiohttp
+except ImportError:
+    raise ImportError("`resdk.aio` requires aiohttp, install it with `pip install resdk[async]`.")
+
+
+def query_params(filters):
+    """Convert filters to query parameters accepted by aiohttp.
+
+    Lists of values are converted to repeated parameters, as they are
+    by requests in the synchronous client.
+
+    """
+    params = []
+    for key, value in sorted(filters.items()):
+        for element in value if isinstance(value, (list, tuple)) else [value]:
+            params.append((key, str(element)))
+    return params
+
+
+class BodyStream(object):
+    """Asynchronous iterator over blocks of a request body.
+
+    Body is streamed to the server in blocks, so it is not copied into
+    a single bytes object.
+
+    :param body: request body
+    :type body: ~resdk.transfer.MultipartChunk
+
+    """
+
+    def __init__(self, body):
+        """Initialize attributes."""
+        self.body = body
+
+    def __aiter__(self):
+        """Return the iterator."""
+        return self
+
+    async def __anext__(self):
+        """Return next block of the body."""
+        block = self.body.read(CHUNK_SIZE)
+        if not block:
+            raise StopAsyncIteration  # pylint: disable=undefined-variable
+        return block
+
+
+class AsyncResolweQuery(object):
+    """Query resource endpoints asynchronously.
+
+    Queries are composed in the same way as with
+    :class:`~resdk.ResolweQuery`, but objects are retrieved with
+    awaitable methods:
+
+    .. code-block:: python
+
+        data = await res.data.get(42)
+        data_list = await res.data.filter(status='OK').only('name').fetch()
+        count = await res.data.filter(status='ER').count()
+
+    Returned objects are regular resources (i.e. :class:`~resdk.resources.Data`)
+    bound to the synchronous Resolwe instance of the client.
+
+    :param client: asynchronous Resolwe client
+    :type client: AsyncResolwe
+    :param query: synchronous query used to compose filters and create
+        resources
+    :type query: ~resdk.ResolweQuery
+
+    """
+
+    def __init__(self, client, query):
+        """Initialize attributes."""
+        self.client = client
+        self.query = query
+
+    def __repr__(self):
+        """Return string representation of the current object."""
+        return 'AsyncResolweQuery <resource: {}>'.format(self.query.resource.__name__)
+
+    def _wrap(self, query):
+        """Return asynchronous query wrapping the given one."""
+        return AsyncResolweQuery(self.client, query)
+
+    def all(self):
+        """Return copy of the current query."""
+        return self._wrap(self.query.all())
+
+    def filter(self, **filters):
+        """Return clone of current query with added given filters."""
+        return self._wrap(self.query.filter(**filters))
+
+    def only(self, *fields):
+        """Return clone of current query that loads only given fields."""
+        return self._wrap(self.query.only(*fields))
+
+    def defer(self, *fields):
+        """Return clone of current query that does not load given fields."""
+        return self._wrap(self.query.defer(*fields))
+
+    def compact(self):
+        """Return clone of current query that returns compact records."""
+        return self._wrap(self.query.compact())
+
+    async def _request(self, filters):
+        """Make request to the server with given filters.
+
+        :return: list of objects' data and total number of objects
+            (``None`` if response is not paginated)
+
+        """
+        path = '/api/{}'.format(self.query.endpoint.replace('.', '/'))
+        if self.query.resource.query_method == 'GET':
+            items = await self.client.request('GET', path, params=filters)
+        elif self.query.resource.query_method == 'POST':
+            items = await self.client.request('POST', path, json=filters)
+        else:
+            raise NotImplementedError(
+                'Unsupported query_method: {}'.format(self.query.resource.query_method))
+
+        # Extract data from paginated response
+        if isinstance(items, dict) and 'results' in items:
+            return items['results'], items['count']
+
+        return items, None
+
+    async def fetch(self):
+        """Return list of objects in current query.
+
+        Objects are cached, so awaiting it again makes no requests.
+
+        """
+        # pylint: disable=protected-access
+        query = self.query
+        if query._cache is None:
+            items, count = await self._request(query._compose_filters())
+            if count is not None:
+                query._count = count
+            query._cache = [query._populate_resource(data) for data in items]
+
+        return list(query._cache)
+
+    async def count(self):
+        """Return number of objects in current query.
+
+        Only the number of objects is requested from the server.
+
+        """
+        # pylint: disable=protected-access
+        query = self.query
+        if query._count is None:
+            if query._cache is not None and query._limit is None and not query._offset:
+                return len(query._cache)
+
+            items, count = await self._request(query._count_filters())
+            query._count = len(items) if count is None else count
+
+        return query._limit_count(query._count)
+
+    async def exists(self):
+        """Return ``True`` if current query contains any objects."""
+        if self.query._cache is not None:  # pylint: disable=protected-access
+            return bool(self.query._cache)  # pylint: disable=protected-access
+
+        return await self.count() > 0
+
+    async def get(self, *args, **kwargs):
+        """Get object that matches given parameters.
+
+        Arguments are the same as of :meth:`resdk.ResolweQuery.get`.
+
+        :raises LookupError: if none or more than one objects are
+            returned
+
+        """
+        query = self._wrap(self.query._get_query(args, kwargs))  # pylint: disable=protected-access
+        return self.query._single(await query.fetch())  # pylint: disable=protected-access
+
+
+class AsyncResolwe(object):
+    """Asynchronous client of the Resolwe server.
+
+    All requests are made through a single :class:`aiohttp.ClientSession`
+    and at most ``max_concurrency`` of them are in flight at the same
+    time, so many requests can be awaited concurrently (for example
+    with :func:`asyncio.gather`) without overloading the server:
+
+    .. code-block:: python
+
+        async with AsyncResolwe('username', 'password', 'https://app.genialis.com') as res:
+            data_list = await res.data.filter(status='PR').fetch()
+            await asyncio.gather(*[res.update(data) for data in data_list])
+
+    User is logged in with a synchronous :class:`~resdk.Resolwe` instance
+    (available as ``resolwe`` attribute), which is also used to create
+    returned resources, so their synchronous methods work as usual.
+
+    :param str username: user's username
+    :param str password: user's password
+    :param str url: Resolwe server instance
+    :param int max_concurrency: maximal number of concurrent requests
+    :param int max_inflight_chunks: maximal number of chunks of uploaded
+        files that are read and uploaded concurrently
+    :param resolwe: synchronous Resolwe instance used instead of logging
+        in again
+    :type resolwe: ~resdk.Resolwe
+
+    """
+
+    def __init__(self, username=None, password=None, url=None,
+                 max_concurrency=ASYNC_MAX_CONCURRENCY, resolwe=None,
+                 max_inflight_chunks=UPLOAD_INFLIGHT_CHUNKS):
+        """Initialize attributes."""
+        if resolwe is None:
+            resolwe = Resolwe(username, password, url)
+
+        self.resolwe = resolwe
+        self.url = resolwe.url
+        self.max_concurrency = max_concurrency
+        self.max_inflight_chunks = max_inflight_chunks
+
+        #: HTTP session, created when the first request is made
+        self.session = None
+        self._semaphore = None
+        self._upload_semaphore = None
+
+        self.data = AsyncResolweQuery(self, resolwe.data)
+        self.collection = AsyncResolweQuery(self, resolwe.collection)
+        self.sample = AsyncResolweQuery(self, resolwe.sample)
+        self.relation = AsyncResolweQuery(self, resolwe.relation)
+        self.process = AsyncResolweQuery(self, resolwe.process)
+        self.descriptor_schema = AsyncResolweQuery(self, resolwe.descriptor_schema)
+        self.user = AsyncResolweQuery(self, resolwe.user)
+        self.group = AsyncResolweQuery(self, resolwe.group)
+        self.feature = AsyncResolweQuery(self, resolwe.feature)
+        self.mapping = AsyncResolweQuery(self, resolwe.mapping)
+
+        self.logger = logging.getLogger(__name__)
+
+    def __repr__(self):
+        """Return string representation of the current object."""
+        return "AsyncResolwe <url: {}>".format(self.url)
+
+    async def __aenter__(self):
+        """Open the session."""
+        await self.open()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        """Close the session."""
+        await self.close()
+
+    def _headers(self):
+        """Return authentication headers of the logged in user."""
+        auth = self.resolwe.auth
+        headers = {'referer': self.url}
+        if auth.sessionid and auth.csrftoken:
+            headers['Cookie'] = 'csrftoken={}; sessionid={}'.format(
+                auth.csrftoken, auth.sessionid)
+            headers['X-CSRFToken'] = auth.csrftoken
+
+        return headers
+
+    async def open(self):
+        """Open HTTP session, if it is not opened yet."""
+        if self.session is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._upload_semaphore = asyncio.Semaphore(self.max_inflight_chunks)
+            self.session = aiohttp.ClientSession(
+                headers=self._headers(),
+                connector=aiohttp.TCPConnector(limit=self.max_concurrency),
+            )
+
+    async def close(self):
+        """Close HTTP session."""
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    async def request(self, method, path, params=None, **kwargs):
+        """Make request to the server.
+
+        :param str method: HTTP method
+        :param str path: path of the url on the server
+        :param dict params: query parameters, lists of values are sent
+            as repeated parameters
+
+        Other arguments are passed to :meth:`aiohttp.ClientSession.request`.
+
+        :return: decoded JSON response (``None`` if it is empty)
+
+        :raises ~resdk.exceptions.ResolweServerError: if the server
+            returns an error
+
+        """
+        await self.open()
+        if params is not None:
+            kwargs['params'] = query_params(params)
+
+        async with self._semaphore:
+            async with self.session.request(method, urljoin(self.url, path), **kwargs) as response:
+                content = await response.read()
+                if response.status >= 400:
+                    raise ResolweServerError(content)
+
+                return await response.json(content_type=None) if content else None
+
+    async def update(self, resource):
+        """Update resource fields from the server.
+
+        Contrary to ``resource.update()``, lazy loaded related objects
+        of the resource (i.e. ``Data.sample``) are kept.
+
+        :return: the updated resource
+
+        """
+        path = '/api/{}/{}'.format(resource.endpoint.replace('.', '/'), resource.id)
+        # pylint: disable=protected-access
+        resource._update_fields(await self.request('GET', path))
+        return resource
+
+    @staticmethod
+    def _read_chunk(file_path, offset, size):
+        """Read chunk of the file."""
+        with open(file_path, 'rb') as file_:
+            file_.seek(offset)
+            return file_.read(size)
+
+    async def _post_chunk(self, upload, chunk_number):
+        """Upload a single chunk.
+
+        Chunk is read from the file in a thread, so the event loop is
+        not blocked, and it is streamed to the server. At most
+        ``max_inflight_chunks`` chunks are held in memory at once.
+
+        :return: response of the server or ``None`` if upload failed
+            in all attempts
+
+        """
+        chunk_size = upload['chunk_size']
+
+        async with self._upload_semaphore:
+            chunk = await asyncio.get_event_loop().run_in_executor(
+                None, self._read_chunk, upload['file_path'], chunk_number * chunk_size,
+                chunk_size)
+
+            fields = {
+                '_chunkSize': chunk_size,
+                '_totalSize': upload['file_size'],
+                '_chunkNumber': chunk_number,
+                '_currentChunkSize': len(chunk),
+            }
+
+            for _ in range(Uploader.retries):
+                body = MultipartChunk(fields, upload['base_name'], chunk)
+                headers = {
+                    'Content-Type': body.content_type,
+                    'Content-Length': str(len(body)),
+                    'Session-Id': upload['session_id'],
+                    'X-File-Uid': upload['file_uid'],
+                }
+
+                try:
+                    async with self._semaphore:
+                        async with self.session.post(urljoin(self.url, 'upload/'),
+                                                     data=BodyStream(body),
+                                                     headers=headers) as response:
+                            if response.status in [200, 201]:
+                                return await response.json(content_type=None)
+                            error = response.status
+                except aiohttp.ClientError as client_error:
+                    error = client_error
+                finally:
+                    body.close()
+
+                self.logger.warning(
+                    "Chunk upload failed (error %s): repeating for chunk number %s",
+                    error, chunk_number)
+
+        return None
+
+    async def upload_file(self, file_path, chunk_size=None):
+        """Upload a single file on the platform.
+
+        File is uploaded in chunks, up to ``max_inflight_chunks`` of
+        them concurrently (within the limit of concurrent requests).
+        If upload of a chunk fails, uploads of other chunks are
+        cancelled.
+
+        :param str file_path: File path
+        :param int chunk_size: size of chunks, by default it is adapted to
+            the size of the file
+
+        :return: name of the uploaded file on the server or ``None``
+            if upload failed
+
+        """
+        await self.open()
+
+        file_size = os.path.getsize(file_path)
+        chunk_size = chunk_size or upload_chunk_size(file_size)
+        chunks_count = max(1, int(math.ceil(file_size / chunk_size)))
+        upload = {
+            'file_path': file_path,
+            'base_name': os.path.basename(file_path),
+            'file_size': file_size,
+            'chunk_size': chunk_size,
+            'session_id': str(uuid.uuid4()),
+            'file_uid': str(uuid.uuid4()),
+        }
+
+        # Server completes the upload when the last chunk is received,
+        # so it is uploaded after all the others.
+        tasks = [
+            asyncio.ensure_future(self._post_chunk(upload, chunk_number))
+            for chunk_number in range(chunks_count - 1)
+        ]
+        try:
+            for task in asyncio.as_completed(tasks):
+                if await task is None:
+                    return None
+        finally:
+            # Stop uploading other chunks if one of them failed
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        response = await self._post_chunk(upload, chunks_count - 1)
+        if response is None:
+            return None
+
+        return response['files'][0]['temp']
+
+    async def _download_file(self, file_uri, downloader):
+        """Download a single file.
+
+        File is downloaded to a temporary ``.part`` file, which is
+        renamed when the download is complete.
+
+        """
+        local_path = downloader._get_local_path(file_uri)  # pylint: disable=protected-access
+        local_file = os.path.join(downloader.download_dir, local_path)
+        part_file = '{}.part'.format(local_file)
+        file_url = urljoin(self.url, 'data/{}'.format(file_uri))
+
+        loop = asyncio.get_event_loop()
+        async with self._semaphore:
+            async with self.session.get(file_url) as response:
+                if response.status >= 400:
+                    raise ResolweServerError(await response.read())
+
+                self.logger.info("* %s", local_path)
+                # Write to the file in a thread, so the event loop is not blocked
+                file_handle = await loop.run_in_executor(None, open, part_file, 'wb')
+                try:
+                    async for chunk in response.content.iter_chunked(CHUNK_SIZE):
+                        await loop.run_in_executor(None, file_handle.write, chunk)
+                finally:
+                    await loop.run_in_executor(None, file_handle.close)
+
+        replace_file(part_file, local_file)
+
+    async def download_files(self, files, download_dir=None):
+        """Download files concurrently.
+
+        Download files from the Resolwe server to the download
+        directory (defaults to the current working directory).
+
+        :param files: files to download
+        :type files: list of file URI
+        :param download_dir: download directory
+        :type download_dir: string
+
+        """
+        await self.open()
+
+        # pylint: disable=protected-access
+        download_dir = self.resolwe._get_download_dir(download_dir)
+        if not files:
+            self.logger.info("No files to download.")
+            return
+
+        self.logger.info("Downloading files to %s:", download_dir)
+        downloader = Downloader(self.resolwe, download_dir)
+        await asyncio.gather(*[self._download_file(file_uri, downloader) for file_uri in files])
@@ -1,6 +1,7 @@
 """Alignment analysis."""
 from __future__ import absolute_import, division, print_function, unicode_literals
 
+from resdk.analysis.utils import run_per_sample
 from resdk.resources.utils import get_data_id, get_samples
 
 __all__ = ('bowtie2', 'hisat2')
@@ -8,7 +9,7 @@ __all__ = ('bowtie2', 'hisat2')
 
 def bowtie2(resource, genome, mode=None, speed=None, use_se=None, discordantly=None, rep_se=None,
             minins=None, maxins=None, trim_5=None, trim_3=None, trim_iter=None, trim_nucl=None,
-            rep_mode=None, k_reports=None):
+            rep_mode=None, k_reports=None, max_workers=1, progress=None):
     """Run bowtie2 aligner on given resource.
 
     Align reads files of given resource to the given genome using the
@@ -41,6 +42,9 @@ def bowtie2(resource, genome, mode=None, speed=None, use_se=None, discordantly=N
         is def
     :param int k_reports: number of reports (for -k mode only), default
         is 5
+    :param int max_workers: number of samples processed concurrently
+    :param progress: function called with each sample and the list of
+        its data objects (or the error) when the sample is processed
 
     """
     inputs = {'genome': get_data_id(genome)}
@@ -84,24 +88,22 @@ def bowtie2(resource, genome, mode=None, speed=None, use_se=None, discordantly=N
     if k_reports is not None:
         inputs['k_reports'] = k_reports
 
-    results = []
-
     if not isinstance(resource, list):
         resource = [resource]
 
-    for single_resource in resource:
-
-        for sample in get_samples(single_resource):
-            inputs['reads'] = sample.get_reads().id
+    samples = [sample for single_resource in resource for sample in get_samples(single_resource)]
 
-            aligned = sample.resolwe.get_or_run(slug='alignment-bowtie2', input=inputs)
-            sample.add_data(aligned)
-            results.append(aligned)
+    def get_specs(sample):
+        """Return specs of processes to run on the sample."""
+        return [{
+            'slug': 'alignment-bowtie2',
+            'input': dict(inputs, reads=sample.get_reads().id),
+        }]
 
-    return results
+    return run_per_sample(get_specs, samples, max_workers, progress)
 
 
-def hisat2(resource, genome):
+def hisat2(resource, genome, max_workers=1, progress=None):
     """Run hisat2 aligner on given resource.
 
     Align reads files of given resource to the given genome using the
@@ -114,23 +116,23 @@ def hisat2(resource, genome):
     :param resource: resource of which reads will be aligned
     :param genome: data object with genome that will be used
     :type genome: `~resdk.resources.data.Data`
+    :param int max_workers: number of samples processed concurrently
+    :param progress: function called with each sample and the list of
+        its data objects (or the error) when the sample is processed
 
     """
-    results = []
-
     if not isinstance(resource, list):
         resource = [resource]
 
-    for single_resource in resource:
+    samples = [sample for single_resource in resource for sample in get_samples(single_resource)]
 
-        for sample in get_samples(single_resource):
-            inputs = {
-                'reads': sample.get_reads().id,
-                'genome': get_data_id(genome),
-            }
+    def get_specs(sample):
+        """Return specs of processes to run on the sample."""
+        inputs = {
+            'reads': sample.get_reads().id,
+            'genome': get_data_id(genome),
+        }
 
-            aligned = sample.resolwe.get_or_run(slug='alignment-hisat2', input=inputs)
-            sample.add_data(aligned)
-            results.append(aligned)
+        return [{'slug': 'alignment-hisat2', 'input': inputs}]
 
-    return results
+    return run_per_sample(get_specs, samples, max_workers, progress)
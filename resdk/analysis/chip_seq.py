@@ -1,14 +1,46 @@
 """Chip Seq analysis."""
 from __future__ import absolute_import, division, print_function, unicode_literals
 
+from resdk.analysis.utils import map_samples, run_per_sample
+from resdk.resources.relation import RelationIndex
 from resdk.resources.utils import (
-    get_data_id, get_resource_collection, get_samples, is_background, is_sample,
+    get_data_id, get_resolwe, get_resource_collection, get_samples, is_background, is_sample,
 )
 
 __all__ = ('bamsplit', 'macs', 'rose2')
 
 
-def bamsplit(resource, header=None, header2=None):
+def _samples_with_background_options(resources, use_background):
+    """Return samples of resources and options of their background lookup.
+
+    Options are given for each sample (in the order of samples) as an
+    index of relations of the sample's collection (``None`` if the
+    collection is unknown) and a flag telling if the sample should be
+    skipped if it is a background itself. Sample that is in several
+    resources is returned once for each of them, with its own options.
+    Relations of each collection are fetched with a single query.
+    """
+    samples = []
+    options = []
+    for resource in resources:
+        resource_samples = list(get_samples(resource, prefetch=True))
+
+        relation_index = None
+        if use_background and resource_samples:
+            collection_id = get_resource_collection(resource)
+            if collection_id:
+                relation_index = RelationIndex.for_collection(
+                    get_resolwe(*resource_samples), collection_id, resource_samples
+                )
+
+        for sample in resource_samples:
+            samples.append(sample)
+            options.append((relation_index, not is_sample(resource)))
+
+    return samples, options
+
+
+def bamsplit(resource, header=None, header2=None, max_workers=1, progress=None):
     """Run ``Bam split`` process on the resource.
 
     This method runs `Bam split`_ process on the resource. The process
@@ -25,6 +57,9 @@ def bamsplit(resource, header=None, header2=None):
     :type header: `~resdk.resources.data.Data`
     :param header2: SAM header data object for the secodary BAM
     :type header: `~resdk.resources.data.Data`
+    :param int max_workers: number of samples processed concurrently
+    :param progress: function called with each sample and its data
+        object (or the error) when the sample is processed
 
     """
     inputs = {}
@@ -35,23 +70,23 @@ def bamsplit(resource, header=None, header2=None):
     if header2:
         inputs['header2'] = header2
 
-    results = []
-
     if not isinstance(resource, list):
         resource = [resource]
 
-    for single_resource in resource:
-        for sample in get_samples(single_resource):
-            inputs['bam'] = sample.get_bam().id
-            primary_bam = sample.resolwe.run(
-                slug='bam-split', input=inputs, collections=sample.collections
-            )
-            results.append(primary_bam)
+    samples = [sample for single_resource in resource for sample in get_samples(single_resource)]
+
+    def run_bamsplit(sample):
+        """Run process on the sample."""
+        return sample.resolwe.run(
+            slug='bam-split',
+            input=dict(inputs, bam=sample.get_bam().id),
+            collections=sample.collections,
+        )
 
-    return results
+    return map_samples(run_bamsplit, samples, max_workers, progress)
 
 
-def macs(resource, use_background=True, p_value=None):
+def macs(resource, use_background=True, p_value=None, max_workers=1, progress=None):
     """Run ``MACS 1.4`` process on the resource.
 
     This method runs `MACS 1.4`_ process with ``p-value`` specified in
@@ -66,45 +101,41 @@ def macs(resource, use_background=True, p_value=None):
     :param bool use_background: if set to ``True``, background sample
         will be used in the process
     :param float p_value: p-value used in the process
+    :param int max_workers: number of samples processed concurrently
+    :param progress: function called with each sample and the list of
+        its data objects (or the error) when the sample is processed
 
     """
     inputs = {}
     if p_value is not None:
         inputs['pvalue'] = p_value
 
-    results = []
-
     if not isinstance(resource, list):
         resource = [resource]
 
-    for single_resource in resource:
+    samples, options = _samples_with_background_options(resource, use_background)
 
-        background_filter = {}
-        if use_background:
-            collection_id = get_resource_collection(single_resource)
-            if collection_id:
-                background_filter['collection'] = collection_id
-
-        for sample in get_samples(single_resource):
-            inputs['treatment'] = sample.get_primary_bam(fallback_to_bam=True).id
+    def get_specs(sample, relation_index, skip_background):
+        """Return specs of processes to run on the sample."""
+        sample_inputs = dict(inputs)
+        sample_inputs['treatment'] = sample.get_primary_bam(fallback_to_bam=True).id
 
-            if use_background:
-                if is_background(sample) and not is_sample(single_resource):
-                    # Don't run process on the background sample,
-                    # but let it fail if it is run directly on sample
-                    continue
+        if use_background:
+            if skip_background and is_background(sample, relation_index):
+                # Don't run process on the background sample,
+                # but let it fail if it is run directly on sample
+                return []
 
-                background = sample.get_background(**background_filter)
-                inputs['control'] = background.get_primary_bam(fallback_to_bam=True).id
+            background = sample.get_background(relation_index=relation_index)
+            sample_inputs['control'] = background.get_primary_bam(fallback_to_bam=True).id
 
-            macs_obj = sample.resolwe.get_or_run(slug='macs14', input=inputs)
-            sample.add_data(macs_obj)
-            results.append(macs_obj)
+        return [{'slug': 'macs14', 'input': sample_inputs}]
 
-    return results
+    return run_per_sample(get_specs, samples, max_workers, progress, sample_args=options)
 
 
-def rose2(resource, use_background=True, genome='HG19', tss=None, stitch=None, beds=None):
+def rose2(resource, use_background=True, genome='HG19', tss=None, stitch=None, beds=None,
+          max_workers=1, progress=None):
     """Run ``ROSE 2`` process on the resource.
 
     This method runs `ROSE2`_ process with ``tss_exclusion`` and
@@ -129,62 +160,54 @@ def rose2(resource, use_background=True, genome='HG19', tss=None, stitch=None, b
     :param int stitch: Stitch used in process
     :param list beds: subset of bed files to run process on, if empty
         processes for all bed files will be run
+    :param int max_workers: number of samples processed concurrently
+    :param progress: function called with each sample and the list of
+        its data objects (or the error) when the sample is processed
 
     """
-    results = []
+    valid_genomes = ['HG18', 'HG19', 'MM8', 'MM9', 'MM10', 'RN4', 'RN6']
+    if genome not in valid_genomes:
+        raise KeyError('Invalid `genome`, please use one of the following: '
+                       '{}'. format(', '.join(valid_genomes)))
+
+    if beds is not None:
+        # Convert objects to the list of their ids
+        if isinstance(beds, list):
+            bed_filter = [get_data_id(bed) for bed in beds]
+        else:
+            bed_filter = [get_data_id(beds)]
 
     if not isinstance(resource, list):
         resource = [resource]
 
-    for single_resource in resource:
-
-        background_filter = {}
-        if use_background:
-            collection_id = get_resource_collection(single_resource)
-            if collection_id:
-                background_filter['collection'] = collection_id
-
-        for sample in get_samples(single_resource):
-            valid_genomes = ['HG18', 'HG19', 'MM8', 'MM9', 'MM10', 'RN4', 'RN6']
-            if genome not in valid_genomes:
-                raise KeyError('Invalid `genome`, please use one of the following: '
-                               '{}'. format(', '.join(valid_genomes)))
-
-            inputs = {
-                'genome': genome,
-                'rankby': sample.get_bam().id,
-            }
+    samples, options = _samples_with_background_options(resource, use_background)
 
-            if tss is not None:
-                inputs['tss'] = tss
+    def get_specs(sample, relation_index, skip_background):
+        """Return specs of processes to run on the sample."""
+        inputs = {
+            'genome': genome,
+            'rankby': sample.get_bam().id,
+        }
 
-            if stitch is not None:
-                inputs['stitch'] = stitch
+        if tss is not None:
+            inputs['tss'] = tss
 
-            if use_background:
-                if is_background(sample) and not is_sample(single_resource):
-                    # Don't run process on the background sample,
-                    # but let it fail if it is run directly on sample
-                    continue
+        if stitch is not None:
+            inputs['stitch'] = stitch
 
-                background = sample.get_background(**background_filter)
-                inputs['control'] = background.get_bam().id
-
-            bed_list = sample.get_macs()
-            if beds is not None:
-                # Convert objects to the list of their ids
-                if isinstance(beds, list):
-                    bed_filter = [get_data_id(bed) for bed in beds]
-                else:
-                    bed_filter = [get_data_id(beds)]
+        if use_background:
+            if skip_background and is_background(sample, relation_index):
+                # Don't run process on the background sample,
+                # but let it fail if it is run directly on sample
+                return []
 
-                bed_list = bed_list.filter(id__in=bed_filter)
+            background = sample.get_background(relation_index=relation_index)
+            inputs['control'] = background.get_bam().id
 
-            for bed in bed_list:
-                inputs['input'] = bed.id
+        bed_list = sample.get_macs()
+        if beds is not None:
+            bed_list = bed_list.filter(id__in=bed_filter)
 
-                rose = sample.resolwe.get_or_run(slug='rose2', input=inputs)
-                sample.add_data(rose)
-                results.append(rose)
+        return [{'slug': 'rose2', 'input': dict(inputs, input=bed.id)} for bed in bed_list]
 
-    return results
+    return run_per_sample(get_specs, samples, max_workers, progress, sample_args=options)
@@ -1,6 +1,7 @@
 """Differential expressions analysis."""
 from __future__ import absolute_import, division, print_function, unicode_literals
 
+from resdk.analysis.utils import map_samples
 from resdk.resources.utils import (
     get_data_id, get_resolwe, get_resource_collection, get_samples, is_collection, is_relation,
 )
@@ -9,7 +10,8 @@ __all__ = ('cuffdiff', )
 
 
 def cuffdiff(resource, annotation, genome=None, multi_read_correct=None, fdr=None,
-             library_type=None, library_normalization=None, dispersion_method=None):
+             library_type=None, library_normalization=None, dispersion_method=None,
+             max_workers=1, progress=None):
     """Run Cuffdiff_ for selected cuffquants.
 
     This method runs `Cuffdiff`_ process with ``annotation`` specified
@@ -42,6 +44,10 @@ def cuffdiff(resource, annotation, genome=None, multi_read_correct=None, fdr=Non
         quartile
     :param str dispersion_method: options are: pooled, per-condition,
         blind, poisson
+    :param int max_workers: number of samples processed concurrently
+    :param progress: function called with each sample in relations and
+        its ``cuffquant`` object (or the error) when the sample is
+        processed
 
     """
     inputs = {'annotation': get_data_id(annotation)}
@@ -87,6 +93,18 @@ def cuffdiff(resource, annotation, genome=None, multi_read_correct=None, fdr=Non
         **relation_filter
     )
 
+    # Find cuffquant objects of all samples in relations at once
+    relation_samples = []
+    for relation in relations:
+        for sample in relation.samples:
+            if sample.id in sample_ids and sample not in relation_samples:
+                relation_samples.append(sample)
+    cuffquants = dict(zip(
+        [sample.id for sample in relation_samples],
+        map_samples(lambda sample: get_data_id(sample.get_cuffquant()), relation_samples,
+                    max_workers, progress),
+    ))
+
     cuffdiff_objects = []
     for relation in relations:
         control = []
@@ -96,9 +114,9 @@ def cuffdiff(resource, annotation, genome=None, multi_read_correct=None, fdr=Non
                 continue
 
             if position == 'case':
-                case.append(get_data_id(sample.get_cuffquant()))
+                case.append(cuffquants[sample.id])
             elif position == 'control':
-                control.append(get_data_id(sample.get_cuffquant()))
+                control.append(cuffquants[sample.id])
             else:
                 raise ValueError(
                     "Position different from 'case' or 'control' was found in the "
@@ -1,6 +1,8 @@
 """Expressions analysis."""
 from __future__ import absolute_import, division, print_function, unicode_literals
 
+from resdk.analysis.utils import map_samples, run_per_sample
+from resdk.resources.relation import RelationIndex
 from resdk.resources.utils import (
     get_data_id, get_resolwe, get_resource_collection, get_samples, is_collection, is_relation,
 )
@@ -9,7 +11,8 @@ __all__ = ('cuffquant', 'cuffnorm')
 
 
 def cuffquant(resource, annotation, genome=None, mask_file=None,
-              library_type=None, multi_read_correct=None):
+              library_type=None, multi_read_correct=None, max_workers=1,
+              progress=None):
     """Run Cuffquant_ for selected cuffquats.
 
     This method runs `Cuffquant`_ process with ``annotation`` specified
@@ -30,10 +33,13 @@ def cuffquant(resource, annotation, genome=None, mask_file=None,
         fr-secondstrand
     :param bool multi_read_correct: do initial estimation procedure to
         more accurately weight reads with multiple genome mappings
+    :param int max_workers: number of samples processed concurrently
+    :param progress: function called with each sample and the list of
+        its data objects (or the error) when the sample is processed
 
     """
-    results = []
-    for sample in get_samples(resource):
+    def get_specs(sample):
+        """Return specs of processes to run on the sample."""
         inputs = {
             'alignment': sample.get_bam().id,
             'annotation': get_data_id(annotation),
@@ -51,14 +57,12 @@ def cuffquant(resource, annotation, genome=None, mask_file=None,
         if multi_read_correct is not None:
             inputs['multi_read_correct'] = multi_read_correct
 
-        cuffquant_obj = sample.resolwe.get_or_run(slug='cuffquant', input=inputs)
-        sample.add_data(cuffquant_obj)
-        results.append(cuffquant_obj)
+        return [{'slug': 'cuffquant', 'input': inputs}]
 
-    return results
+    return run_per_sample(get_specs, get_samples(resource), max_workers, progress)
 
 
-def cuffnorm(resource, annotation, use_ercc=None):
+def cuffnorm(resource, annotation, use_ercc=None, max_workers=1, progress=None):
     """Run Cuffnorm_ for selected cuffquats.
 
     This method runs `Cuffnorm`_ process on ``resource`` with
@@ -71,42 +75,51 @@ def cuffnorm(resource, annotation, use_ercc=None):
     :param annotation: annotation object used in cuffnorm
     :type annotation: `~resdk.resources.data.Data`
     :param bool use_ercc: use ERRCC spike-in controls for normalization
+    :param int max_workers: number of samples processed concurrently
+    :param progress: function called with each sample and the id of its
+        cuffquant object and replicates relation (or the error) when the
+        sample is processed
 
     """
-    relation_filter = {}
-    collection_id = get_resource_collection(resource)
-    if collection_id:
-        relation_filter['collection'] = collection_id
-
     samples = get_samples(resource)
 
     input_objects = [annotation]
     input_objects.extend(samples)
     resolwe = get_resolwe(*input_objects)
 
-    cuffquants = [get_data_id(sample.get_cuffquant()) for sample in samples]
+    # Fetch all relations of the collection at once
+    relation_index = None
+    collection_id = get_resource_collection(resource)
+    if collection_id:
+        relation_index = RelationIndex.for_collection(resolwe, collection_id, samples)
 
-    replicates = []
-    replicates_ids = {}
-    for sample in samples:
-        relations = resolwe.relation.filter(
-            type='group',
-            label='replicates',
-            entity=[sample.id],
-            **relation_filter
-        )
-
-        if len(relations) == 1:
-            relation = relations[0]
+    def get_replicates(sample):
+        """Return id of cuffquant object and replicates relation of the sample."""
+        if relation_index is not None:
+            relations = relation_index.filter(sample, type='group', label='replicates')
         else:
+            relations = resolwe.relation.filter(
+                type='group',
+                label='replicates',
+                entity=[sample.id],
+            )
+
+        if len(relations) != 1:
             raise LookupError(
                 "Cannot determine unique group relation with label `replicates` for the "
                 "following sample: {}".format(sample.name)
             )
 
-        if relation.id not in replicates_ids:
-            replicates_ids[relation.id] = str(len(replicates_ids))
-        replicates.append(replicates_ids[relation.id])
+        return get_data_id(sample.get_cuffquant()), relations[0].id
+
+    cuffquants = []
+    replicates = []
+    replicates_ids = {}
+    for cuffquant_id, relation_id in map_samples(get_replicates, samples, max_workers, progress):
+        cuffquants.append(cuffquant_id)
+        if relation_id not in replicates_ids:
+            replicates_ids[relation_id] = str(len(replicates_ids))
+        replicates.append(replicates_ids[relation_id])
 
     inputs = {
         'cuffquant': cuffquants,
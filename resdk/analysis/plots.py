@@ -3,6 +3,7 @@ from __future__ import absolute_import, division, print_function, unicode_litera
 
 from operator import xor
 
+from resdk.analysis.utils import map_samples
 from resdk.resources.utils import (
     get_data_id, get_resolwe, get_samples, is_collection, is_data, is_relation,
 )
@@ -12,7 +13,7 @@ __all__ = ('bamplot', )
 
 def bamplot(resource, genome, input_gff=None, input_region=None, stretch_input=None, color=None,
             sense=None, extension=None, rpm=None, yscale=None, names=None, plot=None, title=None,
-            scale=None, bed=None, multi_page=None):
+            scale=None, bed=None, multi_page=None, max_workers=1, progress=None):
     """Run ``bamplot`` on the resource.
 
     This method runs `bamplot`_ with bams, genome and gff or region
@@ -47,6 +48,9 @@ def bamplot(resource, genome, input_gff=None, input_region=None, stretch_input=N
         processes for all bed files will be run
     :param bool multi_page: if flagged will create a new pdf for each
         region
+    :param int max_workers: number of samples processed concurrently
+    :param progress: function called with each sample and its ``bam``
+        object (or the error) when the sample is processed
 
     """
     input_objects = []
@@ -61,7 +65,8 @@ def bamplot(resource, genome, input_gff=None, input_region=None, stretch_input=N
         raise KeyError('Invalid `genome`, please use one of the following: '
                        '{}'. format(', '.join(valid_genomes)))
 
-    bams = [sample.get_bam() for sample in get_samples(resource)]
+    bams = map_samples(lambda sample: sample.get_bam(), get_samples(resource), max_workers,
+                       progress)
     input_objects.extend(bams)
     bams = [get_data_id(bam) for bam in bams]
 
@@ -128,7 +133,8 @@ def bamplot(resource, genome, input_gff=None, input_region=None, stretch_input=N
 
 
 def bamliquidator(resource, cell_type=None, bin_size=None, regions=None, extension=None,
-                  sense=None, skip_plot=None, black_list=None, threads=None):
+                  sense=None, skip_plot=None, black_list=None, threads=None,
+                  max_workers=1, progress=None):
     """Run ``bamliquidator`` on the resource.
 
     This method runs `bamliquidator`_ with bams, where three different
@@ -154,6 +160,9 @@ def bamliquidator(resource, cell_type=None, bin_size=None, regions=None, extensi
         contain any of the following substrings `chrUn`, `_random`,
         `Zv9_` or `_hap`.
     :param int threads: Number of CPUs
+    :param int max_workers: number of samples processed concurrently
+    :param progress: function called with each sample and its ``bam``
+        object (or the error) when the sample is processed
 
     """
     if not xor(bin_size, regions):
@@ -164,7 +173,8 @@ def bamliquidator(resource, cell_type=None, bin_size=None, regions=None, extensi
 
     input_objects = []
 
-    bams = [sample.get_bam() for sample in get_samples(resource)]
+    bams = map_samples(lambda sample: sample.get_bam(), get_samples(resource), max_workers,
+                       progress)
     input_objects.extend(bams)
     bams = [get_data_id(bam) for bam in bams]
 
@@ -3,6 +3,8 @@ from __future__ import absolute_import, division, print_function, unicode_litera
 
 import time
 
+from resdk.analysis.utils import map_samples
+from resdk.resources.relation import RelationIndex
 from resdk.resources.utils import get_resolwe, get_resource_collection, get_samples, is_background
 
 __all__ = ('prepare_geo_chipseq', 'prepare_geo_rnaseq', 'prepare_geo')
@@ -32,7 +34,7 @@ def get_name_collection(collection_ids, res):
     return name, collection
 
 
-def prepare_geo_chipseq(resource, name=None):
+def prepare_geo_chipseq(resource, name=None, max_workers=1, progress=None):
     """Run ``Prepare GEO - ChIP-Seq`` process on the resource.
 
     This method can be used to run ``Prepare GEO - ChIP-Seq`` process
@@ -40,21 +42,29 @@ def prepare_geo_chipseq(resource, name=None):
 
     :param resource: resource on which prepare_geo_chipseq will be run
     :param str name: name of the prepare GEO tarball and table
+    :param int max_workers: number of samples processed concurrently
+    :param progress: function called with each sample and its inputs
+        (or the error) when the sample is processed
 
     """
-    reads = []
-    macs14 = []
-    relations = []
-
-    samples = get_samples(resource)
+    samples = get_samples(resource, prefetch=True)
     resolwe = get_resolwe(*samples)
-    collection_ids = set()
 
-    for sample in samples:
-        reads.append(sample.get_reads().id)
+    # Fetch all relations of the collection at once
+    relation_index = None
+    collection_id = get_resource_collection(resource)
+    if collection_id:
+        relation_index = RelationIndex.for_collection(resolwe, collection_id, samples)
 
-        if is_background(sample):
-            continue
+    def get_inputs(sample):
+        """Return inputs of the sample."""
+        inputs = {
+            'reads': sample.get_reads().id,
+            'collection': get_resource_collection(sample),
+        }
+
+        if is_background(sample, relation_index):
+            return inputs
 
         macs_list = sample.get_macs()
         if not macs_list:
@@ -66,9 +76,9 @@ def prepare_geo_chipseq(resource, name=None):
                 "Sample {} has more than one `macs14` data objects!".format(sample)
             )
 
-        macs14.append(macs_list[0].id)
+        inputs['macs14'] = macs_list[0].id
 
-        background = sample.get_background(fail_silently=True)
+        background = sample.get_background(fail_silently=True, relation_index=relation_index)
         if background:
             if background not in samples:
                 raise ValueError(
@@ -76,11 +86,21 @@ def prepare_geo_chipseq(resource, name=None):
                     "{}!".format(sample, resource)
                 )
 
-            relations.append(
-                ':'.join([sample.name, background.name])
-            )
+            inputs['relation'] = ':'.join([sample.name, background.name])
 
-        collection_ids.add(get_resource_collection(sample))
+        return inputs
+
+    reads = []
+    macs14 = []
+    relations = []
+    collection_ids = set()
+    for inputs in map_samples(get_inputs, samples, max_workers, progress):
+        reads.append(inputs['reads'])
+        if 'macs14' in inputs:
+            macs14.append(inputs['macs14'])
+            collection_ids.add(inputs['collection'])
+        if 'relation' in inputs:
+            relations.append(inputs['relation'])
 
     auto_name, collection = get_name_collection(collection_ids, resolwe)
 
@@ -98,7 +118,7 @@ def prepare_geo_chipseq(resource, name=None):
     return geo
 
 
-def prepare_geo_rnaseq(resource, name=None):
+def prepare_geo_rnaseq(resource, name=None, max_workers=1, progress=None):
     """Run ``Prepare GEO - RNA-Seq`` process on the resource.
 
     This method can be used to run ``Prepare GEO - RNA-Seq`` process
@@ -106,19 +126,30 @@ def prepare_geo_rnaseq(resource, name=None):
 
     :param resource: resource on which prepare_geo_rnaseq will be run
     :param str name: name of the prepare GEO tarball and table
+    :param int max_workers: number of samples processed concurrently
+    :param progress: function called with each sample and its inputs
+        (or the error) when the sample is processed
 
     """
+    samples = get_samples(resource, prefetch=True)
+    resolwe = get_resolwe(*samples)
+
+    def get_inputs(sample):
+        """Return inputs of the sample."""
+        return (
+            sample.get_reads().id,
+            sample.get_expression().id,
+            get_resource_collection(sample),
+        )
+
     reads = []
     expressions = []
-
-    samples = get_samples(resource)
-    resolwe = get_resolwe(*samples)
     collection_ids = set()
-
-    for sample in samples:
-        reads.append(sample.get_reads().id)
-        expressions.append(sample.get_expression().id)
-        collection_ids.add(get_resource_collection(sample))
+    for reads_id, expression_id, collection_id in map_samples(get_inputs, samples, max_workers,
+                                                               progress):
+        reads.append(reads_id)
+        expressions.append(expression_id)
+        collection_ids.add(collection_id)
 
     auto_name, collection = get_name_collection(collection_ids, resolwe)
 
@@ -135,13 +166,16 @@ def prepare_geo_rnaseq(resource, name=None):
     return geo
 
 
-def prepare_geo(resource, types=[], name=None):
+def prepare_geo(resource, types=[], name=None, max_workers=1, progress=None):
     """Run several prepare geo functions on a resource.
 
     :param list types: list of sequencing types of the samples in the
         resource. If none are given, the function is run on all types.
         Options are: ChIP-Seq, RNA-Seq
     :param str name: name of the prepare GEO tarball and table
+    :param int max_workers: number of samples processed concurrently
+    :param progress: function called with each sample and its inputs
+        (or the error) when the sample is processed
 
     """
     type_to_function = {
@@ -164,7 +198,7 @@ def prepare_geo(resource, types=[], name=None):
         types = type_to_function.keys()
 
     for seq_type in types:
-        result = type_to_function[seq_type.lower()](resource, name)
+        result = type_to_function[seq_type.lower()](resource, name, max_workers, progress)
         results.append(result)
 
     return results
@@ -0,0 +1,192 @@
+"""Utility functions for running analysis."""
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+from multiprocessing.pool import ThreadPool
+
+import six
+
+from resdk.exceptions import BatchError
+from resdk.resources.utils import get_resolwe
+
+
+def _imap_samples(func, samples, max_workers, sample_args=None):
+    """Call ``func`` on samples concurrently.
+
+    ``func`` is called with each sample and its arguments in
+    ``sample_args`` (if given). Yield indices of samples and results (or
+    errors) in the order in which samples are finished.
+    """
+    def call(item):
+        """Call ``func`` on the sample, return error if it fails."""
+        index, sample, args = item
+        try:
+            return index, func(sample, *args)
+        except Exception as error:  # pylint: disable=broad-except
+            return index, error
+
+    if sample_args is None:
+        sample_args = [()] * len(samples)
+    items = [(index, sample, tuple(args))
+             for index, (sample, args) in enumerate(zip(samples, sample_args))]
+
+    pool = None
+    if max_workers > 1 and len(samples) > 1:
+        pool = ThreadPool(min(max_workers, len(samples)))
+    try:
+        imap = pool.imap_unordered if pool is not None else six.moves.map
+        for item in imap(call, items):
+            yield item
+    finally:
+        if pool is not None:
+            pool.terminate()
+            pool.join()
+
+
+def _raise_errors(samples, errors, results):
+    """Raise errors of failed samples.
+
+    Error of a single failed sample is raised as it is, errors of
+    multiple samples are raised together in
+    :class:`~resdk.exceptions.BatchError`.
+
+    :param list samples: processed samples
+    :param dict errors: errors of failed samples by their indices
+    :param list results: results of successful samples
+
+    """
+    if len(errors) == 1:
+        raise next(iter(errors.values()))
+
+    raise BatchError([(samples[index], errors[index]) for index in sorted(errors)], results)
+
+
+def map_samples(func, samples, max_workers=1, progress=None, sample_args=None):
+    """Call ``func`` on each sample and return results in the order of samples.
+
+    Samples are processed by up to ``max_workers`` threads. Errors do
+    not stop processing of other samples. When all samples are
+    processed, error of a single failed sample is raised as it is and
+    errors of multiple samples are raised together in
+    :class:`~resdk.exceptions.BatchError`.
+
+    :param func: function called with a sample
+    :param list samples: samples to process
+    :param int max_workers: number of samples processed concurrently
+    :param progress: function called with the sample and the result (or
+        the error) as soon as each sample is processed
+    :param list sample_args: additional arguments of ``func`` for each
+        sample (in the order of samples)
+
+    """
+    samples = list(samples)
+    results = [None] * len(samples)
+    errors = {}
+
+    for index, result in _imap_samples(func, samples, max_workers, sample_args):
+        if isinstance(result, Exception):
+            errors[index] = result
+        else:
+            results[index] = result
+
+        if progress is not None:
+            progress(samples[index], result)
+
+    if errors:
+        _raise_errors(
+            samples, errors,
+            [result for index, result in enumerate(results) if index not in errors],
+        )
+
+    return results
+
+
+def run_per_sample(get_specs, samples, max_workers=1, progress=None, sample_args=None):
+    """Run processes on each sample and return created data objects.
+
+    ``get_specs`` is called with each sample (by up to ``max_workers``
+    threads) and returns specs of processes to run on it (see
+    :meth:`~resdk.Resolwe.run_many`). Specs of all samples are then
+    submitted with a single call of :meth:`~resdk.Resolwe.run_many`.
+    Processes that were already run with the same inputs are not run
+    again and each data object is added to its sample.
+
+    Errors do not stop processing of other samples. When all samples
+    are processed, error of a single failed sample is raised as it is
+    and errors of multiple samples are raised together in
+    :class:`~resdk.exceptions.BatchError`.
+
+    :param get_specs: function called with a sample that returns specs
+        of processes to run on it
+    :param list samples: samples to process
+    :param int max_workers: number of samples processed concurrently
+    :param progress: function called with the sample and the list of
+        its data objects (or the error) as soon as processes of each
+        sample are submitted
+    :param list sample_args: additional arguments of ``get_specs`` for
+        each sample (in the order of samples)
+
+    :return: created data objects in the order of samples
+    :rtype: list of Data objects
+
+    """
+    samples = list(samples)
+    sample_specs = [[] for _ in samples]
+    errors = {}
+
+    def report(index, result):
+        """Report progress of the sample."""
+        if progress is not None:
+            progress(samples[index], result)
+
+    def sample_specs_list(sample, *args):
+        """Return list of specs of the sample."""
+        return list(get_specs(sample, *args))
+
+    for index, result in _imap_samples(sample_specs_list, samples, max_workers, sample_args):
+        if isinstance(result, Exception):
+            errors[index] = result
+            report(index, result)
+        elif not result:
+            report(index, [])
+        else:
+            sample_specs[index] = [dict(spec, sample=samples[index]) for spec in result]
+
+    specs = []
+    spec_samples = []
+    for index, specs_of_sample in enumerate(sample_specs):
+        specs.extend(specs_of_sample)
+        spec_samples.extend([index] * len(specs_of_sample))
+
+    sample_results = [[] for _ in samples]
+    if specs:
+        spec_indices = {id(spec): spec_index for spec_index, spec in enumerate(specs)}
+        pending = [len(specs_of_sample) for specs_of_sample in sample_specs]
+        finished = [[] for _ in samples]
+
+        def spec_finished(spec, result):
+            """Report progress of the sample when all its specs are finished."""
+            index = spec_samples[spec_indices[id(spec)]]
+            pending[index] -= 1
+            finished[index].append(result)
+            if pending[index] == 0:
+                failed = [error for error in finished[index] if isinstance(error, Exception)]
+                report(index, failed[0] if failed else finished[index])
+
+        resolwe = get_resolwe(*[spec['sample'] for spec in specs])
+        results = resolwe.run_many(specs, max_workers=max_workers, get_or_run=True,
+                                   progress=spec_finished)
+
+        for index, result in zip(spec_samples, results):
+            if isinstance(result, Exception):
+                errors.setdefault(index, result)
+            else:
+                sample_results[index].append(result)
+
+    if errors:
+        _raise_errors(
+            samples, errors,
+            [data for index, data_list in enumerate(sample_results) if index not in errors
+             for data in data_list],
+        )
+
+    return [data for data_list in sample_results for data in data_list]
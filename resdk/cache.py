@@ -0,0 +1,410 @@
+""".. Ignore pydocstyle D400.
+
+=====
+Cache
+=====
+
+Client-side cache of responses of the Resolwe API.
+
+.. autoclass:: resdk.cache.ResponseCache
+   :members:
+
+.. autoclass:: resdk.cache.DiskCache
+   :members:
+
+.. autoclass:: resdk.cache.CachingHTTPAdapter
+   :members:
+
+.. autoclass:: resdk.cache.IdentityMap
+   :members:
+
+"""
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import collections
+import copy
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import weakref
+
+import appdirs
+import six
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+from . import __about__ as about
+from .constants import (
+    DISK_CACHE_MAX_AGE, DISK_CACHE_SIZE, RESPONSE_CACHE_SIZE, RESPONSE_CACHE_TTLS,
+)
+
+
+class ResponseCache(object):
+    """Cache of responses to GET requests to the Resolwe API.
+
+    Responses are cached per endpoint (the first part of the path after
+    ``/api/``, for example ``process`` or ``descriptorschema``) for the
+    number of seconds given in ``ttls``. Responses of endpoints not
+    listed in ``ttls`` are not cached. When the cache is full, the least
+    recently used response is removed.
+
+    Any write request (POST, PUT, PATCH or DELETE) to an endpoint
+    removes all cached responses of that endpoint.
+
+    Cached responses are copied when they are returned, so changing
+    them does not affect the cache.
+
+    :param dict ttls: time to live of responses (in seconds) per
+        endpoint
+    :param int max_size: maximal number of cached responses
+
+    """
+
+    endpoint_re = re.compile(r'/api/([^/?]+)')
+
+    def __init__(self, ttls=None, max_size=RESPONSE_CACHE_SIZE):
+        """Initialize attributes."""
+        self.ttls = dict(RESPONSE_CACHE_TTLS if ttls is None else ttls)
+        self.max_size = max_size
+
+        #: number of responses returned from the cache
+        self.hits = 0
+        #: number of responses not found in the cache
+        self.misses = 0
+
+        self._responses = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def endpoint(self, url):
+        """Return endpoint of the url or ``None`` if it is not an API url."""
+        match = self.endpoint_re.search(url)
+        return match.group(1) if match else None
+
+    @staticmethod
+    def _key(url, params):
+        """Return cache key of the request."""
+        return url, tuple(sorted(
+            (key, tuple(value) if isinstance(value, list) else value)
+            for key, value in six.iteritems(params)
+        ))
+
+    def get(self, url, params, fetch):
+        """Return cached response or fetch and cache it.
+
+        :param str url: url of the request
+        :param dict params: query parameters of the request
+        :param fetch: function that makes the request and returns the
+            response
+
+        """
+        endpoint = self.endpoint(url)
+        ttl = self.ttls.get(endpoint)
+        if not ttl:
+            return fetch()
+
+        key = self._key(url, params)
+        now = time.time()
+        with self._lock:
+            if key in self._responses:
+                expires, response = self._responses.pop(key)
+                if expires > now:
+                    # Move the response to the end (most recently used)
+                    self._responses[key] = (expires, response)
+                    self.hits += 1
+                    return copy.deepcopy(response)
+            self.misses += 1
+
+        response = fetch()
+
+        with self._lock:
+            self._responses[key] = (now + ttl, copy.deepcopy(response))
+            while len(self._responses) > self.max_size:
+                self._responses.popitem(last=False)
+
+        return response
+
+    def invalidate(self, endpoint=None):
+        """Remove cached responses of the endpoint (all if not given)."""
+        with self._lock:
+            if endpoint is None:
+                self._responses.clear()
+                return
+
+            for key in list(self._responses):
+                if self.endpoint(key[0]) == endpoint:
+                    del self._responses[key]
+
+    def invalidate_url(self, url):
+        """Remove cached responses of the endpoint of the url."""
+        endpoint = self.endpoint(url)
+        if endpoint is not None:
+            self.invalidate(endpoint)
+
+    def __len__(self):
+        """Return number of cached responses."""
+        return len(self._responses)
+
+
+class DiskCache(object):
+    """Persistent cache of responses to GET requests to the Resolwe API.
+
+    Responses are stored in a SQLite database, by default in file
+    ``responses.sqlite`` in user's cache directory (for example
+    ``~/.cache/resdk`` on Linux), so they survive restarts of the Python
+    session. Each response is stored together with its ``ETag`` and
+    ``Last-Modified`` headers and is keyed by the full url of the
+    request (including query parameters) and the name of the user that
+    made it.
+
+    Stored responses are never used without asking the server first,
+    see :class:`CachingHTTPAdapter`.
+
+    Responses older than ``max_age`` seconds are removed and, when the
+    total size of stored responses exceeds ``max_size`` bytes, the
+    oldest ones are removed when a new response is stored. All responses
+    can be removed with :meth:`clear`.
+
+    :param str path: path of the database file
+    :param int max_size: maximal size of stored responses in bytes
+    :param float max_age: time in seconds after which stored responses
+        are removed
+
+    """
+
+    def __init__(self, path=None, max_size=DISK_CACHE_SIZE, max_age=DISK_CACHE_MAX_AGE):
+        """Initialize attributes."""
+        if path is None:
+            path = os.path.join(
+                appdirs.user_cache_dir(about.__title__, about.__author__), 'responses.sqlite'
+            )
+        self.path = path
+        self.max_size = max_size
+        self.max_age = max_age
+
+        self._lock = threading.Lock()
+        self._initialized = False
+
+    def _connect(self):
+        """Return connection to the database, create it if needed."""
+        if not self._initialized:
+            directory = os.path.dirname(self.path)
+            try:
+                os.makedirs(directory)
+            except OSError:
+                if not os.path.isdir(directory):
+                    raise
+
+        connection = sqlite3.connect(self.path, timeout=30)
+        if not self._initialized:
+            with connection:
+                connection.execute(
+                    'CREATE TABLE IF NOT EXISTS responses ('
+                    'url TEXT, user TEXT, etag TEXT, last_modified TEXT, headers TEXT, '
+                    'content BLOB, size INTEGER, stored REAL, PRIMARY KEY (url, user))'
+                )
+            self._initialized = True
+
+        return connection
+
+    def _prune(self, connection):
+        """Remove expired responses and the oldest ones over the size limit."""
+        connection.execute('DELETE FROM responses WHERE stored < ?',
+                           (time.time() - self.max_age,))
+
+        total_size = connection.execute('SELECT SUM(size) FROM responses').fetchone()[0] or 0
+        if total_size <= self.max_size:
+            return
+
+        removed = []
+        for url, user, size in connection.execute(
+                'SELECT url, user, size FROM responses ORDER BY stored'):
+            if total_size <= self.max_size:
+                break
+            removed.append((url, user))
+            total_size -= size
+
+        connection.executemany('DELETE FROM responses WHERE url = ? AND user = ?', removed)
+
+    def get(self, url, user):
+        """Return stored response or ``None`` if it is not stored.
+
+        :param str url: url of the request
+        :param str user: name of the user that made the request
+
+        :return: dictionary with ``etag``, ``last_modified``, ``headers``
+            and ``content`` of the response
+        :rtype: dict
+
+        """
+        with self._lock:
+            connection = self._connect()
+            try:
+                row = connection.execute(
+                    'SELECT etag, last_modified, headers, content FROM responses '
+                    'WHERE url = ? AND user = ?', (url, user or '')
+                ).fetchone()
+            finally:
+                connection.close()
+
+        if row is None:
+            return None
+
+        return {
+            'etag': row[0],
+            'last_modified': row[1],
+            'headers': json.loads(row[2]),
+            'content': bytes(row[3]),
+        }
+
+    def set(self, url, user, etag, last_modified, headers, content):
+        """Store the response.
+
+        :param str url: url of the request
+        :param str user: name of the user that made the request
+        :param str etag: ``ETag`` header of the response
+        :param str last_modified: ``Last-Modified`` header of the
+            response
+        :param dict headers: headers of the response
+        :param bytes content: body of the response
+
+        """
+        with self._lock:
+            connection = self._connect()
+            try:
+                with connection:
+                    connection.execute(
+                        'INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                        (url, user or '', etag, last_modified, json.dumps(dict(headers)),
+                         sqlite3.Binary(content), len(content), time.time())
+                    )
+                    self._prune(connection)
+            finally:
+                connection.close()
+
+    def clear(self):
+        """Remove all stored responses."""
+        with self._lock:
+            connection = self._connect()
+            try:
+                with connection:
+                    connection.execute('DELETE FROM responses')
+            finally:
+                connection.close()
+
+
+class CachingHTTPAdapter(HTTPAdapter):
+    """HTTP adapter that revalidates stored responses of the API.
+
+    GET requests to the API are sent with ``If-None-Match`` and
+    ``If-Modified-Since`` headers of the stored response. If the server
+    replies with ``304 Not Modified``, the stored response is returned
+    instead, so its body is not transferred again. Responses with an
+    ``ETag`` or ``Last-Modified`` header are stored in the cache.
+
+    Other requests are sent unchanged.
+
+    :param cache: cache of the responses
+    :type cache: DiskCache
+    :param str user: name of the user that makes the requests
+
+    Other arguments are passed to :class:`requests.adapters.HTTPAdapter`.
+
+    """
+
+    def __init__(self, cache, user=None, **kwargs):
+        """Initialize attributes."""
+        super(CachingHTTPAdapter, self).__init__(**kwargs)
+        self.cache = cache
+        self.user = user
+
+    @staticmethod
+    def _cacheable(request):
+        """Return ``True`` if response of the request can be cached."""
+        return request.method == 'GET' and '/api/' in request.url
+
+    def send(self, request, **kwargs):  # pylint: disable=arguments-differ
+        """Send the request, use the stored response if it is valid."""
+        if not self._cacheable(request):
+            return super(CachingHTTPAdapter, self).send(request, **kwargs)
+
+        stored = self.cache.get(request.url, self.user)
+        if stored is not None:
+            if stored['etag']:
+                request.headers['If-None-Match'] = stored['etag']
+            if stored['last_modified']:
+                request.headers['If-Modified-Since'] = stored['last_modified']
+
+        response = super(CachingHTTPAdapter, self).send(request, **kwargs)
+
+        if response.status_code == 304 and stored is not None:
+            headers = CaseInsensitiveDict(stored['headers'])
+            headers.update(response.headers)
+            response.status_code = 200
+            response.reason = 'OK'
+            response.headers = headers
+            response.encoding = get_encoding_from_headers(headers)
+            response._content = stored['content']  # pylint: disable=protected-access
+            response._content_consumed = True  # pylint: disable=protected-access
+        elif response.status_code == 200:
+            etag = response.headers.get('ETag')
+            last_modified = response.headers.get('Last-Modified')
+            if etag or last_modified:
+                self.cache.set(request.url, self.user, etag, last_modified,
+                               response.headers, response.content)
+
+        return response
+
+
+class IdentityMap(object):
+    """Map of resources loaded in a session.
+
+    Resources are identified by their class and id. Queries return the
+    resource from the map if it is already loaded (with fields updated
+    from the server), so each object on the server is represented by a
+    single resource. Lazy loaded relationships (i.e. ``Data.sample`` or
+    ``Data.descriptor_schema``) are therefore fetched only once and
+    shared by all references to the resource.
+
+    Resources are referenced weakly, so they are removed from the map
+    when they are no longer used.
+
+    """
+
+    def __init__(self):
+        """Initialize attributes."""
+        self._resources = weakref.WeakValueDictionary()
+        self._lock = threading.Lock()
+
+    def get(self, resource_class, resource_id):
+        """Return resource from the map or ``None`` if it is not there."""
+        return self._resources.get((resource_class, resource_id))
+
+    def add(self, resource):
+        """Add resource to the map.
+
+        If another resource with the same class and id is already in the
+        map, it is returned instead of the given one.
+
+        """
+        with self._lock:
+            return self._resources.setdefault((resource.__class__, resource.id), resource)
+
+    def discard(self, resource):
+        """Remove resource from the map if it is there."""
+        with self._lock:
+            key = (resource.__class__, resource.id)
+            if self._resources.get(key) is resource:
+                del self._resources[key]
+
+    def clear(self):
+        """Remove all resources from the map."""
+        with self._lock:
+            self._resources.clear()
+
+    def __len__(self):
+        """Return number of resources in the map."""
+        return len(self._resources)
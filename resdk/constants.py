@@ -9,3 +9,35 @@ ReSDK constants.
 """
 
 CHUNK_SIZE = 8000000  # 8MB
+
+UPLOAD_MIN_CHUNK_SIZE = 8000000  # 8MB
+UPLOAD_MAX_CHUNK_SIZE = 64000000  # 64MB
+UPLOAD_TARGET_CHUNKS = 1000  # Preferred number of chunks per uploaded file
+UPLOAD_INFLIGHT_CHUNKS = 4  # Number of chunks uploaded concurrently
+UPLOAD_CLAIM_TIMEOUT = 1800  # Seconds after which an unrefreshed claim of an upload expires
+UPLOAD_JOURNAL_MAX_AGE = 86400  # Seconds after which an unfinished upload is started again
+
+POOL_SIZE = 10  # Number of keep-alive connections per host
+MAX_RETRIES = 3  # Retries of idempotent requests on connection errors
+
+PAGE_SIZE = 100  # Number of objects fetched per request by ResolweQuery.iterator
+BULK_BATCH_SIZE = 500  # Maximal number of objects fetched per request by ResolweQuery.in_bulk
+BULK_MAX_FILTER_LENGTH = 2000  # Maximal length of the `__in` filter value in a request URL
+
+RESPONSE_CACHE_SIZE = 1000  # Maximal number of responses in ResponseCache
+DISK_CACHE_SIZE = 200000000  # Maximal size (in bytes) of responses stored in DiskCache
+DISK_CACHE_MAX_AGE = 30 * 24 * 3600  # Time (in seconds) after which DiskCache responses expire
+# Time to live (in seconds) of cached responses per API endpoint
+RESPONSE_CACHE_TTLS = {
+    'process': 300,
+    'descriptorschema': 300,
+    'user': 60,
+    'group': 60,
+}
+
+ASYNC_MAX_CONCURRENCY = 100  # Maximal number of concurrent requests of AsyncResolwe
+
+RUN_MAX_WORKERS = 10  # Number of data objects created concurrently by Resolwe.run_many
+
+WAIT_POLL_INTERVAL = 1  # Initial interval (in seconds) between status checks in Resolwe.wait
+WAIT_MAX_POLL_INTERVAL = 30  # Maximal interval (in seconds) between status checks in Resolwe.wait
@@ -1,17 +1,18 @@
 """Uploads utility functions."""
 from __future__ import absolute_import, division, print_function, unicode_literals
 
-import time
-
 
 def wait_process_complete(data, recheck_interval, abort=2600000):
-    """Suspend until the data is finished processing."""
-    basetime = time.time()
-    current = time.time() - basetime
-    while not process_complete(data) and current < abort:
-        time.sleep(recheck_interval)
-        data.update()
-        current = time.time() - basetime
+    """Suspend until the data is finished processing.
+
+    Status of the data is checked every ``recheck_interval`` seconds at
+    first and less often if processing takes longer (see
+    ``Resolwe.wait``).
+
+    """
+    for _ in data.resolwe.wait([data], timeout=abort, poll=recheck_interval):
+        if data.status == 'ER':
+            raise ValueError('Problem processing data object: {}'.format(data.name))
 
 
 def process_complete(data):
@@ -8,6 +8,8 @@ Custom ReSDK exceptions.
 
 .. autoclass:: ValidationError
 
+.. autoclass:: BatchError
+
 """
 from __future__ import absolute_import, division, print_function
 
@@ -22,6 +24,27 @@ class ResolweServerError(Exception):
     """Error response from the Resolwe API."""
 
 
+class BatchError(Exception):
+    """Errors of some items of an operation on many items.
+
+    Operation is finished for all other items before the error is
+    raised.
+
+    :param list errors: pairs of failed items and their errors
+    :param list results: results of successful items
+
+    """
+
+    def __init__(self, errors, results=None):
+        """Initialize attributes."""
+        self.errors = errors
+        self.results = results or []
+        message = 'Failed for {} items:\n{}'.format(
+            len(errors), '\n'.join('{}: {}'.format(item, error) for item, error in errors)
+        )
+        super(BatchError, self).__init__(message)
+
+
 def handle_http_exception(func):
     """Handle slumber errors in more verbose way."""
     def wrapper(*args, **kwargs):
@@ -14,9 +14,14 @@ import collections
 import copy
 import logging
 import operator
+import sys
+import threading
 
 import six
 
+from .constants import BULK_BATCH_SIZE, BULK_MAX_FILTER_LENGTH, PAGE_SIZE
+from .resources.record import record_class
+
 
 class ResolweQuery(object):
     """Query resource endpoints.
@@ -108,6 +113,20 @@ class ResolweQuery(object):
 
         res.collection.filter(data=42, contributor=1)
 
+    Iterating over a query fetches all matching objects in a single
+    request and caches them. Large results can be processed page by
+    page with :meth:`iterator`, which keeps only the current page in
+    memory:
+
+    .. code-block:: python
+
+        for data in res.data.filter(status='OK').iterator(page_size=500):
+            print(data.name)
+
+        # Fetch next two pages while the current one is processed
+        for data in res.data.filter(status='OK').iterator(prefetch=2):
+            data.files()
+
     """
 
     _cache = None
@@ -115,6 +134,10 @@ class ResolweQuery(object):
     _limit = None
     _offset = None
     _filters = collections.defaultdict(list)
+    _only = None  # fields to load, if not all of them
+    _defer = ()  # fields to not load
+    _compact = False  # return records instead of resources
+    _prefetch = ()  # names of prefetched related objects
 
     resolwe = None
     resource = None
@@ -199,6 +222,10 @@ class ResolweQuery(object):
         new_obj._filters = copy.deepcopy(self._filters)
         new_obj._limit = self._limit
         new_obj._offset = self._offset
+        new_obj._only = self._only
+        new_obj._defer = self._defer
+        new_obj._compact = self._compact
+        new_obj._prefetch = self._prefetch
         return new_obj
 
     def _add_filter(self, filter_):
@@ -216,26 +243,98 @@ class ResolweQuery(object):
                     'Unsupported query_method: {}'.format(self.resource.query_method))
 
     def _compose_filters(self):
-        """Convert filters to dict and add pagination filters."""
-        filters = self._filters
+        """Convert filters to dict and add pagination and fields filters."""
+        filters = dict(self._filters)
 
         if self._limit is not None:
             filters['limit'] = self._limit
         if self._offset is not None:
             filters['offset'] = self._offset
 
-        return dict(filters)
+        deferred_fields = self._deferred_fields()
+        if deferred_fields:
+            filters['fields'] = self._fields_filter(deferred_fields)
+
+        return filters
+
+    def _resource_fields(self):
+        """Return names of all fields of the resource."""
+        return (
+            self.resource.WRITABLE_FIELDS
+            + self.resource.UPDATE_PROTECTED_FIELDS
+            + self.resource.READ_ONLY_FIELDS
+        )
+
+    def _deferred_fields(self, raw=False):
+        """Return names of fields not loaded by the query.
+
+        Field ``id`` is always loaded. Fields implemented as properties
+        (for example ``descriptor_schema``) are always loaded into
+        resources, but not if ``raw`` is set (when values of fields are
+        not converted to resources).
+
+        """
+        if self._only is None and not self._defer:
+            return frozenset()
+
+        loaded = set(self._resource_fields()) if self._only is None else set(self._only)
+        loaded.difference_update(self._defer)
+        loaded.add('id')
+
+        return frozenset(
+            field_name for field_name in self._resource_fields()
+            if field_name not in loaded
+            and (raw or not isinstance(getattr(self.resource, field_name, None), property))
+        )
+
+    def _fields_filter(self, deferred_fields):
+        """Return value of filter selecting the loaded fields.
+
+        Ids of prefetched related objects are also selected.
+
+        """
+        return ','.join(
+            [field_name for field_name in self._resource_fields()
+             if field_name not in deferred_fields] + list(self._prefetch)
+        )
 
     def _populate_resource(self, data):
-        """Populate resource with given data."""
-        return self.resource(resolwe=self.resolwe, **data)
+        """Populate resource with given data.
 
-    def _fetch(self):
-        """Make request to the server and populate cache."""
-        if self._cache is not None:
-            return  # already fetched
+        If identity map is enabled on the Resolwe instance, already
+        loaded resource is updated and returned instead of a new one.
+        Resources with deferred fields are not put in the map.
+
+        """
+        if self._compact:
+            return record_class(self.resource)(self.resolwe, data)
+
+        deferred_fields = self._deferred_fields()
+        if not deferred_fields:
+            identity_map = self.resolwe.identity_map
+            if identity_map is None or 'id' not in data:
+                return self.resource(resolwe=self.resolwe, **data)
+
+            resource = identity_map.get(self.resource, data['id'])
+            if resource is None:
+                return identity_map.add(self.resource(resolwe=self.resolwe, **data))
+
+            resource._update_fields(data)  # pylint: disable=protected-access
+            return resource
 
-        filters = self._compose_filters()
+        # pylint: disable=protected-access
+        resource = self.resource(resolwe=self.resolwe)
+        resource._deferred_fields = deferred_fields
+        resource._update_fields(data)
+        return resource
+
+    def _request(self, filters):
+        """Make request to the server with given filters.
+
+        :return: list of objects' data and total number of objects
+            (``None`` if response is not paginated)
+
+        """
         if self.resource.query_method == 'GET':
             items = self.api.get(**filters)
         elif self.resource.query_method == 'POST':
@@ -246,32 +345,513 @@ class ResolweQuery(object):
 
         # Extract data from paginated response
         if isinstance(items, dict) and 'results' in items:
-            self._count = items['count']
-            items = items['results']
+            return items['results'], items['count']
+
+        return items, None
+
+    def _fetch(self):
+        """Make request to the server and populate cache."""
+        if self._cache is not None:
+            return  # already fetched
+
+        items, count = self._request(self._compose_filters())
+        if count is not None:
+            self._count = count
 
         self._cache = [self._populate_resource(data) for data in items]
+        if self._prefetch:
+            self._prefetch_related(items, self._cache)
+
+    def _prefetch_related(self, items, objects):
+        """Load related objects of all objects at once and attach them.
+
+        Ids of related objects are read from the objects' data. Related
+        objects are requested with :meth:`in_bulk` and attached to each
+        object as an evaluated query, the same one that would be lazily
+        created on the object, so accessing them makes no requests.
+
+        :param list items: objects' data
+        :param list objects: resources populated with the data
+
+        """
+        # pylint: disable=protected-access
+        for name in self._prefetch:
+            query_name, filter_name = self.resource.PREFETCH_RELATED[name]
+            related_query = getattr(self.resolwe, query_name)
+
+            related_ids = [item.get(name) for item in items]
+            related = related_query.in_bulk(
+                id_ for ids in related_ids if ids is not None for id_ in ids
+            )
+
+            for obj, ids in zip(objects, related_ids):
+                if ids is None:
+                    continue  # ids are not in the response, objects are loaded lazily
+
+                query = related_query.filter(**{filter_name: obj.id})
+                query._cache = [related[id_] for id_ in ids if id_ in related]
+                query._count = len(query._cache)
+                setattr(obj, '_{}'.format(name), query)
+
+    def _pages(self, page_size, raw=False):
+        """Request objects in current query page by page.
+
+        Objects are ordered by id, unless other ordering is given, so
+        that pages do not overlap. If ``raw`` is set, only the selected
+        fields are requested, see :meth:`_deferred_fields`.
+
+        :return: generator of lists of objects' data
+
+        """
+        filters = dict(self._filters)
+        deferred_fields = self._deferred_fields(raw)
+        if deferred_fields:
+            filters['fields'] = self._fields_filter(deferred_fields)
+        if 'ordering' not in filters:
+            filters['ordering'] = ['id'] if self.resource.query_method == 'GET' else 'id'
+
+        offset = self._offset or 0
+        remaining = self._limit
+        while remaining is None or remaining > 0:
+            limit = page_size if remaining is None else min(page_size, remaining)
+            filters.update(limit=limit, offset=offset)
+
+            items, count = self._request(filters)
+            if count is None:
+                # Server does not paginate the response, so it already
+                # contains all objects.
+                yield items
+                return
+
+            if items:
+                yield items
+
+            offset += len(items)
+            if remaining is not None:
+                remaining -= len(items)
+            if len(items) < limit or offset >= count:
+                return
+
+    def _prefetched_pages(self, page_size, prefetch):
+        """Request pages in a background thread.
+
+        Up to ``prefetch`` pages are requested in advance while the
+        current page is being processed. Errors raised in the background
+        thread are re-raised in the calling one.
+
+        :return: generator of lists of objects' data
+
+        """
+        pages = six.moves.queue.Queue(maxsize=prefetch)
+        stopped = threading.Event()
+        done = object()
+
+        def put(item):
+            """Put item in the queue unless the consumer has stopped."""
+            while not stopped.is_set():
+                try:
+                    pages.put(item, timeout=0.1)
+                    return True
+                except six.moves.queue.Full:
+                    pass
+            return False
+
+        def produce():
+            """Request pages and put them in the queue."""
+            try:
+                for page in self._pages(page_size):
+                    if not put(page):
+                        return
+            except Exception:  # pylint: disable=broad-except
+                put(sys.exc_info())
+                return
+            put(done)
+
+        thread = threading.Thread(target=produce)
+        thread.daemon = True
+        thread.start()
+
+        try:
+            while True:
+                page = pages.get()
+                if page is done:
+                    return
+                if isinstance(page, tuple):
+                    six.reraise(*page)
+                yield page
+        finally:
+            stopped.set()
+
+    def iterator(self, page_size=PAGE_SIZE, prefetch=0):
+        """Iterate over objects in current query page by page.
+
+        Objects are requested from the server in pages of ``page_size``
+        objects and only the current page is held in memory. Contrary
+        to iterating over the query itself, objects are not cached, so
+        each call makes new requests to the server.
+
+        If ``prefetch`` is given, up to that many following pages are
+        requested in a background thread while the current page is
+        being processed, so processing is not interrupted by waiting
+        for the server.
+
+        :param int page_size: number of objects fetched per request
+        :param int prefetch: number of pages fetched in advance
+
+        :return: generator of objects of type self.resource
+
+        """
+        if page_size < 1:
+            raise ValueError("`page_size` must be a positive integer.")
+        if prefetch < 0:
+            raise ValueError("`prefetch` must be a non-negative integer.")
+
+        if prefetch:
+            pages = self._prefetched_pages(page_size, prefetch)
+        else:
+            pages = self._pages(page_size)
+
+        for page in pages:
+            objects = [self._populate_resource(data) for data in page]
+            if self._prefetch:
+                self._prefetch_related(page, objects)
+            for obj in objects:
+                yield obj
+
+    def _check_fields(self, fields):
+        """Raise error if any of the fields is not a field of the resource."""
+        unknown = [field for field in fields if field not in self._resource_fields()]
+        if unknown:
+            raise ValueError("Unknown field(s) of {}: {}".format(
+                self.resource.__name__, ', '.join(unknown)))
+
+    def only(self, *fields):
+        """Return clone of current query that loads only given fields.
+
+        Only given fields are requested from the server. Other fields
+        are deferred and they are loaded (all at once) when one of them
+        is first accessed on an object. Field ``id`` is always loaded.
+
+        .. code-block:: python
+
+            for data in res.data.filter(status='OK').only('name', 'status'):
+                print(data.name)
+
+        """
+        self._check_fields(fields)
+        new_query = self._clone()
+        new_query._only = tuple(fields)  # pylint: disable=protected-access
+        return new_query
+
+    def defer(self, *fields):
+        """Return clone of current query that does not load given fields.
+
+        Deferred fields are not requested from the server. They are
+        loaded (all at once) when one of them is first accessed on an
+        object.
+
+        """
+        self._check_fields(fields)
+        new_query = self._clone()
+        new_query._defer = self._defer + tuple(fields)  # pylint: disable=protected-access
+        return new_query
+
+    def distinct(self, field, page_size=PAGE_SIZE):
+        """Return distinct values of the field in current query.
+
+        Objects are scanned page by page and only the given field is
+        requested from the server. If the query is already evaluated,
+        values are read from its cache without any requests.
+
+        .. code-block:: python
+
+            res.data.filter(collection=1).distinct('status')
+
+        :param str field: name of the field with hashable values
+        :param int page_size: number of objects fetched per request
+
+        :return: list of distinct values in order of their first
+            occurrence
+        :rtype: list
+
+        """
+        if self._cache is not None:
+            values = (getattr(obj, field) for obj in self._cache)
+        else:
+            values = self.values_list(field, flat=True, page_size=page_size)
+
+        return list(collections.OrderedDict.fromkeys(values))
+
+    def in_bulk(self, ids, batch_size=BULK_BATCH_SIZE, field_name='id'):
+        """Return objects with given ids.
+
+        Objects are requested in batches of at most ``batch_size``
+        objects with a ``__in`` filter, so that length of request URLs
+        is within safe limits. Filters of current query are applied to
+        all requests.
+
+        .. code-block:: python
+
+            data = res.data.in_bulk([1, 2, 3])
+            data[2].name
+
+        :param list ids: ids (or values of ``field_name`` field) of
+            objects
+        :param int batch_size: number of objects per request
+        :param str field_name: name of the field by which objects are
+            looked up (must be unique)
+
+        :return: dict mapping ids to objects, ids of non-existing
+            objects are omitted
+        :rtype: dict
+
+        """
+        objects = {}
+        for batch in self._batches(ids, batch_size):
+            query = self.filter(**{
+                '{}__in'.format(field_name): ','.join(six.text_type(id_) for id_ in batch)
+            })
+            for obj in query:
+                objects[getattr(obj, field_name)] = obj
+
+        return objects
+
+    @staticmethod
+    def _batches(ids, batch_size=BULK_BATCH_SIZE):
+        """Split unique ids to batches for ``__in`` filters.
+
+        Batches have at most ``batch_size`` ids and the length of the
+        filter value is within ``BULK_MAX_FILTER_LENGTH``.
+
+        :return: list of lists of ids
+
+        """
+        if batch_size < 1:
+            raise ValueError("`batch_size` must be a positive integer.")
+
+        ids = list(collections.OrderedDict.fromkeys(ids))  # unique ids in given order
+        batches = []
+        batch = []
+        length = 0
+        for id_ in ids:
+            id_length = len(six.text_type(id_)) + 1
+            if batch and (len(batch) >= batch_size or length + id_length > BULK_MAX_FILTER_LENGTH):
+                batches.append(batch)
+                batch = []
+                length = 0
+            batch.append(id_)
+            length += id_length
+        if batch:
+            batches.append(batch)
+
+        return batches
+
+    def compact(self):
+        """Return clone of current query that returns compact records.
+
+        Records are read-only objects that take only a fraction of
+        memory of full resources, which is useful when many objects are
+        read. Accessing a method of a record (for example ``files()``)
+        upgrades it to the full resource, which can also be done with
+        ``to_resource()``:
+
+        .. code-block:: python
+
+            data_list = list(res.data.filter(status='OK').compact())
+            data = data_list[0].to_resource()
+            data.name = 'New name'
+            data.save()
+
+        See :class:`~resdk.resources.record.Record` for details.
+
+        """
+        if self._prefetch:
+            raise ValueError("Related objects cannot be prefetched for compact records.")
+
+        new_query = self._clone()
+        new_query._compact = True  # pylint: disable=protected-access
+        return new_query
+
+    def prefetch(self, *related):
+        """Return clone of current query that prefetches related objects.
+
+        Related objects of all objects in the query (or in the current
+        page of :meth:`iterator`) are requested at once in a few
+        requests, instead of a request per object when they are first
+        accessed:
+
+        .. code-block:: python
+
+            for sample in res.sample.filter(collection=1).prefetch('data', 'collections'):
+                sample.get_bam()  # no request is made
+                sample.collections  # no request is made
+
+        Related objects that can be prefetched are listed in
+        ``PREFETCH_RELATED`` of the resource.
+
+        :param related: names of related objects
+
+        """
+        unknown = [name for name in related if name not in self.resource.PREFETCH_RELATED]
+        if unknown:
+            raise ValueError("Related objects of {} that cannot be prefetched: {}".format(
+                self.resource.__name__, ', '.join(unknown)))
+        if self._compact:
+            raise ValueError("Related objects cannot be prefetched for compact records.")
+
+        new_query = self._clone()
+        new_query._prefetch = self._prefetch + tuple(  # pylint: disable=protected-access
+            name for name in related if name not in self._prefetch
+        )
+        return new_query
+
+    def _raw_pages(self, fields, page_size):
+        """Return pages of raw data of given fields (all if none given)."""
+        if page_size < 1:
+            raise ValueError("`page_size` must be a positive integer.")
+
+        query = self.only(*fields) if fields else self._clone()
+        return query._pages(page_size, raw=True)  # pylint: disable=protected-access
+
+    def values(self, *fields, **kwargs):
+        """Iterate over values of given fields of objects in current query.
+
+        Objects are requested page by page (see :meth:`iterator`) and
+        only given fields are requested from the server. Values are not
+        converted to resources, so this is much faster than iterating
+        over the query when only some fields are needed.
+
+        :param fields: names of the fields, all fields if none are given
+        :param int page_size: number of objects fetched per request
+
+        :return: generator of dicts mapping field names to values
+
+        """
+        fields = fields or self._resource_fields()
+        for page in self._raw_pages(fields, kwargs.get('page_size', PAGE_SIZE)):
+            for data in page:
+                yield {field: data.get(field) for field in fields}
+
+    def values_list(self, *fields, **kwargs):
+        """Iterate over tuples of values of given fields.
+
+        Works as :meth:`values`, but returns tuples of values in the order
+        of given fields. If ``flat`` is ``True`` and a single field is
+        given, values are returned instead of tuples:
+
+        .. code-block:: python
+
+            res.data.filter(status='ER').values_list('id', flat=True)
+
+        :param fields: names of the fields, all fields if none are given
+        :param bool flat: return values instead of tuples
+        :param int page_size: number of objects fetched per request
+
+        :return: generator of tuples of values
+
+        """
+        flat = kwargs.get('flat', False)
+        if flat and len(fields) != 1:
+            raise ValueError("`flat` is supported only for a single field.")
+
+        fields = fields or self._resource_fields()
+        for page in self._raw_pages(fields, kwargs.get('page_size', PAGE_SIZE)):
+            for data in page:
+                if flat:
+                    yield data.get(fields[0])
+                else:
+                    yield tuple(data.get(field) for field in fields)
+
+    def to_dataframe(self, *fields, **kwargs):
+        """Return values of given fields as a pandas DataFrame.
+
+        Requires `pandas`_ to be installed. Values are read with
+        :meth:`values_list`.
+
+        :param fields: names of the fields (columns), all fields if none
+            are given
+        :param int page_size: number of objects fetched per request
+
+        :rtype: pandas.DataFrame
+
+        .. _pandas: https://pandas.pydata.org
+
+        """
+        try:
+            import pandas  # pylint: disable=import-error
+        except ImportError:
+            raise ImportError("`to_dataframe` requires pandas, install it with "
+                              "`pip install resdk[pandas]`.")
+
+        fields = fields or self._resource_fields()
+        return pandas.DataFrame.from_records(
+            self.values_list(*fields, page_size=kwargs.get('page_size', PAGE_SIZE)),
+            columns=fields,
+        )
 
     def clear_cache(self):
         """Clear cache."""
         self._cache = None
         self._count = None
 
-    def count(self):
-        """Return number of objects in current query."""
-        # pylint: disable=protected-access
-        if self._count is None:
-            count_query = self._clone()
-            count_query._offset = 0
-            count_query._limit = 1
-            count_query._fetch()
-            self._count = count_query._count
+    def _count_filters(self):
+        """Return filters of the request for number of objects."""
+        filters = dict(self._filters)
+        filters.update(limit=1, offset=0, fields='id')
+        return filters
+
+    def _fetch_count(self):
+        """Request number of objects in current query.
 
+        Only the ``count`` field of a single-object page is used, so no
+        resources are created.
+
+        """
+        items, count = self._request(self._count_filters())
+
+        # Response that is not paginated contains all objects
+        return len(items) if count is None else count
+
+    def _limit_count(self, count):
+        """Apply limit and offset of current query to number of objects."""
         if self._limit is None:
-            return self._count
+            return count
 
-        remaining = self._count - self._offset
+        remaining = count - (self._offset or 0)
         return max(0, min(self._limit, remaining))
 
+    def count(self):
+        """Return number of objects in current query.
+
+        If the query is not evaluated yet, only the number of objects is
+        requested from the server.
+
+        """
+        if self._count is None:
+            if self._cache is not None and self._limit is None and not self._offset:
+                return len(self._cache)
+
+            self._count = self._fetch_count()
+
+        return self._limit_count(self._count)
+
+    def exists(self):
+        """Return ``True`` if current query contains any objects.
+
+        Objects are not loaded from the server, see :meth:`count`.
+
+        """
+        if self._cache is not None:
+            return bool(self._cache)
+
+        return self.count() > 0
+
+    def __bool__(self):
+        """Return ``True`` if current query contains any objects."""
+        return self.exists()
+
+    __nonzero__ = __bool__  # Python 2
+
     def get(self, *args, **kwargs):
         """Get object that matches given parameters.
 
@@ -290,6 +870,11 @@ class ResolweQuery(object):
             returned
 
         """
+        response = list(self._get_query(args, kwargs))
+        return self._single(response)
+
+    def _get_query(self, args, kwargs):
+        """Return clone of current query filtered with arguments of ``get``."""
         if args:
             if len(args) > 1:
                 raise ValueError('Only one non-keyworded argument can be given')
@@ -301,16 +886,18 @@ class ResolweQuery(object):
 
         new_query = self._clone()
         new_query._add_filter(kwargs)  # pylint: disable=protected-access
+        return new_query
 
-        response = list(new_query)
-
-        if not response:
+    @staticmethod
+    def _single(objects):
+        """Return the only object in the list."""
+        if not objects:
             raise LookupError('Matching object does not exist.')
 
-        if len(response) > 1:
+        if len(objects) > 1:
             raise LookupError('get() returned more than one object.')
 
-        return response[0]
+        return objects[0]
 
     def create(self, **model_data):
         """Return new instance of current resource."""
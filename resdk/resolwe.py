@@ -16,16 +16,26 @@ import ntpath
 import os
 import re
 import subprocess
-import uuid
+import threading
+import time
+from collections import OrderedDict
+from multiprocessing.pool import ThreadPool
 
 import requests
+import six
 import slumber
 import yaml
+from requests.adapters import HTTPAdapter
 # Needed because we mock requests in test_resolwe.py
 from requests.exceptions import ConnectionError  # pylint: disable=redefined-builtin
+from requests.packages.urllib3.util.retry import Retry  # pylint: disable=import-error
 from six.moves.urllib.parse import urljoin  # pylint: disable=wrong-import-order
 
-from .constants import CHUNK_SIZE
+from .cache import CachingHTTPAdapter, DiskCache, IdentityMap, ResponseCache
+from .constants import (
+    MAX_RETRIES, POOL_SIZE, RUN_MAX_WORKERS, UPLOAD_INFLIGHT_CHUNKS, WAIT_MAX_POLL_INTERVAL,
+    WAIT_POLL_INTERVAL,
+)
 from .exceptions import ValidationError, handle_http_exception
 from .query import ResolweQuery
 from .resources import Collection, Data, DescriptorSchema, Group, Process, Relation, Sample, User
@@ -33,6 +43,7 @@ from .resources.kb import Feature, Mapping
 from .resources.utils import (
     endswith_colon, get_collection_id, get_data_id, iterate_fields, iterate_schema,
 )
+from .transfer import Downloader, Uploader, UploadJournal
 
 DEFAULT_URL = 'http://localhost:8000'
 # Tools directory on the Resolwe server, for example:
@@ -51,7 +62,12 @@ def version_tuple_to_str(version):
 
 
 class ResolweResource(slumber.Resource):
-    """Wrapper around slumber's Resource with custom exceptions handler."""
+    """Wrapper around slumber's Resource with custom exceptions handler.
+
+    If response cache is set (as ``cache`` in the resource's store), GET
+    responses are cached and write requests invalidate them.
+
+    """
 
     def __getattribute__(self, item):
         """Return class attribute and wrapp request methods in exception handler."""
@@ -60,6 +76,40 @@ class ResolweResource(slumber.Resource):
             return handle_http_exception(attr)
         return attr
 
+    def _write(self, method, *args, **kwargs):
+        """Make write request and invalidate cached responses."""
+        response = getattr(super(ResolweResource, self), method)(*args, **kwargs)
+        cache = self._store.get('cache')
+        if cache is not None:
+            cache.invalidate_url(self.url())
+        return response
+
+    def get(self, **kwargs):
+        """Make GET request, use cached response if available."""
+        cache = self._store.get('cache')
+        if cache is None:
+            return super(ResolweResource, self).get(**kwargs)
+
+        return cache.get(
+            self.url(), kwargs, lambda: super(ResolweResource, self).get(**kwargs)
+        )
+
+    def post(self, data=None, files=None, **kwargs):
+        """Make POST request."""
+        return self._write('post', data=data, files=files, **kwargs)
+
+    def patch(self, data=None, files=None, **kwargs):
+        """Make PATCH request."""
+        return self._write('patch', data=data, files=files, **kwargs)
+
+    def put(self, data=None, files=None, **kwargs):
+        """Make PUT request."""
+        return self._write('put', data=data, files=files, **kwargs)
+
+    def delete(self, **kwargs):
+        """Make DELETE request."""
+        return self._write('delete', **kwargs)
+
 
 class ResolweAPI(slumber.API):
     """Use custom ResolweResource resource class in slumber's API."""
@@ -76,10 +126,51 @@ class Resolwe(object):
     :type password: str
     :param url: Resolwe server instance
     :type url: str
+    :param pool_size: number of keep-alive connections to the server
+    :type pool_size: int
+    :param max_retries: number of retries of idempotent requests
+    :type max_retries: int
+    :param cache: cache responses of the API, ``True`` to use
+        :class:`~resdk.cache.ResponseCache` with default settings
+    :type cache: bool or ~resdk.cache.ResponseCache
+    :param disk_cache: store responses of the API on disk and revalidate
+        them with conditional requests, ``True`` to use
+        :class:`~resdk.cache.DiskCache` in user's cache directory
+    :type disk_cache: bool or ~resdk.cache.DiskCache
+    :param identity_map: represent each object on the server with a
+        single resource, ``True`` to use :class:`~resdk.cache.IdentityMap`
+    :type identity_map: bool or ~resdk.cache.IdentityMap
+
+    All requests to the server (API calls, file uploads and downloads)
+    are made through a single :class:`requests.Session`, available as
+    ``session`` attribute, so connections are reused between them.
+
+    If ``cache`` is enabled, responses of rarely changed endpoints
+    (processes, descriptor schemas, users and groups) are cached for a
+    few minutes. Cache is available as ``cache`` attribute and can be
+    cleared with ``res.cache.invalidate()``.
+
+    If ``disk_cache`` is enabled, responses of the API are stored on
+    disk together with their ``ETag`` and ``Last-Modified`` headers.
+    Stored responses are revalidated with every request, so they are
+    always up to date, but the server does not send them again if they
+    have not changed. This speeds up new sessions that read the same
+    objects as the previous ones. Size and age of stored responses are
+    limited (see :class:`~resdk.cache.DiskCache`). Cache is available as
+    ``disk_cache`` attribute and can be cleared with
+    ``res.disk_cache.clear()``.
+
+    If ``identity_map`` is enabled, queries return the same resource
+    for the same object on the server (for example ``data.sample`` and
+    ``collection.samples`` share sample objects). Returned resources are
+    updated with the values from the server, so unsaved changes are
+    lost. The map is available as ``identity_map`` attribute.
 
     """
 
-    def __init__(self, username=None, password=None, url=None):
+    def __init__(self, username=None, password=None, url=None, pool_size=POOL_SIZE,
+                 max_retries=MAX_RETRIES, cache=False, disk_cache=False,
+                 identity_map=False):
         """Initialize attributes."""
         if url is None:
             # Try to get URL from environmental variable, otherwise fallback to default.
@@ -95,8 +186,39 @@ class Resolwe(object):
             password = os.environ.get('RESOLWE_API_PASSWORD', None)
 
         self.url = url
-        self.auth = ResAuth(username, password, url)
-        self.api = ResolweAPI(urljoin(url, '/api/'), self.auth, append_slash=False)
+        if disk_cache is True:
+            disk_cache = DiskCache()
+        elif disk_cache is False:
+            disk_cache = None
+        self.disk_cache = disk_cache
+        #: number of keep-alive connections to the server, concurrent
+        #: transfers are limited to it
+        self.pool_size = pool_size
+        self.session = self._create_session(pool_size, max_retries, disk_cache)
+        self.auth = ResAuth(username, password, url, session=self.session)
+        self.session.auth = self.auth
+        if disk_cache is not None:
+            # Responses are stored separately for each user
+            for adapter in self.session.adapters.values():
+                adapter.user = self.auth.username
+        self.api = ResolweAPI(
+            urljoin(url, '/api/'), self.auth, append_slash=False, session=self.session
+        )
+
+        if cache is True:
+            cache = ResponseCache()
+        elif cache is False:
+            cache = None
+        #: cache of API responses (``None`` if disabled)
+        self.cache = cache
+        self.api._store['cache'] = self.cache  # pylint: disable=protected-access
+
+        if identity_map is True:
+            identity_map = IdentityMap()
+        elif identity_map is False:
+            identity_map = None
+        #: map of loaded resources (``None`` if disabled)
+        self.identity_map = identity_map
 
         self.data = ResolweQuery(self, Data)
         self.collection = ResolweQuery(self, Collection)
@@ -109,6 +231,9 @@ class Resolwe(object):
         self.feature = ResolweQuery(self, Feature)
         self.mapping = ResolweQuery(self, Mapping)
 
+        self._upload_journal = None
+        self._upload_journal_lock = threading.Lock()
+
         self.logger = logging.getLogger(__name__)
 
     def __repr__(self):
@@ -117,6 +242,52 @@ class Resolwe(object):
             return "Resolwe <url: {}, username: {}>".format(self.url, self.auth.username)
         return "Resolwe <url: {}>".format(self.url)
 
+    @property
+    def upload_journal(self):
+        """Return journal of unfinished uploads.
+
+        Journal is created when it is first needed.
+
+        :rtype: ~resdk.transfer.UploadJournal
+
+        """
+        if self._upload_journal is None:
+            with self._upload_journal_lock:
+                if self._upload_journal is None:
+                    self._upload_journal = UploadJournal()
+        return self._upload_journal
+
+    def _create_session(self, pool_size, max_retries, disk_cache=None):
+        """Create HTTP session with a pool of keep-alive connections.
+
+        Idempotent requests are retried on connection errors and on
+        temporary server errors.
+
+        :param int pool_size: number of connections kept alive per host
+        :param int max_retries: number of retries
+        :param disk_cache: cache of responses stored on disk
+        :type disk_cache: ~resdk.cache.DiskCache
+
+        :rtype: requests.Session
+
+        """
+        retry = Retry(
+            total=max_retries,
+            backoff_factor=0.5,
+            status_forcelist=(502, 503, 504),
+            raise_on_status=False,
+        )
+        kwargs = {'pool_connections': pool_size, 'pool_maxsize': pool_size, 'max_retries': retry}
+        if disk_cache is None:
+            adapter = HTTPAdapter(**kwargs)
+        else:
+            adapter = CachingHTTPAdapter(disk_cache, **kwargs)
+
+        session = requests.Session()
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return session
+
     def _register(self, src, slug):
         """Register processes on the server.
 
@@ -311,6 +482,32 @@ class Resolwe(object):
 
         return inputs
 
+    def _data_payload(self, process, input, descriptor=None,  # pylint: disable=redefined-builtin
+                      descriptor_schema=None, collections=(), data_name=''):
+        """Return payload of the data object that runs the process.
+
+        Files referenced in inputs are uploaded and data objects and
+        collections are dehydrated to their ids.
+        """
+        data = {
+            'process': process.slug,
+            'input': self._process_inputs(input, process),
+        }
+
+        if data_name:
+            data['name'] = data_name
+
+        if descriptor and descriptor_schema:
+            data['descriptor'] = descriptor
+            data['descriptor_schema'] = descriptor_schema
+
+        # Dehydrate `collections` list
+        collections = [get_collection_id(collection) for collection in collections]
+        if collections:
+            data['collections'] = collections
+
+        return data
+
     def run(self, slug=None, input={}, descriptor=None,  # pylint: disable=redefined-builtin
             descriptor_schema=None, collections=[],
             data_name='', src=None, tools=None):
@@ -354,28 +551,8 @@ class Resolwe(object):
             self._upload_tools(tools)
 
         process = self._get_process(slug)
-        inputs = self._process_inputs(input, process)
-
-        # Dehydrate `collections` list
-        dehydrated_collections = []
-        for collection in collections:
-            dehydrated_collections.append(get_collection_id(collection))
-        collections = dehydrated_collections
-
-        data = {
-            'process': process.slug,
-            'input': inputs,
-        }
-
-        if data_name:
-            data['name'] = data_name
-
-        if descriptor and descriptor_schema:
-            data['descriptor'] = descriptor
-            data['descriptor_schema'] = descriptor_schema
-
-        if collections:
-            data['collections'] = collections
+        data = self._data_payload(process, input, descriptor, descriptor_schema, collections,
+                                  data_name)
 
         model_data = self.api.data.post(data)
         return Data(resolwe=self, **model_data)
@@ -387,77 +564,240 @@ class Resolwe(object):
         :param dict input: Input values
         """
         process = self._get_process(slug)
-        inputs = self._process_inputs(input, process)
-
-        data = {
-            'process': process.slug,
-            'input': inputs,
-        }
+        data = self._data_payload(process, input)
 
         model_data = self.api.data.get_or_create.post(data)
         return Data(resolwe=self, **model_data)
 
-    def _upload_file(self, file_path):
+    def run_many(self, specs, max_workers=RUN_MAX_WORKERS, get_or_run=False, progress=None):
+        """Run many processes and return the corresponding Data objects.
+
+        Each spec is a dictionary with arguments of :meth:`run`:
+        ``slug``, ``input`` and optional ``descriptor``,
+        ``descriptor_schema``, ``collections`` and ``data_name``. Spec
+        can also contain a ``sample`` (or a collection) to which the
+        created data object is added:
+
+        .. code-block:: python
+
+            specs = [
+                {'slug': 'alignment-hisat2', 'sample': sample,
+                 'input': {'genome': genome, 'reads': sample.get_reads()}}
+                for sample in collection.samples
+            ]
+            data_list = res.run_many(specs, max_workers=20)
+
+        Each distinct process is fetched only once and up to
+        ``max_workers`` data objects are created concurrently. Data
+        objects of the same sample are added to it with a single
+        request.
+
+        Errors do not stop other processes from running. Returned list
+        contains the created data object for each spec (in the order of
+        specs) or the exception raised while running it.
+
+        :param list specs: arguments of the processes to run
+        :param int max_workers: number of data objects created
+            concurrently
+        :param bool get_or_run: return existing data objects with the
+            same inputs instead of creating new ones (see
+            :meth:`get_or_run`)
+        :param progress: function called with the spec and the created
+            data object (or the error) as soon as each spec is finished
+
+        :return: data objects and errors in the order of specs
+        :rtype: list
+
+        """
+        specs = list(specs)
+        endpoint = self.api.data.get_or_create if get_or_run else self.api.data
+
+        processes = {}
+        for spec in specs:
+            slug = spec.get('slug')
+            if slug not in processes:
+                try:
+                    processes[slug] = self._get_process(slug)
+                except Exception as error:  # pylint: disable=broad-except
+                    processes[slug] = error
+
+        def run_spec(spec):
+            """Create data object of the spec, return error if it fails."""
+            spec = dict(spec)
+            try:
+                process = processes[spec.pop('slug', None)]
+                if isinstance(process, Exception):
+                    raise process
+
+                descriptor = spec.get('descriptor')
+                descriptor_schema = spec.get('descriptor_schema')
+                if bool(descriptor) != bool(descriptor_schema):
+                    raise ValueError("Set both or neither descriptor and descriptor_schema.")
+
+                spec.pop('sample', None)
+                spec['input'] = spec.get('input') or {}
+                model_data = endpoint.post(self._data_payload(process, **spec))
+                return Data(resolwe=self, **model_data)
+            except Exception as error:  # pylint: disable=broad-except
+                return error
+
+        def run_indexed(item):
+            """Run spec with given index."""
+            index, spec = item
+            return index, run_spec(spec)
+
+        results = [None] * len(specs)
+        pool = None
+        if max_workers > 1 and len(specs) > 1:
+            pool = ThreadPool(min(max_workers, len(specs)))
+        try:
+            imap = pool.imap_unordered if pool is not None else six.moves.map
+            for index, result in imap(run_indexed, enumerate(specs)):
+                results[index] = result
+                if progress is not None:
+                    progress(specs[index], result)
+        finally:
+            if pool is not None:
+                pool.terminate()
+                pool.join()
+
+        # Add data objects to samples, one request per sample
+        samples = OrderedDict()
+        for index, (spec, result) in enumerate(zip(specs, results)):
+            sample = spec.get('sample')
+            if sample is None or isinstance(result, Exception):
+                continue
+            key = (sample.__class__, sample.id)
+            samples.setdefault(key, (sample, []))[1].append(index)
+
+        for sample, indices in samples.values():
+            try:
+                sample.add_data(*[results[index] for index in indices])
+            except Exception as error:  # pylint: disable=broad-except
+                for index in indices:
+                    results[index] = error
+
+        return results
+
+    def wait(self, data_list, timeout=None, poll=WAIT_POLL_INTERVAL,
+             max_poll=WAIT_MAX_POLL_INTERVAL):
+        """Wait until data objects are processed.
+
+        Statuses of all unfinished data objects are checked with a
+        single request (per batch of ids) that returns only their ids
+        and statuses. Each data object is updated and yielded as soon as
+        its processing is finished (successfully or not), so objects are
+        yielded in the order in which they finish:
+
+        .. code-block:: python
+
+            for data in res.wait(data_list, timeout=3600):
+                if data.status == 'ER':
+                    print(data.process_error)
+
+        Interval between checks starts at ``poll`` seconds and is
+        doubled (up to ``max_poll`` seconds) after every check in which
+        no object finished. Objects that are deleted on the server while
+        waiting are not yielded (a warning is logged).
+
+        :param data_list: data objects to wait for
+        :type data_list: list of Data objects
+        :param float timeout: maximal time to wait in seconds, objects
+            not finished in time are not yielded
+        :param float poll: initial interval between checks in seconds
+        :param float max_poll: maximal interval between checks in seconds
+
+        :return: generator of finished data objects
+
+        """
+        busy_statuses = ('UP', 'RE', 'WT', 'PR')
+        pending = OrderedDict((data.id, data) for data in data_list)
+        start_time = time.time()
+        interval = poll
+
+        while pending:
+            finished = []
+            missing = set(pending)
+            # pylint: disable=protected-access
+            for batch in self.data._batches(pending):
+                statuses = self.data.filter(
+                    id__in=','.join(str(id_) for id_ in batch)
+                ).values_list('id', 'status', page_size=len(batch))
+                for id_, status in statuses:
+                    missing.discard(id_)
+                    if status not in busy_statuses:
+                        finished.append(id_)
+
+            # Finished objects are refreshed from raw payloads fetched with
+            # a single request per batch.
+            refreshed = {}
+            for batch in self.data._batches(finished):
+                query = self.data.filter(id__in=','.join(str(id_) for id_ in batch))
+                for page in query._raw_pages(None, len(batch)):
+                    refreshed.update((payload['id'], payload) for payload in page)
+            missing.update(id_ for id_ in finished if id_ not in refreshed)
+            if missing:
+                self.logger.warning(
+                    "Data objects %s do not exist (anymore).",
+                    ', '.join(str(id_) for id_ in sorted(missing)))
+                for id_ in missing:
+                    del pending[id_]
+
+            for id_ in finished:
+                if id_ in refreshed:
+                    data = pending.pop(id_)
+                    data._update_fields(refreshed[id_])
+                    yield data
+
+            if not pending:
+                return
+
+            interval = poll if finished else min(2 * interval, max(poll, max_poll))
+            if timeout is not None:
+                remaining = timeout - (time.time() - start_time)
+                if remaining <= 0:
+                    self.logger.warning(
+                        "Data objects %s are not processed in %s seconds.",
+                        ', '.join(str(id_) for id_ in pending), timeout)
+                    return
+                interval = min(interval, remaining)
+
+            time.sleep(interval)
+
+    def _upload_file(self, file_path, max_inflight=UPLOAD_INFLIGHT_CHUNKS):
         """Upload a single file on the platform.
 
-        File is uploaded in chunks of size CHUNK_SIZE bytes.
+        File is uploaded in chunks, up to ``max_inflight`` of them
+        concurrently. Accepted chunks are recorded in the upload journal,
+        so if the upload is interrupted, uploading the same file again
+        continues from the last accepted chunk.
 
         :param str file_path: File path
+        :param int max_inflight: number of chunks uploaded concurrently
 
         """
-        response = None
-        chunk_number = 0
-        session_id = str(uuid.uuid4())
-        file_uid = str(uuid.uuid4())
-        file_size = os.path.getsize(file_path)
-        base_name = os.path.basename(file_path)
-
-        with open(file_path, 'rb') as file_:
-            while True:
-                chunk = file_.read(CHUNK_SIZE)
-                if not chunk:
-                    break
-
-                for i in range(5):
-                    if i > 0 and response is not None:
-                        self.logger.warning(
-                            "Chunk upload failed (error %s): repeating for chunk number %s",
-                            response.status_code,
-                            chunk_number)
-
-                    response = requests.post(
-                        urljoin(self.url, 'upload/'),
-                        auth=self.auth,
-
-                        # request are smart and make
-                        # 'CONTENT_TYPE': 'multipart/form-data;''
-                        files={'file': (base_name, chunk)},
-
-                        # stuff in data will be in response.POST on server
-                        data={
-                            '_chunkSize': CHUNK_SIZE,
-                            '_totalSize': file_size,
-                            '_chunkNumber': chunk_number,
-                            '_currentChunkSize': len(chunk)},
-                        headers={
-                            'Session-Id': session_id,
-                            'X-File-Uid': file_uid}
-                    )
+        uploader = Uploader(self, max_inflight=max_inflight, journal=self.upload_journal,
+                            pool_size=self.pool_size)
+        return uploader.upload(file_path)
+
+    def _get_download_dir(self, download_dir=None):
+        """Return download directory and check that it exists.
 
-                    if response.status_code in [200, 201]:
-                        break
-                else:
-                    # Upload of a chunk failed (5 retries)
-                    return None
+        :param download_dir: download directory, defaults to the current
+            working directory
+        :type download_dir: string
+        :rtype: string
 
-                progress = 100. * (chunk_number * CHUNK_SIZE + len(chunk)) / file_size
-                message = "{:.0f} % Uploaded {}".format(progress, file_path)
-                self.logger.info(message)
-                chunk_number += 1
+        """
+        if not download_dir:
+            download_dir = os.getcwd()
+
+        if not os.path.isdir(download_dir):
+            raise ValueError("Download directory does not exist: {}".format(download_dir))
 
-        return response.json()['files'][0]['temp']
+        return download_dir
 
-    def _download_files(self, files, download_dir=None):  # pylint: disable=redefined-builtin
+    def _download_files(self, files, download_dir=None, max_workers=1, progress=None):
         """Download files.
 
         Download files from the Resolwe server to the download
@@ -467,42 +807,50 @@ class Resolwe(object):
         :type files: list of file URI
         :param download_dir: download directory
         :type download_dir: string
+        :param int max_workers: number of files downloaded concurrently
+        :param progress: function called with the file URI, the number
+            of its downloaded bytes and its total size (see
+            :class:`~resdk.transfer.Downloader`)
         :rtype: None
 
         """
-        if not download_dir:
-            download_dir = os.getcwd()
-
-        if not os.path.isdir(download_dir):
-            raise ValueError("Download directory does not exist: {}".format(download_dir))
+        download_dir = self._get_download_dir(download_dir)
 
         if not files:
             self.logger.info("No files to download.")
 
         else:
             self.logger.info("Downloading files to %s:", download_dir)
+            downloader = Downloader(self, download_dir, max_workers=max_workers,
+                                    progress=progress, pool_size=self.pool_size)
+            downloader.download(files)
 
-            for file_uri in files:
-                file_name = os.path.basename(file_uri)
-                file_path = os.path.dirname(file_uri)
-                file_url = urljoin(self.url, 'data/{}'.format(file_uri))
+    def _download_data(self, data_objects, file_name=None, field_name=None, download_dir=None,
+                       max_workers=1, progress=None):
+        """Download files of data objects.
 
-                # Remove data id from path
-                file_path = file_path.split('/', 1)[1] if '/' in file_path else ''
-                full_path = os.path.join(download_dir, file_path)
-                if not os.path.isdir(full_path):
-                    os.makedirs(full_path)
+        Listing files of data objects is overlapped with downloading
+        files of the data objects that were already listed.
 
-                self.logger.info("* %s", os.path.join(file_path, file_name))
+        :param data_objects: data objects whose files are downloaded
+        :type data_objects: list of Data objects
+        :param str file_name: download only files with given name
+        :param str field_name: download only files in given output field
+        :param download_dir: download directory
+        :type download_dir: string
+        :param int max_workers: number of files downloaded concurrently
+        :param progress: function called with the file URI, the number
+            of its downloaded bytes and its total size (see
+            :class:`~resdk.transfer.Downloader`)
+        :rtype: None
 
-                with open(os.path.join(download_dir, file_path, file_name), 'wb') as file_handle:
-                    response = requests.get(file_url, stream=True, auth=self.auth)
+        """
+        download_dir = self._get_download_dir(download_dir)
 
-                    if not response.ok:
-                        response.raise_for_status()
-                    else:
-                        for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
-                            file_handle.write(chunk)
+        self.logger.info("Downloading files to %s:", download_dir)
+        downloader = Downloader(self, download_dir, max_workers=max_workers, progress=progress,
+                                pool_size=self.pool_size)
+        downloader.download_data(data_objects, file_name, field_name)
 
 
 class ResAuth(requests.auth.AuthBase):
@@ -511,6 +859,8 @@ class ResAuth(requests.auth.AuthBase):
     :param str username: user's username
     :param str password: user's password
     :param str url: Resolwe server address
+    :param session: HTTP session used to log in
+    :type session: requests.Session
 
     """
 
@@ -519,10 +869,13 @@ class ResAuth(requests.auth.AuthBase):
     #: CSRF token used in HTTP requests
     csrftoken = None
 
-    def __init__(self, username=None, password=None, url=DEFAULT_URL):
+    def __init__(self, username=None, password=None, url=DEFAULT_URL, session=None):
         """Authenticate user on Resolwe server."""
         self.logger = logging.getLogger(__name__)
 
+        if session is None:
+            session = requests.Session()
+
         self.username = username
         self.url = url
 
@@ -532,7 +885,7 @@ class ResAuth(requests.auth.AuthBase):
         payload = {'username': username, 'password': password}
 
         try:
-            response = requests.post(urljoin(url, '/rest-auth/login/'), data=payload)
+            response = session.post(urljoin(url, '/rest-auth/login/'), data=payload)
         except ConnectionError:
             raise ValueError('Server not accessible on {}. Wrong url?'.format(url))
 
@@ -25,12 +25,18 @@ Resource classes
 .. autoclass:: resdk.resources.Relation
    :members:
 
+.. autoclass:: resdk.resources.relation.RelationIndex
+   :members:
+
 .. autoclass:: resdk.resources.Process
    :members:
 
 .. autoclass:: resdk.resources.User
    :members:
 
+.. autoclass:: resdk.resources.record.Record
+   :members:
+
 Permissions
 ===========
 
@@ -1,15 +1,60 @@
 """Constants and abstract classes."""
 from __future__ import absolute_import, division, print_function, unicode_literals
 
-import copy
 import logging
 import operator
 
 import six
+from six.moves import cPickle as pickle  # pylint: disable=import-error
 
 from .permissions import PermissionsManager
 
 
+class Snapshot(object):
+    """Frozen copy of a mutable value.
+
+    Value is pickled, which is several times faster than copying it
+    with :func:`copy.deepcopy`, and it is unpickled only if comparison
+    of pickled values is not conclusive.
+
+    """
+
+    __slots__ = ('pickled',)
+
+    def __init__(self, value):
+        """Pickle the value."""
+        self.pickled = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+
+    def differs(self, value):
+        """Return ``True`` if value is different from the snapshot."""
+        try:
+            if pickle.dumps(value, pickle.HIGHEST_PROTOCOL) == self.pickled:
+                return False
+        except (pickle.PicklingError, TypeError, AttributeError):
+            pass
+
+        # Equal values can be pickled differently (i.e. 1 and 1.0)
+        return pickle.loads(self.pickled) != value
+
+
+def snapshot(value):
+    """Return snapshot of mutable (dict or list) value or value itself."""
+    if isinstance(value, (dict, list)):
+        return Snapshot(value)
+    return value
+
+
+def value_changed(original, value):
+    """Return ``True`` if value is different from the original one.
+
+    :param original: original value or its snapshot
+
+    """
+    if isinstance(original, Snapshot):
+        return original.differs(value)
+    return value != original
+
+
 class BaseResource(object):
     """Abstract resource.
 
@@ -32,6 +77,13 @@ class BaseResource(object):
 
     ALL_PERMISSIONS = []  # override this in subclass
 
+    #: related objects that can be prefetched (see ``ResolweQuery.prefetch``),
+    #: mapped to name of the Resolwe query and the filter used to load them
+    PREFETCH_RELATED = {}
+
+    #: fields not loaded from the server yet (see ``ResolweQuery.only``)
+    _deferred_fields = frozenset()
+
     def __init__(self, resolwe, **model_data):
         """Verify that only a single attribute of slug, id or model_data given."""
         self._original_values = {}
@@ -62,12 +114,51 @@ class BaseResource(object):
     def _update_fields(self, payload):
         """Update fields of the local resource based on the server values.
 
+        Deferred fields that are not in the payload are not set, they
+        are loaded from the server when they are first accessed.
+
+        Original values are kept to detect changes on save, mutable
+        values as snapshots (see :func:`snapshot`).
+
         :param dict payload: Resource field values
 
         """
-        self._original_values = copy.deepcopy(payload)
+        self._deferred_fields = frozenset(
+            field_name for field_name in self._deferred_fields if field_name not in payload
+        )
+        self._original_values = {
+            field_name: snapshot(value) for field_name, value in six.iteritems(payload)
+        }
         for field_name in self.fields():
-            setattr(self, field_name, payload.get(field_name, None))
+            if field_name in self._deferred_fields:
+                self.__dict__.pop(field_name, None)
+            else:
+                setattr(self, field_name, payload.get(field_name, None))
+
+    def _load_deferred_fields(self):
+        """Load values of deferred fields from the server."""
+        deferred_fields = self._deferred_fields
+        response = self.api(self.id).get(fields=','.join(sorted(deferred_fields | {'id'})))
+
+        self._deferred_fields = frozenset()
+        for field_name in deferred_fields:
+            value = response.get(field_name, None)
+            self._original_values[field_name] = snapshot(value)
+            setattr(self, field_name, value)
+
+    def __getattr__(self, name):
+        """Load deferred field when it is first accessed."""
+        if name in self.__dict__.get('_deferred_fields', ()):
+            self._load_deferred_fields()
+            return self.__dict__[name]
+
+        if isinstance(getattr(type(self), name, None), property):
+            # Don't evaluate the property again, it may make requests
+            raise AttributeError("Property '{}' of '{}' object raised AttributeError".format(
+                name, type(self).__name__))
+
+        raise AttributeError(
+            "'{}' object has no attribute '{}'".format(type(self).__name__, name))
 
     def update(self):
         """Update resource fields from the server."""
@@ -88,7 +179,9 @@ class BaseResource(object):
         """Save resource to the server."""
         def field_changed(field_name):
             """Check if local field value is different from the server."""
-            return getattr(self, field_name) != self._original_values.get(field_name)
+            if field_name in self._deferred_fields:
+                return False  # not loaded, so it cannot be changed
+            return value_changed(self._original_values.get(field_name), getattr(self, field_name))
 
         def assert_fields_changed(field_names):
             """Check if local field value is different from the server."""
@@ -131,17 +224,27 @@ class BaseResource(object):
 
         self.api(self.id).delete()
 
+        if self.resolwe.identity_map is not None:
+            self.resolwe.identity_map.discard(self)
+
     def __setattr__(self, name, value):
         """Detect changes of read only fields.
 
         This method detects changes of scalar fields and references. A
         more comprehensive check is called before save.
 
+        Setting a deferred field overrides its value on the server, so
+        it is not loaded anymore.
+
         """
-        if (hasattr(self, '_original_values')
-                and name in self._original_values
+        if name in self._deferred_fields:
+            self._deferred_fields = self._deferred_fields - {name}
+
+        original_values = self.__dict__.get('_original_values')
+        if (original_values
+                and name in original_values
                 and name in self.READ_ONLY_FIELDS
-                and value != self._original_values[name]):
+                and value_changed(original_values[name], value)):
             raise ValueError("Can not change read only field {}".format(name))
 
         super(BaseResource, self).__setattr__(name, value)
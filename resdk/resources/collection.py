@@ -24,6 +24,8 @@ class BaseCollection(BaseResolweResource):
 
     #: lazy loaded list of data objects
     _data = None
+    #: (lazy loaded) list of data types
+    _data_types = None
 
     WRITABLE_FIELDS = ('description', 'settings', 'descriptor_schema',
                        'descriptor') + BaseResolweResource.WRITABLE_FIELDS
@@ -84,12 +86,14 @@ class BaseCollection(BaseResolweResource):
     def update(self):
         """Clear cache and update resource fields from the server."""
         self._hydrated_descriptor_schema = None
+        self._data_types = None
 
         super(BaseCollection, self).update()
 
     def _clear_data_cache(self):
         """Clear data cache."""
         self._data = None
+        self._data_types = None
 
     def add_data(self, *data):
         """Add ``data`` objects to the collection."""
@@ -106,11 +110,19 @@ class BaseCollection(BaseResolweResource):
     def data_types(self):
         """Return a list of data types (process_type).
 
+        Data types are cached until the collection is updated or data
+        objects are added to or removed from it.
+
         :rtype: List
 
         """
-        process_types = set(self.resolwe.api.data(id_).get()['process_type'] for id_ in self.data)
-        return sorted(process_types)
+        if self._data_types is None:
+            self._data_types = sorted(
+                process_type for process_type in self.data.distinct('process_type')
+                if process_type is not None
+            )
+
+        return self._data_types
 
     def files(self, file_name=None, field_name=None):
         """Return list of files in resource."""
@@ -121,7 +133,8 @@ class BaseCollection(BaseResolweResource):
 
         return file_list
 
-    def download(self, file_name=None, file_type=None, download_dir=None):
+    def download(self, file_name=None, file_type=None, download_dir=None, max_workers=1,
+                 progress=None):
         """Download output files of associated Data objects.
 
         Download files from the Resolwe server to the download
@@ -133,6 +146,10 @@ class BaseCollection(BaseResolweResource):
         :type file_type: string
         :param download_dir: download path
         :type download_dir: string
+        :param int max_workers: number of files downloaded concurrently
+        :param progress: function called with the file URI, the number
+            of its downloaded bytes and its total size (``None`` if
+            unknown) whenever a part of the file is downloaded
         :rtype: None
 
         Collections can contain multiple Data objects and Data objects
@@ -142,17 +159,19 @@ class BaseCollection(BaseResolweResource):
         * re.collection.get(42).download(file_name='alignment7.bam')
         * re.collection.get(42).download(data_type='bam')
 
-        """
-        files = []
+        To download several files at once, set ``max_workers``:
+
+        * re.collection.get(42).download(max_workers=8)
 
+        """
         if file_type and not isinstance(file_type, six.string_types):
             raise ValueError("Invalid argument value `file_type`.")
 
-        for data in self.data:
-            data_files = data.files(file_name, file_type)
-            files.extend('{}/{}'.format(data.id, file_name) for file_name in data_files)
-
-        self.resolwe._download_files(files, download_dir)  # pylint: disable=protected-access
+        # pylint: disable=protected-access
+        self.resolwe._download_data(
+            self.data, file_name, file_type, download_dir, max_workers=max_workers,
+            progress=progress,
+        )
 
     def print_annotation(self):
         """Provide annotation data."""
@@ -173,6 +192,10 @@ class Collection(CollectionRelationsMixin, BaseCollection):
 
     endpoint = 'collection'
 
+    PREFETCH_RELATED = {
+        'data': ('data', 'collection'),
+    }
+
     #: (lazy loaded) list of samples that belong to collection
     _samples = None
 
@@ -4,7 +4,6 @@ from __future__ import absolute_import, division, print_function, unicode_litera
 import json
 import logging
 
-import requests
 from six.moves.urllib.parse import urljoin  # pylint: disable=wrong-import-order
 
 from resdk.constants import CHUNK_SIZE
@@ -43,14 +42,18 @@ class Data(BaseResolweResource):
 
     ALL_PERMISSIONS = ['view', 'download', 'edit', 'share', 'owner']
 
+    PREFETCH_RELATED = {
+        'collections': ('collection', 'data'),
+    }
+
     def __init__(self, resolwe, **model_data):
         """Initialize attributes."""
         #: descriptor schema id in which data object is
         self._descriptor_schema = None
         #: (lazy loaded) descriptor schema object in which data object is
         self._hydrated_descriptor_schema = None
-        #: Flattened dict of inputs and outputs, where keys are dit separated paths to values
-        self.annotation = {}
+        #: (lazy loaded) flattened dict of inputs and outputs
+        self._annotation = None
 
         #: specification of inputs
         self.process_input_schema = None
@@ -111,17 +114,40 @@ class Data(BaseResolweResource):
         """
         BaseResolweResource._update_fields(self, payload)
 
-        if 'input' in payload and 'process_input_schema' in payload:
-            self.annotation.update(
-                self._flatten_field(payload['input'], payload['process_input_schema'], 'input')
-            )
+        # Annotation is flattened again when it is accessed
+        self._annotation = None
 
-        if 'output' in payload and 'process_output_schema' in payload:
-            self.annotation.update(
-                self._flatten_field(payload['output'], payload['process_output_schema'], 'output')
-            )
+    @property
+    def annotation(self):
+        """Return flattened dict of inputs and outputs.
+
+        Keys are dot separated paths to values. Annotation is computed
+        when it is first accessed.
+
+        """
+        if self._annotation is None:
+            annotation = {}
+
+            if self.input is not None and self.process_input_schema is not None:
+                annotation.update(
+                    self._flatten_field(self.input, self.process_input_schema, 'input')
+                )
+
+            if self.output is not None and self.process_output_schema is not None:
+                annotation.update(
+                    self._flatten_field(self.output, self.process_output_schema, 'output')
+                )
+
+            # TODO: Descriptor schema!
+
+            self._annotation = annotation
+
+        return self._annotation
 
-        # TODO: Descriptor schema!
+    @annotation.setter
+    def annotation(self, annotation):
+        """Set annotation."""
+        self._annotation = annotation
 
     def _flatten_field(self, field, schema, path):
         """Reduce dicts of dicts to dot separated keys.
@@ -229,7 +255,7 @@ class Data(BaseResolweResource):
         dir_url = urljoin(self.resolwe.url, 'data/{}/{}'.format(self.id, dir_name))
         if not dir_url.endswith('/'):
             dir_url += '/'
-        response = requests.get(dir_url, auth=self.resolwe.auth)
+        response = self.resolwe.session.get(dir_url)
         response = json.loads(response.content.decode('utf-8'))
 
         for obj in response:
@@ -267,7 +293,8 @@ class Data(BaseResolweResource):
 
         return file_list
 
-    def download(self, file_name=None, field_name=None, download_dir=None):
+    def download(self, file_name=None, field_name=None, download_dir=None, max_workers=1,
+                 progress=None):
         """Download Data object's files and directories.
 
         Download files and directoriesfrom the Resolwe server to the
@@ -279,6 +306,10 @@ class Data(BaseResolweResource):
         :type field_name: string
         :param download_dir: download path
         :type download_dir: string
+        :param int max_workers: number of files downloaded concurrently
+        :param progress: function called with the file URI, the number
+            of its downloaded bytes and its total size (``None`` if
+            unknown) whenever a part of the file is downloaded
         :rtype: None
 
         Data objects can contain multiple files and directories. All are
@@ -293,7 +324,9 @@ class Data(BaseResolweResource):
             raise ValueError("Only one of file_name or field_name may be given.")
 
         files = ['{}/{}'.format(self.id, fname) for fname in self.files(file_name, field_name)]
-        self.resolwe._download_files(files, download_dir)  # pylint: disable=protected-access
+        # pylint: disable=protected-access
+        self.resolwe._download_files(files, download_dir, max_workers=max_workers,
+                                     progress=progress)
 
     def print_annotation(self):
         """Provide annotation data."""
@@ -311,7 +344,7 @@ class Data(BaseResolweResource):
         """
         output = b''
         url = urljoin(self.resolwe.url, 'data/{}/stdout.txt'.format(self.id))
-        response = requests.get(url, stream=True, auth=self.resolwe.auth)
+        response = self.resolwe.session.get(url, stream=True)
         if not response.ok:
             response.raise_for_status()
         else:
@@ -4,6 +4,8 @@ from __future__ import absolute_import, division, print_function, unicode_litera
 import copy
 from collections import defaultdict
 
+import six
+
 from .utils import is_group, is_user
 
 
@@ -23,7 +25,24 @@ class PermissionsManager(object):
         if not isinstance(users, list):
             users = [users]
 
-        return [self.resolwe.user.get(user) if not is_user(user) else user for user in users]
+        # Users given by ids are fetched in bulk
+        user_ids = [
+            int(user) for user in users if not is_user(user) and six.text_type(user).isdigit()
+        ]
+        users_by_id = self.resolwe.user.in_bulk(user_ids) if user_ids else {}
+
+        fetched = []
+        for user in users:
+            if is_user(user):
+                fetched.append(user)
+            elif six.text_type(user).isdigit():
+                if int(user) not in users_by_id:
+                    raise LookupError('User with id {} does not exist.'.format(user))
+                fetched.append(users_by_id[int(user)])
+            else:
+                fetched.append(self.resolwe.user.get(user))
+
+        return fetched
 
     def _fetch_group(self, groups):
         if not isinstance(groups, list):
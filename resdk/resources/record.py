@@ -0,0 +1,157 @@
+"""Compact read-only representation of resources."""
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import six
+
+
+class Record(object):
+    """Compact read-only representation of a resource.
+
+    Records are returned by queries made with
+    :meth:`resdk.ResolweQuery.compact`. Fields of the resource are
+    stored in slots, so a record takes only a fraction of memory of the
+    full resource object.
+
+    Fields can be read as on the resource, but they cannot be changed.
+    Accessing any other attribute or method (for example ``files()``
+    or ``update()``) upgrades the record to the full resource, which can
+    also be done explicitly with :meth:`to_resource`. After the upgrade
+    all fields are read from (and written to) the resource, so changes
+    made by ``update()`` or ``save()`` are visible on the record.
+
+    :param resolwe: Resolwe instance
+    :type resolwe: Resolwe object
+    :param dict payload: Resource model data
+
+    """
+
+    __slots__ = ('_resolwe', '_properties', '_resource')
+
+    #: class of the represented resource
+    resource_class = None
+    #: fields of the resource stored in slots
+    FIELDS = frozenset()
+    #: fields implemented as properties of the resource
+    PROPERTY_FIELDS = frozenset()
+
+    def __init__(self, resolwe, payload):
+        """Initialize attributes."""
+        set_attribute = super(Record, self).__setattr__
+        set_attribute('_resolwe', resolwe)
+        set_attribute('_resource', None)
+
+        properties = {}
+        for field_name, value in six.iteritems(payload):
+            if field_name in self.FIELDS:
+                set_attribute(field_name, value)
+            elif field_name in self.PROPERTY_FIELDS:
+                properties[field_name] = value
+        set_attribute('_properties', properties)
+
+    def _payload(self):
+        """Return fields set on the record and names of the missing ones."""
+        payload = dict(self._properties)
+        missing = []
+        for field_name in self.FIELDS:
+            try:
+                payload[field_name] = super(Record, self).__getattribute__(field_name)
+            except AttributeError:
+                missing.append(field_name)
+
+        return payload, missing
+
+    def to_resource(self):
+        """Return the full resource represented by the record.
+
+        Fields not loaded in the record are loaded from the server when
+        they are first accessed on the resource. The resource is created
+        once and reused.
+
+        """
+        if self._resource is None:
+            payload, missing = self._payload()
+            # pylint: disable=not-callable,protected-access
+            resource = self.resource_class(resolwe=self._resolwe)
+            resource._deferred_fields = frozenset(missing)
+            resource._update_fields(payload)
+            super(Record, self).__setattr__('_resource', resource)
+
+        return self._resource
+
+    def __getattribute__(self, name):
+        """Read fields from the full resource once it is created."""
+        if name in type(self).FIELDS:
+            resource = object.__getattribute__(self, '_resource')
+            if resource is not None:
+                return getattr(resource, name)
+
+        return object.__getattribute__(self, name)
+
+    def __getattr__(self, name):
+        """Get attribute of the full resource."""
+        if name.startswith('__'):
+            raise AttributeError(name)
+
+        return getattr(self.to_resource(), name)
+
+    def __setattr__(self, name, value):
+        """Prevent changes of the record until it is upgraded to the resource."""
+        if self._resource is not None:
+            setattr(self._resource, name, value)
+            return
+
+        raise AttributeError(
+            "{} is read-only, use `to_resource()` to get a resource that can be "
+            "changed.".format(self.__class__.__name__)
+        )
+
+    def __eq__(self, obj):
+        """Evaluate if objects represent the same resource."""
+        resource_class = getattr(obj, 'resource_class', obj.__class__)
+        return self.resource_class == resource_class and self.id == obj.id
+
+    def __ne__(self, obj):
+        """Evaluate if objects represent different resources."""
+        return not self.__eq__(obj)
+
+    def __repr__(self):
+        """Format record name."""
+        return '{} <id: {}>'.format(self.__class__.__name__, self.id)
+
+
+_RECORD_CLASSES = {}
+
+
+def record_class(resource_class):
+    """Return record class of the given resource class.
+
+    Record class is created when it is first needed and reused after
+    that.
+
+    """
+    if resource_class not in _RECORD_CLASSES:
+        fields = set(
+            resource_class.WRITABLE_FIELDS
+            + resource_class.UPDATE_PROTECTED_FIELDS
+            + resource_class.READ_ONLY_FIELDS
+        )
+        property_fields = frozenset(
+            field_name for field_name in fields
+            if isinstance(getattr(resource_class, field_name, None), property)
+        )
+        slots = tuple(sorted(str(field_name) for field_name in fields - property_fields))
+
+        _RECORD_CLASSES[resource_class] = type(
+            str('{}Record'.format(resource_class.__name__)),
+            (Record,),
+            {
+                '__slots__': slots,
+                '__doc__': 'Compact read-only representation of {}.'.format(
+                    resource_class.__name__),
+                'resource_class': resource_class,
+                'FIELDS': frozenset(slots),
+                'PROPERTY_FIELDS': property_fields,
+            }
+        )
+
+    return _RECORD_CLASSES[resource_class]
@@ -1,7 +1,9 @@
 """Relation resource."""
 from __future__ import absolute_import, division, print_function, unicode_literals
 
+import collections
 import logging
+import threading
 
 import six
 
@@ -48,18 +50,23 @@ class Relation(BaseResolweResource):
 
         super(Relation, self).__init__(resolwe, **model_data)
 
-        #: list of the sample positions in the relation or `None` if none of the positions is set
+        self.logger = logging.getLogger(__name__)
+
+    @property
+    def positions(self):
+        """Return list of the sample positions in the relation.
+
+        ``None`` is returned if none of the positions is set.
+
+        """
         if self.entities is None:
-            self.positions = []
-        else:
-            self.positions = [
-                entity_obj.get('position', None)
-                for entity_obj in self.entities  # pylint: disable=not-an-iterable
-            ]
-        if not any(self.positions):
-            self.positions = None
+            return None
 
-        self.logger = logging.getLogger(__name__)
+        positions = [
+            entity_obj.get('position', None)
+            for entity_obj in self.entities  # pylint: disable=not-an-iterable
+        ]
+        return positions if any(positions) else None
 
     @property
     def samples(self):
@@ -72,12 +79,11 @@ class Relation(BaseResolweResource):
                     # pylint: disable=not-an-iterable
                     entity_obj['entity'] for entity_obj in self.entities
                 ]
-                self._samples = self.resolwe.sample.filter(id__in=','.join(map(str, sample_ids)))
+                samples = self.resolwe.sample.in_bulk(sample_ids)
                 # Samples should be sorted, so they have same order as positions
-                # XXX: This may be slow for many samples in single collection
-                self._samples = sorted(
-                    self._samples, key=lambda sample: sample_ids.index(sample.id)
-                )
+                self._samples = [
+                    samples[sample_id] for sample_id in sample_ids if sample_id in samples
+                ]
         return self._samples
 
     @property
@@ -144,3 +150,97 @@ class Relation(BaseResolweResource):
         )
 
         return rep.encode('utf-8') if six.PY2 else rep
+
+
+class RelationIndex(object):
+    """Index of relations by samples in them.
+
+    Relations are indexed by ids of their samples, so relations of many
+    samples can be found without making a request for each sample:
+
+    .. code-block:: python
+
+        index = RelationIndex.for_collection(res, collection)
+        for sample in collection.samples:
+            background = sample.get_background(relation_index=index)
+
+    Only the indexed relations are searched, so an index created with
+    :meth:`for_collection` does not find relations of the samples in
+    other collections.
+
+    Samples found in relations (for example backgrounds) are fetched
+    only once. Samples given in ``samples`` are used instead of fetching
+    them.
+
+    :param relations: relations to index
+    :type relations: list of Relation objects
+    :param samples: known samples of the relations
+    :type samples: list of Sample objects
+
+    """
+
+    def __init__(self, relations, samples=()):
+        """Initialize attributes."""
+        self.relations = list(relations)
+
+        self._relations = collections.defaultdict(list)
+        for relation in self.relations:
+            for entity_obj in relation.entities or []:
+                self._relations[entity_obj['entity']].append(
+                    (relation, entity_obj.get('position'))
+                )
+
+        self._samples = {sample.id: sample for sample in samples}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def for_collection(cls, resolwe, collection, samples=()):
+        """Return index of all relations in the collection.
+
+        Relations are fetched with a single query.
+
+        :param resolwe: Resolwe instance
+        :type resolwe: Resolwe object
+        :param collection: collection (or its id) of the relations
+        :param samples: known samples of the relations
+        :type samples: list of Sample objects
+
+        """
+        relations = resolwe.relation.filter(collection=get_collection_id(collection))
+        return cls(relations, samples)
+
+    def filter(self, sample, type=None, label=None,  # pylint: disable=redefined-builtin
+               position=None):
+        """Return relations of the sample.
+
+        :param sample: sample (or its id) in the relations
+        :param str type: type of the relations
+        :param str label: label of the relations
+        :param str position: position of the sample in the relations
+
+        :rtype: list of Relation objects
+
+        """
+        sample_relations = self._relations.get(get_sample_id(sample), [])
+        return [
+            relation for relation, sample_position in sample_relations
+            if (type is None or relation.type == type)
+            and (label is None or relation.label == label)
+            and (position is None or sample_position == position)
+        ]
+
+    def get_sample(self, sample_id):
+        """Return sample with given id, fetch it if it is not known."""
+        with self._lock:
+            sample = self._samples.get(sample_id)
+        if sample is None:
+            sample = self.relations[0].resolwe.sample.get(id=sample_id)
+            with self._lock:
+                sample = self._samples.setdefault(sample_id, sample)
+
+        return sample
+
+    def is_background(self, sample):
+        """Return ``True`` if given sample is background of another one."""
+        return bool(self.filter(sample, type='compare', label='background',
+                                position='background'))
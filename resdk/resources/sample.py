@@ -13,13 +13,37 @@ class SampleUtilsMixin(object):
 
     """
 
+    def _filter_data(self, process_type):
+        """Return query of data objects of the given type on the sample.
+
+        If data objects on the sample are already loaded (for example
+        with ``ResolweQuery.prefetch``), they are filtered without
+        making a request.
+
+        """
+        # pylint: disable=protected-access
+        data = self.data
+        query = data.filter(type=process_type)
+        if data._cache is not None:
+            query._cache = [
+                obj for obj in data._cache if (obj.process_type or '').startswith(process_type)
+            ]
+            query._count = len(query._cache)
+
+        return query
+
+    def _get_data(self, process_type):
+        """Return the only data object of the given type on the sample."""
+        query = self._filter_data(process_type)
+        return query._single(list(query))  # pylint: disable=protected-access
+
     def get_reads(self):
         """Return ``fastq`` object on the sample."""
-        return self.data.get(type='data:reads:fastq')
+        return self._get_data('data:reads:fastq')
 
     def get_bam(self):
         """Return ``bam`` object on the sample."""
-        return self.data.get(type='data:alignment:bam')
+        return self._get_data('data:alignment:bam')
 
     def get_primary_bam(self, fallback_to_bam=False):
         """Return ``primary bam`` object on the sample.
@@ -30,7 +54,7 @@ class SampleUtilsMixin(object):
 
         """
         try:
-            return self.data.get(type='data:alignment:bam:primary')
+            return self._get_data('data:alignment:bam:primary')
         except LookupError:
             if fallback_to_bam:
                 return self.get_bam()
@@ -39,15 +63,15 @@ class SampleUtilsMixin(object):
 
     def get_macs(self):
         """Return list of ``bed`` objects on the sample."""
-        return self.data.filter(type='data:chipseq:macs14')
+        return self._filter_data('data:chipseq:macs14')
 
     def get_cuffquant(self):
         """Return ``cuffquant`` object on the sample."""
-        return self.data.get(type='data:cufflinks:cuffquant')
+        return self._get_data('data:cufflinks:cuffquant')
 
     def get_expression(self):
         """Return ``expression`` object on the sample."""
-        return self.data.get(type='data:expression:')
+        return self._get_data('data:expression:')
 
 
 class Sample(SampleUtilsMixin, BaseCollection):
@@ -66,6 +90,11 @@ class Sample(SampleUtilsMixin, BaseCollection):
 
     WRITABLE_FIELDS = ('tags',) + BaseCollection.WRITABLE_FIELDS
 
+    PREFETCH_RELATED = {
+        'data': ('data', 'entity'),
+        'collections': ('collection', 'entity'),
+    }
+
     #: (lazy loaded) list of collections  to which object belongs
     _collections = None
 
@@ -117,18 +146,39 @@ class Sample(SampleUtilsMixin, BaseCollection):
         self.api(self.id).patch({'descriptor_completed': True})
         self.logger.info('Marked Sample %s as annotated', self.id)
 
-    def get_background(self, fail_silently=False, **extra_filters):
-        """Find background sample of the current one."""
-        background_relation = self.resolwe.relation.filter(
-            type='compare',
-            label='background',
-            entity=[self.id],
-            position=['sample'],
-            **extra_filters
-        )
+    def get_background(self, fail_silently=False, relation_index=None, **extra_filters):
+        """Find background sample of the current one.
+
+        If ``relation_index`` is given, background is found in it
+        without making a request. Only relations in the index are
+        searched (for example only relations of one collection). The
+        index is not used if ``extra_filters`` are given, relations are
+        then queried on the server.
+
+        :param bool fail_silently: return ``None`` instead of raising
+            an error if background is not found
+        :param relation_index: index of relations of the sample
+        :type relation_index: ~resdk.resources.relation.RelationIndex
+
+        """
+        if extra_filters:
+            relation_index = None
+
+        if relation_index is not None:
+            background_relation = relation_index.filter(
+                self, type='compare', label='background', position='sample'
+            )
+        else:
+            background_relation = self.resolwe.relation.filter(
+                type='compare',
+                label='background',
+                entity=[self.id],
+                position=['sample'],
+                **extra_filters
+            )
 
-        # Execute query to prevent multiple requests to api
-        background_relation = list(background_relation)
+            # Execute query to prevent multiple requests to api
+            background_relation = list(background_relation)
 
         if len(background_relation) > 1:
             raise LookupError(
@@ -137,6 +187,8 @@ class Sample(SampleUtilsMixin, BaseCollection):
         elif len(background_relation) == 1:
             for entity_obj in background_relation[0].entities:
                 if entity_obj['position'] == 'background':
+                    if relation_index is not None:
+                        return relation_index.get_sample(entity_obj['entity'])
                     return self.resolwe.sample.get(id=entity_obj['entity'])
         elif not fail_silently:
             raise LookupError(
@@ -171,21 +171,23 @@ def is_group(group):
     return type(group).__name__ == 'Group'
 
 
-def get_samples(resource):
+def get_samples(resource, prefetch=False):
     """Get the list of samples from given resources.
 
     Get the list of samples with:
     * use recursion if given resource is a list
     * return the resource if it is already the sample
     * call ResolweQuery object named `samples` (if exists) and return
-      the result
+      the result, data objects and collections of all samples are
+      prefetched (see ``ResolweQuery.prefetch``) if ``prefetch`` is
+      set to ``True``
     """
     error_msg = ("Resource should be sample, have `samples` query, be list of multiple "
                  "resources or be data object with not empty `sample` property.")
     if isinstance(resource, list):
         samples = []
         for res in resource:
-            samples.extend(get_samples(res))
+            samples.extend(get_samples(res, prefetch))
         return samples
 
     elif is_data(resource):
@@ -198,7 +200,13 @@ def get_samples(resource):
         return [resource]
 
     elif hasattr(resource, 'samples'):
-        return resource.samples
+        # pylint: disable=protected-access
+        from resdk.query import ResolweQuery  # Avoid circular import
+
+        samples = resource.samples
+        if prefetch and isinstance(samples, ResolweQuery) and samples._cache is None:
+            return samples.prefetch('data', 'collections')
+        return samples
 
     else:
         raise TypeError(error_msg)
@@ -240,12 +248,20 @@ def get_resolwe(*resources):
     return list(resolwes)[0]
 
 
-def is_background(sample):
-    """Return ``True`` if given sample is background and ``False`` otherwise."""
+def is_background(sample, relation_index=None):
+    """Return ``True`` if given sample is background and ``False`` otherwise.
+
+    If ``relation_index`` is given, relations of the sample are looked
+    up in it instead of making a request. Only relations in the index
+    are searched (for example only relations of one collection).
+    """
+    if relation_index is not None:
+        return relation_index.is_background(sample)
+
     background_relations = sample.resolwe.relation.filter(
         type='compare',
         label='background',
         entity=sample.id,
         position='background'
     )
-    return len(background_relations) > 0
+    return background_relations.exists()
@@ -159,12 +159,7 @@ class CollectionRelationsMixin(object):
 
         def sample_id_to_slug(id_):
             """Transform sample id to sample slug."""
-            if id_ in _samples_by_id:
-                return _samples_by_id[id_].slug
-            else:
-                # This is very unlikely to happen, so separate request for
-                # each case is not a problem
-                return self.resolwe.sample.get(id=id_).slug
+            return _samples_by_id[id_].slug
 
         def flatten_relations(relations):
             """Flaten list of relations if positions are not present."""
@@ -229,8 +224,17 @@ class CollectionRelationsMixin(object):
         # label is not set).
         relations = defaultdict(lambda: defaultdict(list))
 
+        missing_sample_ids = set()
         for rel in self.resolwe.relation.filter(collection=self.id):
             relations[rel.type][rel.label].append(rel)
+            missing_sample_ids.update(
+                obj['entity'] for obj in rel.entities if obj['entity'] not in _samples_by_id
+            )
+
+        # Samples in relations are very likely in the collection, fetch
+        # the others in bulk
+        if missing_sample_ids:
+            _samples_by_id.update(self.resolwe.sample.in_bulk(missing_sample_ids))
 
         relations = dict(relations)
         for rel_type in relations.keys():
@@ -0,0 +1,256 @@
+"""
+Unit tests for resdk/aio.py file.
+"""
+# pylint: disable=missing-docstring, protected-access
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from mock import MagicMock, patch
+
+from resdk.exceptions import ResolweServerError
+from resdk.query import ResolweQuery
+from resdk.resources import Data
+from resdk.transfer import Uploader
+
+try:
+    import asyncio
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+if aiohttp is not None:
+    from resdk.aio import AsyncResolwe, query_params
+
+
+def done(result=None):
+    future = asyncio.Future()
+    future.set_result(result)
+    return future
+
+
+class ChunksIterator(object):
+
+    def __init__(self, chunks):
+        self.chunks = list(chunks)
+
+    def __aiter__(self):
+        return self
+
+    def __anext__(self):
+        future = asyncio.Future()
+        if self.chunks:
+            future.set_result(self.chunks.pop(0))
+        else:
+            future.set_exception(StopAsyncIteration())  # pylint: disable=undefined-variable
+        return future
+
+
+class Response(object):
+
+    def __init__(self, status=200, content=None, chunks=()):
+        self.status = status
+        self._content = b'' if content is None else json.dumps(content).encode('utf-8')
+        self.content = MagicMock(**{'iter_chunked.return_value': ChunksIterator(chunks)})
+
+    def __aenter__(self):
+        return done(self)
+
+    def __aexit__(self, *exc_info):
+        return done()
+
+    def read(self):
+        return done(self._content)
+
+    def json(self, content_type=None):
+        return done(json.loads(self._content.decode('utf-8')))
+
+
+class UploadResponse(Response):
+
+    def __init__(self, data, **kwargs):
+        super(UploadResponse, self).__init__(**kwargs)
+        self.data = data
+        self.body = None
+
+    async def __aenter__(self):
+        self.body = b''.join([block async for block in self.data])
+        return self
+
+
+class PendingResponse(Response):
+
+    cancelled = False
+
+    async def __aenter__(self):
+        try:
+            await asyncio.Future()
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+
+
+@unittest.skipIf(aiohttp is None, 'aiohttp is not installed')
+class TestAsyncResolwe(unittest.TestCase):
+
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self.addCleanup(self.loop.close)
+
+        resolwe = MagicMock(url='http://some.url', identity_map=None)
+        resolwe.auth.sessionid = 'session'
+        resolwe.auth.csrftoken = 'token'
+        resolwe.data = ResolweQuery(resolwe, Data)
+        self.res = AsyncResolwe(resolwe=resolwe, max_concurrency=2)
+        self.session = MagicMock(**{'close.side_effect': lambda: done()})
+
+        with patch('resdk.aio.aiohttp') as aiohttp_mock:
+            aiohttp_mock.ClientSession.return_value = self.session
+            self.run_async(self.res.open())
+            self.assertEqual(aiohttp_mock.ClientSession.call_args[1]['headers'], {
+                'referer': 'http://some.url',
+                'Cookie': 'csrftoken=token; sessionid=session',
+                'X-CSRFToken': 'token',
+            })
+            aiohttp_mock.TCPConnector.assert_called_once_with(limit=2)
+
+    def run_async(self, coroutine):
+        return self.loop.run_until_complete(coroutine)
+
+    def test_query_params(self):
+        self.assertEqual(query_params({'status': ['OK', 'ER'], 'limit': 1}),
+                         [('limit', '1'), ('status', 'OK'), ('status', 'ER')])
+
+    def test_request(self):
+        self.session.request.return_value = Response(content={'id': 1})
+        self.assertEqual(self.run_async(self.res.request('GET', '/api/data/1')), {'id': 1})
+        self.session.request.assert_called_once_with('GET', 'http://some.url/api/data/1')
+
+        self.session.request.return_value = Response(status=204)
+        self.assertIsNone(self.run_async(self.res.request('DELETE', '/api/data/1')))
+
+        self.session.request.return_value = Response(status=400, content={'error': 'Bad'})
+        with self.assertRaises(ResolweServerError):
+            self.run_async(self.res.request('GET', '/api/data/1'))
+
+        self.run_async(self.res.close())
+        self.assertIsNone(self.res.session)
+
+    def test_query(self):
+        self.session.request.side_effect = lambda *args, **kwargs: Response(content={
+            'count': 2, 'results': [{'id': 1, 'name': 'Data 1'}, {'id': 2, 'name': 'Data 2'}]
+        })
+        query = self.res.data.filter(status='OK')
+
+        data_list = self.run_async(query.fetch())
+        self.assertEqual([data.name for data in data_list], ['Data 1', 'Data 2'])
+        self.assertIsInstance(data_list[0], Data)
+        self.assertEqual(self.session.request.call_args[0], ('GET', 'http://some.url/api/data'))
+        self.assertEqual(self.session.request.call_args[1]['params'], [('status', 'OK')])
+
+        # results are cached
+        self.assertEqual(self.run_async(query.count()), 2)
+        self.assertTrue(self.run_async(query.exists()))
+        self.assertEqual(self.session.request.call_count, 1)
+
+        self.assertEqual(self.run_async(self.res.data.filter(status='ER').count()), 2)
+        self.assertEqual(self.session.request.call_args[1]['params'], [
+            ('fields', 'id'), ('limit', '1'), ('offset', '0'), ('status', 'ER')])
+
+        with self.assertRaises(LookupError):
+            self.run_async(self.res.data.get(name='Data'))
+        self.assertEqual(self.session.request.call_args[1]['params'], [('name', 'Data')])
+
+        self.session.request.side_effect = lambda *args, **kwargs: Response(content=[{'id': 3}])
+        self.assertEqual(self.run_async(self.res.data.get(3)).id, 3)
+
+    def test_update(self):
+        data = Data(resolwe=self.res.resolwe, id=1, status='PR')
+        data._sample = 'sample'
+        self.session.request.return_value = Response(content={'id': 1, 'status': 'OK'})
+
+        self.assertIs(self.run_async(self.res.update(data)), data)
+        self.assertEqual(data.status, 'OK')
+        self.assertEqual(data._sample, 'sample')
+        self.session.request.assert_called_once_with('GET', 'http://some.url/api/data/1')
+
+    def test_upload_file(self):
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir)
+        file_path = os.path.join(tmp_dir, 'reads.fq')
+        with open(file_path, 'wb') as handle:
+            handle.write(b'a' * 25)
+
+        responses = []
+
+        def post(url, data, headers):
+            response = UploadResponse(data, content={'files': [{'temp': 'tmp-file'}]})
+            response.headers = headers
+            responses.append(response)
+            return response
+
+        self.session.post.side_effect = post
+        temp_name = self.run_async(self.res.upload_file(file_path, chunk_size=10))
+        self.assertEqual(temp_name, 'tmp-file')
+
+        self.assertEqual(self.session.post.call_count, 3)
+        url, = self.session.post.call_args[0]
+        self.assertEqual(url, 'http://some.url/upload/')
+        body = responses[-1].body
+        self.assertEqual(len(body), int(responses[-1].headers['Content-Length']))
+        self.assertIn(b'name="_chunkNumber"\r\n\r\n2\r\n', body)
+        self.assertIn(b'\r\n\r\naaaaa\r\n', body)
+
+    def test_upload_file_errors(self):
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir)
+        file_path = os.path.join(tmp_dir, 'reads.fq')
+        with open(file_path, 'wb') as handle:
+            handle.write(b'a' * 25)
+
+        # Connection errors are retried
+        responses = [aiohttp.ClientError('Connection reset')]
+
+        def post(*args, **kwargs):
+            if responses:
+                raise responses.pop()
+            return Response(content={'files': [{'temp': 'tmp-file'}]})
+
+        self.session.post.side_effect = post
+        self.assertEqual(self.run_async(self.res.upload_file(file_path, chunk_size=10)),
+                         'tmp-file')
+        self.assertEqual(self.session.post.call_count, 4)
+
+        # Failed chunk cancels uploads of other chunks
+        pending = PendingResponse()
+        responses = [Response(status=500)] * Uploader.retries + [pending]
+        self.session.post.reset_mock()
+        self.session.post.side_effect = lambda *args, **kwargs: responses.pop()
+        self.assertIsNone(self.run_async(self.res.upload_file(file_path, chunk_size=10)))
+        self.assertTrue(pending.cancelled)
+        self.assertEqual(self.session.post.call_count, 1 + Uploader.retries)
+
+    def test_download_files(self):
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir)
+        self.res.resolwe._get_download_dir.return_value = tmp_dir
+
+        self.session.get.side_effect = lambda url: Response(chunks=[b'abc', b'def'])
+        self.run_async(self.res.download_files(['1/reads.fq', '2/dir/genes.tab']))
+
+        self.assertEqual(self.session.get.call_count, 2)
+        with open(os.path.join(tmp_dir, 'reads.fq'), 'rb') as handle:
+            self.assertEqual(handle.read(), b'abcdef')
+        self.assertTrue(os.path.isfile(os.path.join(tmp_dir, 'dir', 'genes.tab')))
+
+        self.session.get.side_effect = lambda url: Response(status=404)
+        with self.assertRaises(ResolweServerError):
+            self.run_async(self.res.download_files(['1/reads.fq']))
+
+
+if __name__ == '__main__':
+    unittest.main()
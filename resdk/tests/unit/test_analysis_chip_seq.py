@@ -0,0 +1,177 @@
+"""
+Unit tests for resdk/analysis/chip_seq.py file.
+"""
+# pylint: disable=missing-docstring, protected-access
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import unittest
+
+import six
+from mock import MagicMock
+
+from resdk.analysis.chip_seq import bamsplit, macs, rose2
+from resdk.exceptions import BatchError
+from resdk.resources.collection import Collection
+from resdk.resources.relation import Relation
+from resdk.resources.sample import Sample
+
+
+class ChipSeqTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.resolwe = MagicMock()
+
+        self.samples = {}
+        for sample_id in (1, 2, 3, 4):
+            sample = Sample(id=sample_id, name='Sample {}'.format(sample_id),
+                            resolwe=self.resolwe)
+            sample.get_bam = MagicMock(return_value=MagicMock(id=sample_id * 10))
+            sample.get_primary_bam = MagicMock(return_value=MagicMock(id=sample_id * 10))
+            sample.get_macs = MagicMock(return_value=[
+                MagicMock(id=sample_id * 100 + i) for i in (1, 2)
+            ])
+            sample._collections = []
+            self.samples[sample_id] = sample
+
+        # Sample 2 is background of samples 1 and 3 in collection 100
+        # and sample 3 is background of sample 1 in collection 200
+        self.relations = {
+            100: [self.get_relation(1, 2), self.get_relation(3, 2)],
+            200: [self.get_relation(1, 3)],
+        }
+
+        def filter_relations(collection=None, **filters):
+            return self.relations.get(collection, [])
+
+        self.resolwe.relation.filter.side_effect = filter_relations
+
+        def run_many(specs, max_workers, get_or_run, progress):
+            return [MagicMock(slug=spec['slug'], input=spec['input']) for spec in specs]
+
+        self.resolwe.run_many.side_effect = run_many
+
+    def get_relation(self, sample_id, background_id):
+        relation = Relation(id=sample_id, resolwe=self.resolwe)
+        relation.type = 'compare'
+        relation.label = 'background'
+        relation.entities = [
+            {'entity': sample_id, 'position': 'sample'},
+            {'entity': background_id, 'position': 'background'},
+        ]
+        return relation
+
+    def get_collection(self, collection_id, sample_ids):
+        collection = Collection(id=collection_id, resolwe=self.resolwe)
+        collection._samples = [self.samples[sample_id] for sample_id in sample_ids]
+        return collection
+
+
+class TestBamsplit(ChipSeqTestCase):
+
+    def setUp(self):
+        super(TestBamsplit, self).setUp()
+        self.resolwe.run.side_effect = lambda slug, input, collections: MagicMock(input=input)
+
+    def test_order(self):
+        collection = self.get_collection(100, [3, 2, 1])
+        results = bamsplit([collection, self.samples[4]], header='header', max_workers=3)
+
+        self.assertEqual([data.input for data in results], [
+            {'header': 'header', 'bam': 30},
+            {'header': 'header', 'bam': 20},
+            {'header': 'header', 'bam': 10},
+            {'header': 'header', 'bam': 40},
+        ])
+
+    def test_errors(self):
+        self.samples[2].get_bam.side_effect = LookupError('No bam')
+        with six.assertRaisesRegex(self, LookupError, 'No bam'):
+            bamsplit(self.get_collection(100, [1, 2, 3]), max_workers=3)
+
+        self.samples[3].get_bam.side_effect = LookupError('No bam')
+        with self.assertRaises(BatchError) as context:
+            bamsplit(self.get_collection(100, [1, 2, 3]), max_workers=3)
+
+        errors = context.exception.errors
+        self.assertEqual([sample.id for sample, _ in errors], [2, 3])
+        self.assertEqual([data.input for data in context.exception.results], [{'bam': 10}])
+
+
+class TestMacs(ChipSeqTestCase):
+
+    def test_order(self):
+        results = macs(self.get_collection(100, [3, 2, 1]), p_value=0.1, max_workers=3)
+
+        # Background sample is skipped
+        self.assertEqual([data.input for data in results], [
+            {'treatment': 30, 'control': 20, 'pvalue': 0.1},
+            {'treatment': 10, 'control': 20, 'pvalue': 0.1},
+        ])
+        # Relations are fetched once for the collection
+        self.assertEqual(self.resolwe.relation.filter.call_count, 1)
+
+    def test_no_background(self):
+        results = macs(self.get_collection(100, [3, 2, 1]), use_background=False, max_workers=3)
+        self.assertEqual([data.input for data in results],
+                         [{'treatment': 30}, {'treatment': 20}, {'treatment': 10}])
+        self.assertEqual(self.resolwe.relation.filter.call_count, 0)
+
+    def test_duplicated_sample(self):
+        # Sample 1 has a different background in each collection
+        collections = [self.get_collection(100, [1, 2]), self.get_collection(200, [1, 3])]
+
+        results = macs(collections, max_workers=4)
+        self.assertEqual(
+            [data.input for data in results],
+            [{'treatment': 10, 'control': 20}, {'treatment': 10, 'control': 30}]
+        )
+        self.assertEqual(self.resolwe.relation.filter.call_count, 2)
+
+    def test_errors(self):
+        # Background sample is not skipped if it is given directly
+        with six.assertRaisesRegex(self, LookupError, 'Cannot find'):
+            macs([self.get_collection(100, [1, 2]), self.samples[2]], max_workers=3)
+
+        self.samples[1].get_primary_bam.side_effect = LookupError('No bam')
+        with self.assertRaises(BatchError) as context:
+            macs(self.get_collection(100, [1, 2, 3, 4]), max_workers=3)
+
+        errors = context.exception.errors
+        self.assertEqual([sample.id for sample, _ in errors], [1, 4])
+        self.assertIsInstance(errors[1][1], LookupError)
+        self.assertEqual([data.input for data in context.exception.results],
+                         [{'treatment': 30, 'control': 20}])
+
+
+class TestRose2(ChipSeqTestCase):
+
+    def test_order(self):
+        results = rose2(self.get_collection(100, [3, 2, 1]), tss=5, max_workers=3)
+
+        # Background sample is skipped
+        self.assertEqual([data.input for data in results], [
+            {'genome': 'HG19', 'rankby': 30, 'control': 20, 'tss': 5, 'input': 301},
+            {'genome': 'HG19', 'rankby': 30, 'control': 20, 'tss': 5, 'input': 302},
+            {'genome': 'HG19', 'rankby': 10, 'control': 20, 'tss': 5, 'input': 101},
+            {'genome': 'HG19', 'rankby': 10, 'control': 20, 'tss': 5, 'input': 102},
+        ])
+
+    def test_invalid_genome(self):
+        with six.assertRaisesRegex(self, KeyError, 'Invalid `genome`'):
+            rose2(self.get_collection(100, [1, 2]), genome='MOUSE')
+
+    def test_errors(self):
+        with six.assertRaisesRegex(self, LookupError, 'Cannot find'):
+            rose2(self.get_collection(100, [1, 2, 4]), max_workers=3)
+
+        self.samples[3].get_bam.side_effect = LookupError('No bam')
+        with self.assertRaises(BatchError) as context:
+            rose2(self.get_collection(100, [1, 2, 3, 4]), max_workers=3)
+
+        errors = context.exception.errors
+        self.assertEqual([sample.id for sample, _ in errors], [3, 4])
+        self.assertEqual([data.input['input'] for data in context.exception.results], [101, 102])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+"""
+Unit tests for resdk/analysis/differential_expressions.py file.
+"""
+# pylint: disable=missing-docstring, protected-access
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import unittest
+
+import six
+from mock import MagicMock
+
+from resdk.analysis.differential_expressions import cuffdiff
+from resdk.exceptions import BatchError
+from resdk.resources.collection import Collection
+from resdk.resources.data import Data
+from resdk.resources.relation import Relation
+from resdk.resources.sample import Sample
+
+
+class TestCuffdiff(unittest.TestCase):
+
+    def setUp(self):
+        self.resolwe = MagicMock()
+        self.annotation = Data(id=5, resolwe=self.resolwe)
+        self.resolwe.get_or_run.side_effect = lambda slug, input: MagicMock(input=dict(input))
+
+        self.samples = {}
+        for sample_id in (1, 2, 3, 4):
+            sample = Sample(id=sample_id, name='Sample {}'.format(sample_id),
+                            resolwe=self.resolwe)
+            sample.get_cuffquant = MagicMock(return_value=sample_id * 10)
+            self.samples[sample_id] = sample
+
+        relations = []
+        for relation_id, case_ids, control_ids in ((7, [3], [1, 2]), (8, [4], [1])):
+            relation = Relation(id=relation_id, resolwe=self.resolwe)
+            relation.type = 'compare'
+            relation.label = 'case-control'
+            relation.entities = (
+                [{'entity': sample_id, 'position': 'case'} for sample_id in case_ids]
+                + [{'entity': sample_id, 'position': 'control'} for sample_id in control_ids]
+            )
+            relation._samples = [self.samples[sample_id] for sample_id in case_ids + control_ids]
+            relations.append(relation)
+        self.resolwe.relation.filter.return_value = relations
+
+        self.collection = Collection(id=100, resolwe=self.resolwe)
+        self.collection._samples = [self.samples[sample_id] for sample_id in (4, 3, 2, 1)]
+        self.collection.add_data = MagicMock()
+
+    def test_order(self):
+        results = cuffdiff(self.collection, self.annotation, fdr=0.1, max_workers=3)
+
+        self.assertEqual([data.input for data in results], [
+            {'annotation': 5, 'fdr': 0.1, 'case': [30], 'control': [10, 20]},
+            {'annotation': 5, 'fdr': 0.1, 'case': [40], 'control': [10]},
+        ])
+        self.assertEqual(self.collection.add_data.call_count, 2)
+        self.resolwe.relation.filter.assert_called_once_with(
+            type='compare', label='case-control', collection=100)
+
+        # Cuffquant of a sample in several relations is fetched once
+        self.assertEqual(self.samples[1].get_cuffquant.call_count, 1)
+
+    def test_samples(self):
+        # Samples that are not given are discarded
+        samples = [self.samples[sample_id] for sample_id in (1, 3)]
+        results = cuffdiff(samples, self.annotation, max_workers=3)
+
+        self.assertEqual([data.input for data in results],
+                         [{'annotation': 5, 'case': [30], 'control': [10]}])
+        self.resolwe.relation.filter.assert_called_once_with(
+            type='compare', label='case-control', entity=[1, 3])
+        self.assertEqual(self.samples[4].get_cuffquant.call_count, 0)
+
+    def test_errors(self):
+        self.samples[3].get_cuffquant.side_effect = LookupError('No cuffquant')
+        with six.assertRaisesRegex(self, LookupError, 'No cuffquant'):
+            cuffdiff(self.collection, self.annotation, max_workers=3)
+
+        self.samples[1].get_cuffquant.side_effect = LookupError('No cuffquant')
+        with self.assertRaises(BatchError) as context:
+            cuffdiff(self.collection, self.annotation, max_workers=3)
+
+        errors = context.exception.errors
+        self.assertEqual([sample.id for sample, _ in errors], [3, 1])
+        self.assertEqual(context.exception.results, [20, 40])
+        self.assertEqual(self.resolwe.get_or_run.call_count, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+"""
+Unit tests for resdk/analysis/expressions.py file.
+"""
+# pylint: disable=missing-docstring, protected-access
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import unittest
+
+import six
+from mock import MagicMock
+
+from resdk.analysis.expressions import cuffnorm
+from resdk.exceptions import BatchError
+from resdk.resources.collection import Collection
+from resdk.resources.data import Data
+from resdk.resources.relation import Relation
+from resdk.resources.sample import Sample
+
+
+class TestCuffnorm(unittest.TestCase):
+
+    def setUp(self):
+        self.resolwe = MagicMock()
+        self.annotation = Data(id=5, resolwe=self.resolwe)
+
+        self.samples = {}
+        for sample_id in (1, 2, 3, 4):
+            sample = Sample(id=sample_id, name='Sample {}'.format(sample_id),
+                            resolwe=self.resolwe)
+            sample.get_cuffquant = MagicMock(return_value=sample_id * 10)
+            self.samples[sample_id] = sample
+
+        # Samples 1 and 3 are replicates, sample 4 has no replicates
+        relations = []
+        for relation_id, sample_ids in ((7, [2]), (8, [1, 3])):
+            relation = Relation(id=relation_id, resolwe=self.resolwe)
+            relation.type = 'group'
+            relation.label = 'replicates'
+            relation.entities = [{'entity': sample_id} for sample_id in sample_ids]
+            relations.append(relation)
+        self.resolwe.relation.filter.return_value = relations
+
+        self.collection = Collection(id=100, resolwe=self.resolwe)
+        self.collection.add_data = MagicMock()
+
+    def test_order(self):
+        self.collection._samples = [self.samples[sample_id] for sample_id in (3, 2, 1)]
+
+        cuffnorm_obj = cuffnorm(self.collection, self.annotation, use_ercc=True, max_workers=3)
+
+        self.assertEqual(cuffnorm_obj, self.resolwe.get_or_run.return_value)
+        self.resolwe.get_or_run.assert_called_once_with(slug='cuffnorm', input={
+            'cuffquant': [30, 20, 10],
+            'replicates': ['0', '1', '0'],
+            'annotation': 5,
+            'useERCC': True,
+        })
+        self.collection.add_data.assert_called_once_with(cuffnorm_obj)
+
+        # Relations are fetched once for the collection
+        self.resolwe.relation.filter.assert_called_once_with(collection=100)
+
+    def test_errors(self):
+        self.collection._samples = [self.samples[sample_id] for sample_id in (1, 2, 4)]
+        with six.assertRaisesRegex(self, LookupError, 'Sample 4'):
+            cuffnorm(self.collection, self.annotation, max_workers=3)
+
+        self.samples[1].get_cuffquant.side_effect = LookupError('No cuffquant')
+        with self.assertRaises(BatchError) as context:
+            cuffnorm(self.collection, self.annotation, max_workers=3)
+
+        errors = context.exception.errors
+        self.assertEqual([sample.id for sample, _ in errors], [1, 4])
+        self.assertEqual(context.exception.results, [(20, 7)])
+        self.assertEqual(self.resolwe.get_or_run.call_count, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
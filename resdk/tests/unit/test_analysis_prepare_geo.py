@@ -0,0 +1,100 @@
+"""
+Unit tests for resdk/analysis/prepare_geo.py file.
+"""
+# pylint: disable=missing-docstring, protected-access
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import unittest
+
+import six
+from mock import MagicMock
+
+from resdk.analysis.prepare_geo import prepare_geo, prepare_geo_chipseq
+from resdk.exceptions import BatchError
+from resdk.resources.collection import Collection
+from resdk.resources.relation import Relation
+from resdk.resources.sample import Sample
+
+
+class TestPrepareGeo(unittest.TestCase):
+
+    def setUp(self):
+        self.resolwe = MagicMock()
+        self.geo_collection = MagicMock(id=100)
+        self.geo_collection.name = 'Collection'
+        self.resolwe.collection.get.return_value = self.geo_collection
+
+        self.samples = {}
+        for sample_id in (1, 2, 3):
+            sample = Sample(id=sample_id, name='Sample {}'.format(sample_id),
+                            resolwe=self.resolwe)
+            sample.get_reads = MagicMock(return_value=MagicMock(id=sample_id * 10))
+            sample.get_expression = MagicMock(return_value=MagicMock(id=sample_id * 100))
+            sample.get_macs = MagicMock(return_value=[MagicMock(id=sample_id * 1000)])
+            sample._collections = [self.geo_collection]
+            self.samples[sample_id] = sample
+
+        # Sample 2 is background of samples 1 and 3
+        relations = []
+        for sample_id in (1, 3):
+            relation = Relation(id=sample_id, resolwe=self.resolwe)
+            relation.type = 'compare'
+            relation.label = 'background'
+            relation.entities = [
+                {'entity': sample_id, 'position': 'sample'},
+                {'entity': 2, 'position': 'background'},
+            ]
+            relations.append(relation)
+        self.resolwe.relation.filter.return_value = relations
+
+        self.collection = Collection(id=100, resolwe=self.resolwe)
+        self.collection._samples = [self.samples[sample_id] for sample_id in (3, 2, 1)]
+
+    def test_chipseq(self):
+        geo = prepare_geo_chipseq(self.collection, max_workers=3)
+
+        self.assertEqual(geo, self.resolwe.get_or_run.return_value)
+        # Background sample has no ``macs14`` object
+        self.resolwe.get_or_run.assert_called_once_with(slug='prepare-geo-chipseq', input={
+            'reads': [30, 20, 10],
+            'macs14': [3000, 1000],
+            'relations': ['Sample 3:Sample 2', 'Sample 1:Sample 2'],
+            'name': 'Collection',
+        })
+        self.geo_collection.add_data.assert_called_once_with(geo)
+
+        # Relations are fetched once for the collection
+        self.resolwe.relation.filter.assert_called_once_with(collection=100)
+
+    def test_prepare_geo(self):
+        results = prepare_geo(self.collection, types=['rna-seq', 'chip-seq'], name='GEO',
+                              max_workers=3)
+
+        self.assertEqual(len(results), 2)
+        self.assertEqual(self.resolwe.get_or_run.call_args_list[0][1], {
+            'slug': 'prepare-geo-rnaseq',
+            'input': {'reads': [30, 20, 10], 'expressions': [300, 200, 100], 'name': 'GEO'},
+        })
+        self.assertEqual(self.resolwe.get_or_run.call_args_list[1][1]['slug'],
+                         'prepare-geo-chipseq')
+
+        with six.assertRaisesRegex(self, ValueError, "Invalid types 'dna-seq'"):
+            prepare_geo(self.collection, types=['dna-seq'])
+
+    def test_errors(self):
+        self.samples[1].get_macs.return_value = []
+        with six.assertRaisesRegex(self, ValueError, 'has no `macs14`'):
+            prepare_geo_chipseq(self.collection, max_workers=3)
+
+        self.samples[3].get_macs.return_value = [MagicMock(id=1), MagicMock(id=2)]
+        with self.assertRaises(BatchError) as context:
+            prepare_geo_chipseq(self.collection, max_workers=3)
+
+        errors = context.exception.errors
+        self.assertEqual([sample.id for sample, _ in errors], [3, 1])
+        self.assertEqual(context.exception.results, [{'reads': 20, 'collection': 100}])
+        self.assertEqual(self.resolwe.get_or_run.call_count, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
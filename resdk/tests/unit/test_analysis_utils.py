@@ -0,0 +1,122 @@
+"""
+Unit tests for resdk/analysis/utils.py file.
+"""
+# pylint: disable=missing-docstring, protected-access
+
+import unittest
+
+import six
+from mock import MagicMock
+
+from resdk.analysis.utils import map_samples, run_per_sample
+from resdk.exceptions import BatchError
+
+
+class TestMapSamples(unittest.TestCase):
+
+    def setUp(self):
+        self.samples = [MagicMock(id=i) for i in range(1, 6)]
+
+    def get_id(self, sample):
+        if sample.id in (3, 4):
+            raise LookupError('No bam')
+        return sample.id
+
+    def test_map_samples(self):
+        progress = MagicMock()
+        results = map_samples(lambda sample: sample.id, self.samples, max_workers=3,
+                              progress=progress)
+
+        self.assertEqual(results, [1, 2, 3, 4, 5])
+        self.assertEqual(progress.call_count, 5)
+        self.assertIn(((self.samples[2], 3),), progress.call_args_list)
+
+        self.assertEqual(map_samples(lambda sample: sample.id, self.samples, max_workers=1),
+                         [1, 2, 3, 4, 5])
+
+    def test_sample_args(self):
+        # Each occurrence of a sample is called with its own arguments
+        samples = self.samples[:2] * 2
+        results = map_samples(lambda sample, value: (sample.id, value), samples, max_workers=4,
+                              sample_args=[('a',), ('b',), ('c',), ('d',)])
+        self.assertEqual(results, [(1, 'a'), (2, 'b'), (1, 'c'), (2, 'd')])
+
+    def test_errors(self):
+        with self.assertRaises(BatchError) as context:
+            map_samples(self.get_id, self.samples, max_workers=3)
+
+        self.assertEqual(context.exception.results, [1, 2, 5])
+        self.assertEqual(
+            [sample for sample, _ in context.exception.errors], self.samples[2:4])
+        self.assertIsInstance(context.exception.errors[0][1], LookupError)
+
+    def test_single_error(self):
+        # Error of a single failed sample is raised as it is
+        with six.assertRaisesRegex(self, LookupError, 'No bam'):
+            map_samples(self.get_id, self.samples[:3])
+
+
+class TestRunPerSample(unittest.TestCase):
+
+    def setUp(self):
+        self.resolwe = MagicMock()
+        self.samples = [MagicMock(id=i, resolwe=self.resolwe) for i in range(1, 5)]
+
+        def run_many(specs, max_workers, get_or_run, progress):
+            self.assertTrue(get_or_run)
+            results = []
+            for spec in specs:
+                if spec['input']['id'] == 22:
+                    result = ValueError('Failed')
+                else:
+                    result = MagicMock(id=spec['input']['id'])
+                progress(spec, result)
+                results.append(result)
+            return results
+
+        self.resolwe.run_many.side_effect = run_many
+
+    def get_specs(self, sample):
+        if sample.id == 1:
+            raise LookupError('No reads')
+        if sample.id == 3:
+            # Sample is skipped
+            return []
+        return [{'slug': 'macs', 'input': {'id': sample.id * 10 + i}} for i in (1, 2)]
+
+    def test_run_per_sample(self):
+        progress = MagicMock()
+        with self.assertRaises(BatchError) as context:
+            run_per_sample(self.get_specs, self.samples, max_workers=2, progress=progress)
+
+        errors = context.exception.errors
+        self.assertEqual([sample.id for sample, _ in errors], [1, 2])
+        self.assertIsInstance(errors[0][1], LookupError)
+        self.assertIsInstance(errors[1][1], ValueError)
+        self.assertEqual([data.id for data in context.exception.results], [41, 42])
+
+        # Specs of all samples are submitted at once
+        self.assertEqual(self.resolwe.run_many.call_count, 1)
+        specs = self.resolwe.run_many.call_args[0][0]
+        self.assertEqual([spec['sample'].id for spec in specs], [2, 2, 4, 4])
+
+        # Progress is reported once per sample
+        self.assertEqual(
+            sorted(args[0].id for args, _ in progress.call_args_list), [1, 2, 3, 4])
+
+    def test_no_errors(self):
+        samples = self.samples[2:]
+        results = run_per_sample(self.get_specs, samples)
+        self.assertEqual([data.id for data in results], [41, 42])
+
+        self.resolwe.run_many.reset_mock()
+        self.assertEqual(run_per_sample(self.get_specs, samples[:1]), [])
+        self.assertEqual(self.resolwe.run_many.call_count, 0)
+
+    def test_single_error(self):
+        with six.assertRaisesRegex(self, ValueError, 'Failed'):
+            run_per_sample(self.get_specs, self.samples[1:])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -9,7 +9,7 @@ import six
 import slumber
 from mock import MagicMock, call, patch
 
-from resdk.resources.base import BaseResolweResource, BaseResource
+from resdk.resources.base import BaseResolweResource, BaseResource, snapshot, value_changed
 
 # This is normally set in subclass
 BaseResolweResource.endpoint = 'endpoint'
@@ -66,6 +66,20 @@ class TestBaseResolweResource(unittest.TestCase):
 
         self.assertEqual(resource.first_field, 42)
 
+    def test_getattr(self):
+        class Resource(BaseResource):
+
+            @property
+            def broken(self):
+                return self.missing_attribute
+
+        resource = Resource(resolwe=self.resolwe_mock)
+        with six.assertRaisesRegex(self, AttributeError, "Property 'broken' of 'Resource'"):
+            resource.broken  # pylint: disable=pointless-statement
+        message = "'Resource' object has no attribute 'missing_attribute'"
+        with six.assertRaisesRegex(self, AttributeError, message):
+            resource.missing_attribute  # pylint: disable=pointless-statement,no-member
+
     def test_eq(self):
         obj_1 = BaseResource(resolwe=self.resolwe_mock, id=1)
         obj_2 = BaseResource(resolwe=self.resolwe_mock, id=1)
@@ -77,6 +91,32 @@ class TestBaseResolweResource(unittest.TestCase):
         self.assertEqual(obj_1 == obj_4, False)
 
 
+class TestSnapshot(unittest.TestCase):
+
+    def test_scalar(self):
+        self.assertEqual(snapshot(1), 1)
+        self.assertEqual(snapshot('slug'), 'slug')
+        self.assertFalse(value_changed('slug', 'slug'))
+        self.assertTrue(value_changed('slug', 'other-slug'))
+
+    def test_mutable(self):
+        value = {'list': [1, 2], 'dict': {'a': 'b'}}
+        original = snapshot(value)
+        self.assertFalse(value_changed(original, value))
+
+        value['list'].append(3)
+        self.assertTrue(value_changed(original, value))
+        value['list'].pop()
+        self.assertFalse(value_changed(original, value))
+
+        # equal values that are pickled differently
+        self.assertFalse(value_changed(original, {'dict': {'a': 'b'}, 'list': [1.0, 2]}))
+
+        # values that cannot be pickled
+        self.assertTrue(value_changed(original, {'list': [lambda: 1]}))
+        self.assertTrue(value_changed(original, None))
+
+
 class TestBaseMethods(unittest.TestCase):
 
     @patch('resdk.resources.base.setattr')
@@ -0,0 +1,251 @@
+"""
+Unit tests for resdk/cache.py file.
+"""
+# pylint: disable=missing-docstring, protected-access
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import requests
+from mock import MagicMock, patch
+
+from resdk.cache import CachingHTTPAdapter, DiskCache, IdentityMap, ResponseCache
+
+URL = 'http://some/url/api/process'
+
+
+class TestResponseCache(unittest.TestCase):
+
+    def setUp(self):
+        self.cache = ResponseCache(ttls={'process': 60, 'user': 10}, max_size=2)
+
+    def test_endpoint(self):
+        self.assertEqual(self.cache.endpoint('http://some/url/api/process/12'), 'process')
+        self.assertEqual(self.cache.endpoint('http://some/url/api/kb/feature'), 'kb')
+        self.assertIsNone(self.cache.endpoint('http://some/url/data/1/file.txt'))
+
+    def test_get(self):
+        fetch = MagicMock(return_value=[{'slug': 'alignment-bowtie2'}])
+
+        response = self.cache.get(URL, {'slug': ['alignment-bowtie2']}, fetch)
+        self.assertEqual(response, [{'slug': 'alignment-bowtie2'}])
+        response[0]['slug'] = 'changed'
+
+        response = self.cache.get(URL, {'slug': ['alignment-bowtie2']}, fetch)
+        self.assertEqual(response, [{'slug': 'alignment-bowtie2'}])
+        self.assertEqual(fetch.call_count, 1)
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+
+        # different parameters
+        self.cache.get(URL, {'slug': ['other']}, fetch)
+        self.assertEqual(fetch.call_count, 2)
+
+        # endpoint without ttl is not cached
+        self.cache.get('http://some/url/api/data', {}, fetch)
+        self.cache.get('http://some/url/api/data', {}, fetch)
+        self.assertEqual(fetch.call_count, 4)
+
+    @patch('resdk.cache.time')
+    def test_ttl(self, time_mock):
+        fetch = MagicMock(return_value={'id': 1})
+        time_mock.time.return_value = 100
+        self.cache.get('http://some/url/api/user/1', {}, fetch)
+
+        time_mock.time.return_value = 109
+        self.cache.get('http://some/url/api/user/1', {}, fetch)
+        self.assertEqual(fetch.call_count, 1)
+
+        time_mock.time.return_value = 111
+        self.cache.get('http://some/url/api/user/1', {}, fetch)
+        self.assertEqual(fetch.call_count, 2)
+
+    def test_lru(self):
+        fetch = MagicMock(return_value={'id': 1})
+        self.cache.get(URL + '/1', {}, fetch)
+        self.cache.get(URL + '/2', {}, fetch)
+        self.cache.get(URL + '/1', {}, fetch)  # 2 is now least recently used
+        self.cache.get(URL + '/3', {}, fetch)
+        self.assertEqual(len(self.cache), 2)
+        self.assertEqual(fetch.call_count, 3)
+
+        self.cache.get(URL + '/1', {}, fetch)
+        self.assertEqual(fetch.call_count, 3)
+        self.cache.get(URL + '/2', {}, fetch)
+        self.assertEqual(fetch.call_count, 4)
+
+    def test_invalidate(self):
+        fetch = MagicMock(return_value={'id': 1})
+        self.cache.get(URL + '/1', {}, fetch)
+        self.cache.get('http://some/url/api/user/1', {}, fetch)
+
+        self.cache.invalidate_url(URL + '/2')
+        self.assertEqual(len(self.cache), 1)
+        self.cache.invalidate()
+        self.assertEqual(len(self.cache), 0)
+
+
+class TestDiskCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.cache = DiskCache(os.path.join(self.tmp_dir, 'cache', 'responses.sqlite'))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_get_set(self):
+        self.assertIsNone(self.cache.get(URL, 'bob'))
+
+        self.cache.set(URL, 'bob', '"abc"', None, {'Content-Type': 'application/json'}, b'[]')
+        self.assertEqual(self.cache.get(URL, 'bob'), {
+            'etag': '"abc"',
+            'last_modified': None,
+            'headers': {'Content-Type': 'application/json'},
+            'content': b'[]',
+        })
+        # Responses are stored per user
+        self.assertIsNone(self.cache.get(URL, 'alice'))
+        self.assertIsNone(self.cache.get(URL, None))
+
+        # Cache is persistent
+        cache = DiskCache(self.cache.path)
+        self.assertEqual(cache.get(URL, 'bob')['content'], b'[]')
+
+        cache.clear()
+        self.assertIsNone(self.cache.get(URL, 'bob'))
+
+    @patch('resdk.cache.time')
+    def test_prune(self, time_mock):
+        cache = DiskCache(self.cache.path, max_size=10, max_age=100)
+        time_mock.time.return_value = 0
+        cache.set(URL + '1', 'bob', '"1"', None, {}, b'1234')
+        time_mock.time.return_value = 10
+        cache.set(URL + '2', 'bob', '"2"', None, {}, b'5678')
+        self.assertIsNotNone(cache.get(URL + '1', 'bob'))
+
+        # The oldest response is removed when the size is exceeded
+        time_mock.time.return_value = 20
+        cache.set(URL + '3', 'bob', '"3"', None, {}, b'90')
+        cache.set(URL + '4', 'bob', '"4"', None, {}, b'12')
+        self.assertIsNone(cache.get(URL + '1', 'bob'))
+        self.assertIsNotNone(cache.get(URL + '2', 'bob'))
+        self.assertIsNotNone(cache.get(URL + '4', 'bob'))
+
+        # Expired responses are removed
+        time_mock.time.return_value = 115
+        cache.set(URL + '5', 'bob', '"5"', None, {}, b'3')
+        self.assertIsNone(cache.get(URL + '2', 'bob'))
+        self.assertIsNotNone(cache.get(URL + '3', 'bob'))
+
+
+class TestCachingHTTPAdapter(unittest.TestCase):
+
+    def setUp(self):
+        self.cache = MagicMock(spec=DiskCache)
+        self.adapter = CachingHTTPAdapter(self.cache, user='bob')
+
+    @staticmethod
+    def _request(method='GET', url=URL + '?slug=abc'):
+        return requests.Request(method, url).prepare()
+
+    @staticmethod
+    def _response(status_code, headers=None, content=b''):
+        response = requests.Response()
+        response.status_code = status_code
+        response.headers = requests.structures.CaseInsensitiveDict(headers or {})
+        response._content = content
+        return response
+
+    @patch('resdk.cache.HTTPAdapter.send')
+    def test_not_cacheable(self, send_mock):
+        self.adapter.send(self._request(method='POST'))
+        self.adapter.send(self._request(url='http://some/url/data/1/file.txt'))
+        self.assertEqual(send_mock.call_count, 2)
+        self.cache.get.assert_not_called()
+        self.cache.set.assert_not_called()
+
+    @patch('resdk.cache.HTTPAdapter.send')
+    def test_store(self, send_mock):
+        self.cache.get.return_value = None
+        send_mock.return_value = self._response(200, {'ETag': '"abc"'}, b'[1]')
+
+        request = self._request()
+        response = self.adapter.send(request)
+        self.assertEqual(response.content, b'[1]')
+        self.assertNotIn('If-None-Match', request.headers)
+        self.cache.set.assert_called_once_with(
+            URL + '?slug=abc', 'bob', '"abc"', None, {'ETag': '"abc"'}, b'[1]')
+
+        # Responses without validators are not stored
+        self.cache.set.reset_mock()
+        send_mock.return_value = self._response(200, {}, b'[1]')
+        self.adapter.send(self._request())
+        self.cache.set.assert_not_called()
+
+    @patch('resdk.cache.HTTPAdapter.send')
+    def test_revalidate(self, send_mock):
+        self.cache.get.return_value = {
+            'etag': '"abc"',
+            'last_modified': 'Wed, 21 Oct 2015 07:28:00 GMT',
+            'headers': {'Content-Type': 'application/json; charset=utf-8', 'ETag': '"abc"'},
+            'content': b'[1]',
+        }
+        send_mock.return_value = self._response(304, {'Date': 'today'})
+
+        request = self._request()
+        response = self.adapter.send(request)
+        self.assertEqual(request.headers['If-None-Match'], '"abc"')
+        self.assertEqual(request.headers['If-Modified-Since'], 'Wed, 21 Oct 2015 07:28:00 GMT')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, b'[1]')
+        self.assertEqual(response.json(), [1])
+        self.assertEqual(response.encoding, 'utf-8')
+        self.assertEqual(response.headers['content-type'], 'application/json; charset=utf-8')
+        self.assertEqual(response.headers['Date'], 'today')
+        self.cache.set.assert_not_called()
+
+        # Changed response is stored again
+        send_mock.return_value = self._response(200, {'ETag': '"def"'}, b'[2]')
+        response = self.adapter.send(self._request())
+        self.assertEqual(response.content, b'[2]')
+        self.assertEqual(self.cache.set.call_count, 1)
+
+
+class Resource(object):
+
+    def __init__(self, id_):
+        self.id = id_  # pylint: disable=invalid-name
+
+
+class TestIdentityMap(unittest.TestCase):
+
+    def test_identity_map(self):
+        identity_map = IdentityMap()
+        data = Resource(1)
+        other_data = Resource(1)
+        self.assertIsNone(identity_map.get(Resource, 1))
+
+        self.assertIs(identity_map.add(data), data)
+        self.assertIs(identity_map.add(other_data), data)
+        self.assertIs(identity_map.get(Resource, 1), data)
+        self.assertEqual(len(identity_map), 1)
+
+        identity_map.discard(other_data)
+        self.assertEqual(len(identity_map), 1)
+        identity_map.discard(data)
+        self.assertEqual(len(identity_map), 0)
+
+        identity_map.add(data)
+        identity_map.clear()
+        self.assertEqual(len(identity_map), 0)
+
+    def test_weak_references(self):
+        identity_map = IdentityMap()
+        identity_map.add(Resource(1))
+        self.assertEqual(len(identity_map), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
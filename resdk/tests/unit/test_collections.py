@@ -8,7 +8,9 @@ import unittest
 import six
 from mock import MagicMock, patch
 
+from resdk.query import ResolweQuery
 from resdk.resources.collection import BaseCollection, Collection
+from resdk.resources.data import Data
 from resdk.resources.descriptor import DescriptorSchema
 from resdk.resources.sample import Sample
 from resdk.tests.mocks.data import DATA_SAMPLE
@@ -24,12 +26,24 @@ class TestBaseCollection(unittest.TestCase):
 
     @patch('resdk.resources.collection.BaseCollection', spec=True)
     def test_data_types(self, collection_mock):
-        get_mock = MagicMock(**{'get.return_value': DATA_SAMPLE[0]})
-        api_mock = MagicMock(**{'data.return_value': get_mock})
-        collection_mock.configure_mock(data=[1, 2], resolwe=MagicMock(api=api_mock))
+        data_mock = MagicMock(**{'distinct.return_value': [
+            'data:reads:fastq:single:', 'data:alignment:bam:', None]})
+        collection_mock.configure_mock(data=data_mock, _data_types=None)
 
         types = BaseCollection.data_types(collection_mock)
-        self.assertEqual(types, [u'data:reads:fastq:single:'])
+        self.assertEqual(types, ['data:alignment:bam:', 'data:reads:fastq:single:'])
+        data_mock.distinct.assert_called_once_with('process_type')
+
+        # data types are cached
+        self.assertEqual(BaseCollection.data_types(collection_mock), types)
+        self.assertEqual(data_mock.distinct.call_count, 1)
+
+    def test_data_types_cache(self):
+        # cache is cleared when data are added
+        collection = Collection(id=1, resolwe=MagicMock())
+        collection._data_types = ['data:reads:fastq:single:']
+        collection.add_data(1)
+        self.assertIsNone(collection._data_types)
 
     @patch('resdk.resources.collection.BaseCollection', spec=True)
     def test_files(self, collection_mock):
@@ -50,15 +64,16 @@ class TestBaseCollectionDownload(unittest.TestCase):
     def test_file_type(self, collection_mock):
         collection_mock.configure_mock(data=[DATA0, DATA2], resolwe=MagicMock())
         BaseCollection.download(collection_mock, file_type='output.exp')
-        flist = [u'2/outfile.exp']
-        collection_mock.resolwe._download_files.assert_called_once_with(flist, None)
+        collection_mock.resolwe._download_data.assert_called_once_with(
+            [DATA0, DATA2], None, 'output.exp', None, max_workers=1, progress=None)
 
-        # Check if ok to also provide ``output_field`` that does not start with 'output'
         collection_mock.reset_mock()
         collection_mock.configure_mock(data=[DATA1, DATA0], resolwe=MagicMock())
-        BaseCollection.download(collection_mock, file_type='fastq')
-        flist = [u'1/reads.fq', u'1/arch.gz']
-        collection_mock.resolwe._download_files.assert_called_once_with(flist, None)
+        progress = MagicMock()
+        BaseCollection.download(collection_mock, file_type='fastq', max_workers=4,
+                                progress=progress)
+        collection_mock.resolwe._download_data.assert_called_once_with(
+            [DATA1, DATA0], None, 'fastq', None, max_workers=4, progress=progress)
 
     @patch('resdk.resources.collection.BaseCollection', spec=True)
     def test_bad_file_type(self, collection_mock):
@@ -277,6 +292,32 @@ class TestSample(unittest.TestCase):
         with self.assertRaises(ValueError):
             _ = sample.collections
 
+    def test_get_data(self):
+        sample = Sample(id=1, resolwe=MagicMock())
+        bam = MagicMock(process_type='data:alignment:bam:bowtie2:')
+        reads = MagicMock(process_type='data:reads:fastq:single:')
+
+        # data is not loaded
+        filtered = MagicMock(_cache=None, _single=ResolweQuery._single)
+        filtered.__iter__.return_value = iter([bam])
+        sample.resolwe.data.filter.return_value = MagicMock(_cache=None)
+        sample.resolwe.data.filter.return_value.filter.return_value = filtered
+        self.assertEqual(sample.get_bam(), bam)
+        sample.data.filter.assert_called_once_with(type='data:alignment:bam')
+
+        # data is already loaded
+        sample._data = ResolweQuery(MagicMock(), Data)
+        sample._data._cache = [bam, reads]
+        self.assertEqual(sample.get_reads(), reads)
+        self.assertEqual(sample.get_bam(), bam)
+        self.assertEqual(list(sample.get_macs()), [])
+        with self.assertRaises(LookupError):
+            sample.get_cuffquant()
+
+        sample._data._cache = [bam, bam]
+        with self.assertRaises(LookupError):
+            sample.get_bam()
+
     @patch('resdk.resources.sample.Sample', spec=True)
     def test_sample_print_annotation(self, sample_mock):
         with self.assertRaises(NotImplementedError):
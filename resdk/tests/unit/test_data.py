@@ -19,7 +19,26 @@ class TestData(unittest.TestCase):
     @patch('resdk.resources.data.Data', spec=True, annotation={})
     def test_update_fields(self, data_mock):
         Data._update_fields(data_mock, DATA_SAMPLE[0])
-        self.assertEqual(data_mock._flatten_field.call_count, 2)
+        self.assertEqual(data_mock._flatten_field.call_count, 0)
+        self.assertIsNone(data_mock._annotation)
+
+    def test_annotation(self):
+        data = Data(resolwe=MagicMock(), **DATA_SAMPLE[0])
+        with patch.object(Data, '_flatten_field', wraps=data._flatten_field) as flatten_mock:
+            annotation = data.annotation
+            self.assertEqual(flatten_mock.call_count, 2)
+            self.assertIn('output.fastq', annotation)
+
+            # annotation is cached
+            self.assertIs(data.annotation, annotation)
+            self.assertEqual(flatten_mock.call_count, 2)
+
+            # and flattened again after update
+            data.api = MagicMock(**{'return_value.get.return_value': DATA_SAMPLE[0]})
+            data.update()
+            self.assertEqual(flatten_mock.call_count, 2)
+            self.assertEqual(data.annotation, annotation)
+            self.assertEqual(flatten_mock.call_count, 4)
 
     @patch('resdk.resources.data.Data', spec=True)
     def test_flatten_field(self, data_mock):
@@ -166,10 +185,9 @@ class TestData(unittest.TestCase):
         with six.assertRaisesRegex(self, ValueError, "must be saved before"):
             data.files()
 
-    @patch('resdk.resources.data.requests')
-    def test_dir_files(self, requests_mock):
+    def test_dir_files(self):
         data = Data(id=123, resolwe=MagicMock(url='http://resolwe.url'))
-        requests_mock.get = MagicMock(side_effect=[
+        data.resolwe.session.get = MagicMock(side_effect=[
             MagicMock(content=b'[{"type": "file", "name": "file1.txt"}, '
                               b'{"type": "directory", "name": "subdir"}]'),
             MagicMock(content=b'[{"type": "file", "name": "file2.txt"}]'),
@@ -194,12 +212,14 @@ class TestData(unittest.TestCase):
 
         Data.download(data_mock)
         data_mock.resolwe._download_files.assert_called_once_with(
-            ['123/file1.txt', '123/file2.fq.gz'], None)
+            ['123/file1.txt', '123/file2.fq.gz'], None, max_workers=1, progress=None)
 
         data_mock.reset_mock()
-        Data.download(data_mock, download_dir="/some/path/")
+        progress = MagicMock()
+        Data.download(data_mock, download_dir="/some/path/", progress=progress)
         data_mock.resolwe._download_files.assert_called_once_with(
-            ['123/file1.txt', '123/file2.fq.gz'], '/some/path/')
+            ['123/file1.txt', '123/file2.fq.gz'], '/some/path/', max_workers=1,
+            progress=progress)
 
     @patch('resdk.resources.data.Data', spec=True)
     def test_add_output(self, data_mock):
@@ -219,27 +239,27 @@ class TestData(unittest.TestCase):
         with six.assertRaisesRegex(self, NotImplementedError, ""):
             Data.print_annotation(data_mock)
 
-    @patch('resdk.resources.data.requests')
     @patch('resdk.resources.data.urljoin')
     @patch('resdk.resources.data.Data', spec=True)
-    def test_stdout_ok(self, data_mock, urljoin_mock, requests_mock):
+    def test_stdout_ok(self, data_mock, urljoin_mock):
         # Configure mocks:
-        data_mock.configure_mock(id=123, resolwe=MagicMock(url="a", auth="b"))
+        session_mock = MagicMock()
+        data_mock.configure_mock(id=123, resolwe=MagicMock(url="a", session=session_mock))
         urljoin_mock.return_value = "some_url"
 
         # If response.ok = True:
         response = MagicMock(ok=True, **{'iter_content.return_value': [b"abc", b"def"]})
-        requests_mock.configure_mock(**{'get.return_value': response})
+        session_mock.configure_mock(**{'get.return_value': response})
 
         out = Data.stdout(data_mock)
 
         self.assertEqual(out, "abcdef")
         urljoin_mock.assert_called_once_with("a", 'data/123/stdout.txt')
-        requests_mock.get.assert_called_once_with("some_url", stream=True, auth="b")
+        session_mock.get.assert_called_once_with("some_url", stream=True)
 
         # If response.ok = False:
         response = MagicMock(ok=False)
-        requests_mock.configure_mock(**{'get.return_value': response})
+        session_mock.configure_mock(**{'get.return_value': response})
 
         out = Data.stdout(data_mock)
 
@@ -9,7 +9,7 @@ import six
 from mock import MagicMock
 from slumber.exceptions import SlumberHttpBaseException
 
-from resdk.exceptions import ResolweServerError, handle_http_exception
+from resdk.exceptions import BatchError, ResolweServerError, handle_http_exception
 
 
 class ExceptionsTestCase(unittest.TestCase):
@@ -24,3 +24,11 @@ class ExceptionsTestCase(unittest.TestCase):
         func.side_effect = SlumberHttpBaseException(content='error message')
         with six.assertRaisesRegex(self, ResolweServerError, 'error message'):
             wrapped()
+
+    def test_batch_error(self):
+        error = BatchError([('sample 1', ValueError('Bad')), ('sample 2', KeyError('x'))], [42])
+
+        self.assertEqual(error.results, [42])
+        self.assertEqual(len(error.errors), 2)
+        self.assertEqual(str(error), "Failed for 2 items:\nsample 1: Bad\nsample 2: 'x'")
+        self.assertEqual(BatchError([]).results, [])
@@ -6,9 +6,17 @@ Unit tests for resdk/query.py file.
 import unittest
 from collections import defaultdict
 
+import six
 from mock import MagicMock
 
+from resdk.cache import IdentityMap
 from resdk.query import ResolweQuery
+from resdk.resources import Data, Sample
+
+try:
+    import pandas
+except ImportError:
+    pandas = None
 
 
 class TestResolweQuery(unittest.TestCase):
@@ -134,7 +142,7 @@ class TestResolweQuery(unittest.TestCase):
         self.assertEqual(query._filters, {'slug': 'test', 'id': 1})
 
     def test_compose_filters(self):
-        query = MagicMock(spec=ResolweQuery)
+        query = MagicMock(spec=ResolweQuery, **{'_deferred_fields.return_value': frozenset()})
 
         query.configure_mock(_filters={'id': 42, 'type': 'data'}, _limit=None, _offset=None)
         filters = ResolweQuery._compose_filters(query)
@@ -144,9 +152,16 @@ class TestResolweQuery(unittest.TestCase):
         filters = ResolweQuery._compose_filters(query)
         self.assertEqual(filters, {'id': 42, 'type': 'data', 'limit': 5, 'offset': 2})
 
+        query._deferred_fields.return_value = frozenset(['output'])
+        query._fields_filter.return_value = 'id,name'
+        filters = ResolweQuery._compose_filters(query)
+        self.assertEqual(filters['fields'], 'id,name')
+        query._fields_filter.assert_called_once_with(frozenset(['output']))
+
     def test_fetch(self):
         query = MagicMock(spec=ResolweQuery)
         query._cache = None
+        query._request = lambda filters: ResolweQuery._request(query, filters)
         query.api.get = MagicMock(return_value=['object 1', 'object 2'])
         query._populate_resource = MagicMock(side_effect=['object 1', 'object 2'])
         query.resource.query_method = 'GET'
@@ -161,15 +176,310 @@ class TestResolweQuery(unittest.TestCase):
         ResolweQuery._fetch(query)
         self.assertEqual(query._populate_resource.call_count, 0)
 
+    def test_fetch_paginated(self):
+        query = MagicMock(spec=ResolweQuery, _cache=None, _count=None)
+        query._request = lambda filters: ResolweQuery._request(query, filters)
+        query.api.get = MagicMock(return_value={'count': 10, 'results': ['object 1']})
+        query._populate_resource = MagicMock(side_effect=lambda data: data)
+        query.resource.query_method = 'GET'
+
+        ResolweQuery._fetch(query)
+        self.assertEqual(query._cache, ['object 1'])
+        self.assertEqual(query._count, 10)
+
+    def test_iterator(self):
+        objects = [{'id': i} for i in range(7)]
+
+        def get(**filters):
+            offset, limit = filters['offset'], filters['limit']
+            return {'count': len(objects), 'results': objects[offset:offset + limit]}
+
+        query = MagicMock(spec=ResolweQuery, _filters=defaultdict(list, {'status': ['OK']}),
+                          _limit=None, _offset=None, _cache=None)
+        query._request = lambda filters: ResolweQuery._request(query, filters)
+        query._pages = lambda page_size: ResolweQuery._pages(query, page_size)
+        query._populate_resource = MagicMock(side_effect=lambda data: data['id'])
+        query._deferred_fields.return_value = frozenset()
+        query.resource.query_method = 'GET'
+        query.api.get = MagicMock(side_effect=get)
+
+        result = ResolweQuery.iterator(query, page_size=3)
+        self.assertEqual(query.api.get.call_count, 0)  # is lazy
+        self.assertEqual(list(result), list(range(7)))
+        self.assertEqual(query.api.get.call_count, 3)
+        query.api.get.assert_called_with(status=['OK'], ordering=['id'], limit=3, offset=6)
+        # results are not cached and filters are not changed
+        self.assertEqual(query._cache, None)
+        self.assertEqual(dict(query._filters), {'status': ['OK']})
+
+        # limit and offset of sliced query
+        query.api.get.reset_mock()
+        query._limit, query._offset = 4, 2
+        self.assertEqual(list(ResolweQuery.iterator(query, page_size=3)), [2, 3, 4, 5])
+        query.api.get.assert_called_with(status=['OK'], ordering=['id'], limit=1, offset=5)
+
+        # custom ordering, response without pagination
+        query.api.get.reset_mock()
+        query.api.get.side_effect = None
+        query.api.get.return_value = [{'id': 2}, {'id': 1}]
+        query._limit, query._offset = None, None
+        query._filters['ordering'] = ['-id']
+        self.assertEqual(list(ResolweQuery.iterator(query)), [2, 1])
+        self.assertEqual(query.api.get.call_count, 1)
+
+        with self.assertRaises(ValueError):
+            list(ResolweQuery.iterator(query, page_size=0))
+
+    def test_iterator_prefetch(self):
+        query = MagicMock(spec=ResolweQuery)
+        query._pages = MagicMock(return_value=iter([[1, 2], [3], [4, 5]]))
+        query._prefetched_pages = lambda page_size, prefetch: ResolweQuery._prefetched_pages(
+            query, page_size, prefetch)
+        query._populate_resource = MagicMock(side_effect=lambda data: data)
+
+        self.assertEqual(list(ResolweQuery.iterator(query, page_size=2, prefetch=2)),
+                         [1, 2, 3, 4, 5])
+        query._pages.assert_called_once_with(2)
+
+        # errors are raised in the consumer
+        def pages(page_size):  # pylint: disable=unused-argument
+            yield [1]
+            raise ValueError("Server error")
+
+        query._pages = pages
+        result = ResolweQuery.iterator(query, prefetch=1)
+        self.assertEqual(next(result), 1)
+        with six.assertRaisesRegex(self, ValueError, "Server error"):
+            next(result)
+
+        # consumer stops early
+        query._pages = MagicMock(return_value=iter([[i] for i in range(100)]))
+        result = ResolweQuery.iterator(query, prefetch=1)
+        self.assertEqual(next(result), 0)
+        result.close()
+
+        with self.assertRaises(ValueError):
+            list(ResolweQuery.iterator(query, prefetch=-1))
+
+    def test_only_defer(self):
+        resolwe = MagicMock()
+        query = ResolweQuery(resolwe, Data)
+
+        only_query = query.only('name', 'status')
+        self.assertEqual(query._deferred_fields(), frozenset())
+        deferred = only_query._deferred_fields()
+        self.assertIn('output', deferred)
+        self.assertNotIn('name', deferred)
+        self.assertNotIn('id', deferred)
+        # properties are always loaded
+        self.assertNotIn('descriptor_schema', deferred)
+        self.assertEqual(only_query._compose_filters()['fields'],
+                         'descriptor_schema,name,status,id')
+
+        defer_query = query.defer('output').defer('input')
+        self.assertEqual(defer_query._deferred_fields(), frozenset(['output', 'input']))
+        self.assertEqual(defer_query._clone()._deferred_fields(), frozenset(['output', 'input']))
+
+        with self.assertRaises(ValueError):
+            query.only('unknown_field')
+
+    def test_populate_deferred(self):
+        resolwe = MagicMock()
+        query = ResolweQuery(resolwe, Data).only('name', 'status')
+        data = query._populate_resource({'id': 1, 'name': 'Data 1', 'status': 'OK'})
+
+        self.assertEqual(data.name, 'Data 1')
+        self.assertEqual(data._original_values, {'id': 1, 'name': 'Data 1', 'status': 'OK'})
+        self.assertEqual(resolwe.api.data.call_count, 0)
+
+        # deferred fields are not saved
+        data.name = 'New name'
+        data.save()
+        resolwe.api.data.return_value.patch.assert_called_once_with({'name': 'New name'})
+        self.assertEqual(resolwe.api.data.return_value.get.call_count, 0)
+
+        # deferred fields are loaded on first access
+        resolwe.api.data.return_value.get.return_value = {
+            'id': 1, 'output': {'fastq': 'reads.fq'}, 'tags': ['tag'],
+        }
+        self.assertEqual(data.output, {'fastq': 'reads.fq'})
+        self.assertEqual(data.tags, ['tag'])
+        self.assertEqual(resolwe.api.data.return_value.get.call_count, 1)
+        fields = resolwe.api.data.return_value.get.call_args[1]['fields'].split(',')
+        self.assertIn('output', fields)
+        self.assertNotIn('name', fields)
+
+        # set deferred field
+        data = query._populate_resource({'id': 1, 'name': 'Data 1', 'status': 'OK'})
+        data.tags = ['new']
+        self.assertNotIn('tags', data._deferred_fields)
+        self.assertEqual(data.tags, ['new'])
+
+    def test_distinct(self):
+        query = self.values_query()
+
+        self.assertEqual(query.distinct('status'), ['OK', 'ER'])
+        self.assertEqual(query.api.get.call_args[1]['fields'], 'status,id')
+
+        # evaluated query
+        query.api.get.reset_mock()
+        query._cache = [MagicMock(status='OK'), MagicMock(status='OK')]
+        self.assertEqual(query.distinct('status'), ['OK'])
+        self.assertEqual(query.api.get.call_count, 0)
+
+    def test_in_bulk(self):
+        resolwe = MagicMock(identity_map=None)
+        resolwe.api.data.get.side_effect = lambda **filters: [
+            {'id': int(id_), 'slug': 'data-{}'.format(id_)}
+            for id_ in filters['id__in'][0].split(',') if id_ != '3'
+        ]
+        query = ResolweQuery(resolwe, Data).filter(status='OK')
+
+        data = query.in_bulk([1, 2, 3, 4, 2, 5], batch_size=2)
+        self.assertEqual(sorted(data.keys()), [1, 2, 4, 5])
+        self.assertEqual(data[4].slug, 'data-4')
+        self.assertEqual(
+            [call[1]['id__in'] for call in resolwe.api.data.get.call_args_list],
+            [['1,2'], ['3,4'], ['5']]
+        )
+        self.assertEqual(resolwe.api.data.get.call_args[1]['status'], ['OK'])
+
+        # batches are limited by length of the filter
+        resolwe.api.data.get.reset_mock()
+        query.in_bulk(range(1000, 2000))
+        self.assertEqual(resolwe.api.data.get.call_count, 3)
+
+        # lookup by other field
+        resolwe.api.data.get.side_effect = None
+        resolwe.api.data.get.return_value = [{'id': 1, 'slug': 'data-1'}]
+        data = query.in_bulk(['data-1'], field_name='slug')
+        self.assertEqual(data['data-1'].id, 1)
+        resolwe.api.data.get.assert_called_with(slug__in=['data-1'], status=['OK'])
+
+        self.assertEqual(query.in_bulk([]), {})
+        with self.assertRaises(ValueError):
+            query.in_bulk([1], batch_size=0)
+
+    def test_identity_map(self):
+        resolwe = MagicMock(identity_map=IdentityMap())
+        query = ResolweQuery(resolwe, Data)
+
+        data = query._populate_resource({'id': 1, 'name': 'Data 1', 'status': 'PR'})
+        data._sample = 'sample'
+        self.assertIs(resolwe.identity_map.get(Data, 1), data)
+
+        same_data = query._populate_resource({'id': 1, 'name': 'Data 1', 'status': 'OK'})
+        self.assertIs(same_data, data)
+        self.assertEqual(data.status, 'OK')
+        self.assertEqual(data._sample, 'sample')
+
+        # Resources with deferred fields are not put in the map
+        other_data = query.only('name')._populate_resource({'id': 1, 'name': 'Data 1'})
+        self.assertIsNot(other_data, data)
+        self.assertIsNot(query.compact()._populate_resource({'id': 1}), data)
+
+        # Other resources with the same id are different objects
+        resolwe.api.sample = MagicMock()
+        sample = ResolweQuery(resolwe, Sample)._populate_resource({'id': 1})
+        self.assertIsNot(sample, data)
+
+        data.delete(force=True)
+        self.assertIsNone(resolwe.identity_map.get(Data, 1))
+        self.assertIs(resolwe.identity_map.get(Sample, 1), sample)
+
+    def test_prefetch(self):
+        resolwe = MagicMock(identity_map=None)
+        resolwe.api.sample.get.return_value = [
+            {'id': 1, 'data': [12, 11], 'collections': [1]},
+            {'id': 2, 'data': [], 'collections': [1]},
+            {'id': 3},
+        ]
+        query = ResolweQuery(resolwe, Sample).prefetch('data').prefetch('collections', 'data')
+        self.assertEqual(query._prefetch, ('data', 'collections'))
+
+        data = {11: 'data 11', 12: 'data 12'}
+        resolwe.data.in_bulk.return_value = data
+        resolwe.data.filter.side_effect = lambda **filters: MagicMock(filters=filters)
+        resolwe.collection.in_bulk.return_value = {1: 'collection 1'}
+
+        samples = list(query)
+        self.assertEqual(list(resolwe.data.in_bulk.call_args[0][0]), [12, 11])
+        self.assertEqual(list(resolwe.collection.in_bulk.call_args[0][0]), [1, 1])
+        self.assertEqual(samples[0]._data._cache, ['data 12', 'data 11'])
+        self.assertEqual(samples[0]._data._count, 2)
+        self.assertEqual(samples[0]._data.filters, {'entity': 1})
+        self.assertEqual(samples[0]._collections._cache, ['collection 1'])
+        self.assertEqual(samples[1]._data._cache, [])
+        # ids are not in the response
+        self.assertIsNone(samples[2]._data)
+
+        # iterator
+        resolwe.api.sample.get.return_value = {'count': 1, 'results': [{'id': 1, 'data': [11]}]}
+        samples = list(query.iterator())
+        self.assertEqual(samples[0]._data._cache, ['data 11'])
+
+        # ids of related objects are requested with selected fields
+        self.assertEqual(query.only('name')._compose_filters()['fields'],
+                         'descriptor_schema,name,id,data,collections')
+
+        with self.assertRaises(ValueError):
+            query.prefetch('relations')
+        with self.assertRaises(ValueError):
+            query.compact()
+        with self.assertRaises(ValueError):
+            ResolweQuery(resolwe, Sample).compact().prefetch('data')
+
+    def values_query(self):
+        resolwe = MagicMock()
+        resolwe.api.data.get.return_value = {'count': 2, 'results': [
+            {'id': 1, 'name': 'Data 1', 'status': 'OK'},
+            {'id': 2, 'name': 'Data 2', 'status': 'ER'},
+        ]}
+        return ResolweQuery(resolwe, Data)
+
+    def test_values(self):
+        query = self.values_query()
+
+        values = query.filter(status='OK').values('id', 'name')
+        self.assertEqual(list(values), [{'id': 1, 'name': 'Data 1'}, {'id': 2, 'name': 'Data 2'}])
+        filters = query.api.get.call_args[1]
+        self.assertEqual(filters['status'], ['OK'])
+        # properties are not requested if they are not selected
+        self.assertEqual(filters['fields'], 'name,id')
+
+        values = query.values_list('id', 'status')
+        self.assertEqual(list(values), [(1, 'OK'), (2, 'ER')])
+        self.assertEqual(query.api.get.call_args[1]['fields'], 'status,id')
+        list(query.values('id', 'descriptor_schema'))
+        self.assertEqual(query.api.get.call_args[1]['fields'], 'descriptor_schema,id')
+        self.assertEqual(list(query.values_list('name', flat=True)), ['Data 1', 'Data 2'])
+
+        # all fields
+        self.assertIsNone(list(query.values())[0]['process_type'])
+        self.assertNotIn('fields', query.api.get.call_args[1])
+
+        with self.assertRaises(ValueError):
+            list(query.values_list('id', 'name', flat=True))
+        with self.assertRaises(ValueError):
+            list(query.values('unknown_field'))
+
+    @unittest.skipIf(pandas is None, "pandas is not installed")
+    def test_to_dataframe(self):
+        query = self.values_query()
+
+        frame = query.to_dataframe('id', 'status')
+        self.assertEqual(list(frame.columns), ['id', 'status'])
+        self.assertEqual(list(frame['status']), ['OK', 'ER'])
+
     def test_clear_cache(self):
         query = MagicMock(spec=ResolweQuery, _cache=['obj1', 'obj2'])
         ResolweQuery.clear_cache(query)
         self.assertEqual(query._cache, None)
 
     def test_count(self):
-        count_query = MagicMock(spec=ResolweQuery, _count=10)
-        query = MagicMock(spec=ResolweQuery, _count=None, _limit=None, _offset=None,
-                          **{'_clone.return_value': count_query})
+        query = MagicMock(spec=ResolweQuery, _count=None, _cache=None, _limit=None, _offset=None,
+                          **{'_fetch_count.return_value': 10})
+        query._limit_count.side_effect = lambda count: ResolweQuery._limit_count(query, count)
 
         self.assertEqual(ResolweQuery.count(query), 10)
 
@@ -189,10 +499,54 @@ class TestResolweQuery(unittest.TestCase):
         query._limit = None
         query._offset = None
         self.assertEqual(ResolweQuery.count(query), 5)
+        self.assertEqual(query._fetch_count.call_count, 1)
+
+        # evaluated query without pagination
+        query._count = None
+        query._cache = [1, 2, 3]
+        self.assertEqual(ResolweQuery.count(query), 3)
+        self.assertEqual(query._fetch_count.call_count, 1)
+
+    def test_fetch_count(self):
+        resolwe = MagicMock()
+        resolwe.api.data.get.return_value = {'count': 42, 'results': [{'id': 1}]}
+        query = ResolweQuery(resolwe, Data).filter(status='OK')
+        query._populate_resource = MagicMock()
+
+        self.assertEqual(query.count(), 42)
+        self.assertEqual(len(query), 42)
+        resolwe.api.data.get.assert_called_once_with(
+            status=['OK'], limit=1, offset=0, fields='id')
+        query._populate_resource.assert_not_called()
+
+        # response is not paginated
+        resolwe.api.data.get.return_value = [{'id': 1}, {'id': 2}]
+        self.assertEqual(query.filter(status='ER').count(), 2)
+
+    def test_exists(self):
+        resolwe = MagicMock()
+        resolwe.api.data.get.return_value = {'count': 0, 'results': []}
+        query = ResolweQuery(resolwe, Data)
+        self.assertFalse(query.exists())
+        self.assertFalse(query)
+
+        query = ResolweQuery(resolwe, Data)
+        resolwe.api.data.get.return_value = {'count': 2, 'results': [{'id': 1}]}
+        self.assertTrue(query.exists())
+        self.assertTrue(query)
+        self.assertEqual(resolwe.api.data.get.call_count, 2)
+
+        query = ResolweQuery(resolwe, Data)
+        query._cache = []
+        self.assertFalse(query.exists())
+        self.assertEqual(resolwe.api.data.get.call_count, 2)
 
     def test_get(self):
         new_query = MagicMock(spec=ResolweQuery)
         query = MagicMock(spec=ResolweQuery, **{'_clone.return_value': new_query})
+        query._get_query.side_effect = lambda args, kwargs: ResolweQuery._get_query(
+            query, args, kwargs)
+        query._single = ResolweQuery._single
 
         with self.assertRaises(ValueError):
             ResolweQuery.get(query, 1, 'slug')
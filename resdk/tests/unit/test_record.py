@@ -0,0 +1,84 @@
+"""
+Unit tests for resdk/resources/record.py file.
+"""
+# pylint: disable=missing-docstring, protected-access
+
+import unittest
+
+import six
+from mock import MagicMock
+
+from resdk.query import ResolweQuery
+from resdk.resources import Data, Relation
+from resdk.resources.record import record_class
+from resdk.tests.mocks.data import DATA_SAMPLE
+
+
+class TestRecord(unittest.TestCase):
+
+    def setUp(self):
+        self.resolwe = MagicMock()
+        self.record = record_class(Data)(self.resolwe, DATA_SAMPLE[0])
+
+    def test_record_class(self):
+        self.assertIs(record_class(Data), record_class(Data))
+        self.assertEqual(record_class(Data).__name__, 'DataRecord')
+        self.assertIn('status', record_class(Data).FIELDS)
+        self.assertIn('descriptor_schema', record_class(Data).PROPERTY_FIELDS)
+        self.assertIn('collection', record_class(Relation).PROPERTY_FIELDS)
+        self.assertFalse(hasattr(self.record, '__dict__'))
+
+    def test_fields(self):
+        self.assertEqual(self.record.id, DATA_SAMPLE[0]['id'])
+        self.assertEqual(self.record.status, DATA_SAMPLE[0]['status'])
+        self.assertIsNone(self.record._resource)
+
+        with six.assertRaisesRegex(self, AttributeError, "read-only"):
+            self.record.name = 'New name'
+
+    def test_upgrade(self):
+        self.assertIn('output.fastq', self.record.annotation)
+
+        resource = self.record._resource
+        self.assertIsInstance(resource, Data)
+        self.assertEqual(resource.name, self.record.name)
+        self.assertEqual(resource.descriptor_schema, None)
+        self.assertIs(self.record.to_resource(), resource)
+        self.assertEqual(self.record, resource)
+
+        # resource can be changed
+        resource.name = 'New name'
+        resource.save()
+        resource.api.return_value.patch.assert_called_once_with({'name': 'New name'})
+
+    def test_upgraded_fields(self):
+        resource = self.record.to_resource()
+        resource.api.return_value.get.return_value = dict(DATA_SAMPLE[0], status='ER')
+
+        self.record.update()
+        self.assertEqual(self.record.status, 'ER')
+
+        # fields are written to the resource
+        self.record.name = 'New name'
+        self.assertEqual(resource.name, 'New name')
+        self.assertEqual(self.record.name, 'New name')
+
+    def test_missing_fields(self):
+        record = record_class(Data)(self.resolwe, {'id': 1, 'name': 'Data 1'})
+        self.resolwe.api.data.return_value.get.return_value = {'id': 1, 'status': 'OK'}
+
+        self.assertEqual(record.status, 'OK')
+        fields = self.resolwe.api.data.return_value.get.call_args[1]['fields'].split(',')
+        self.assertIn('status', fields)
+        self.assertNotIn('name', fields)
+
+    def test_query(self):
+        query = ResolweQuery(self.resolwe, Data).compact()
+        self.assertTrue(query.filter(status='OK')._compact)
+
+        record = query._populate_resource(DATA_SAMPLE[0])
+        self.assertEqual(type(record), record_class(Data))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -6,10 +6,11 @@ from __future__ import absolute_import, division, print_function, unicode_litera
 
 import unittest
 
-from mock import MagicMock, patch
+from mock import MagicMock
 
 from resdk.resources.collection import Collection
-from resdk.resources.relation import Relation
+from resdk.resources.relation import Relation, RelationIndex
+from resdk.resources.sample import Sample
 
 
 class TestRelation(unittest.TestCase):
@@ -19,28 +20,24 @@ class TestRelation(unittest.TestCase):
 
         sample_1 = MagicMock(id=1)
         sample_2 = MagicMock(id=2)
-        # order in return_value is intentionally mixed to test ordering
-        relation.resolwe.sample.filter = MagicMock(return_value=[sample_2, sample_1])
+        relation.resolwe.sample.in_bulk = MagicMock(return_value={2: sample_2, 1: sample_1})
         relation.entities = [
             {'entity': 1, 'position': None},
             {'entity': 2, 'position': None},
         ]
         self.assertEqual(relation.samples, [sample_1, sample_2])
-        relation.resolwe.sample.filter.assert_called_with(id__in='1,2')
+        relation.resolwe.sample.in_bulk.assert_called_with([1, 2])
 
         # test caching
         self.assertEqual(relation.samples, [sample_1, sample_2])
-        self.assertEqual(relation.resolwe.sample.filter.call_count, 1)
+        self.assertEqual(relation.resolwe.sample.in_bulk.call_count, 1)
 
         # cache is cleared at update
         relation._samples = ['sample']
         relation.update()
         self.assertEqual(relation._samples, None)
 
-    # I appears it is not possible to deepcopy MagicMocks so we just patch
-    # the deepcopy functionality:
-    @patch('resdk.resources.base.copy')
-    def test_collection(self, copy_mock):
+    def test_collection(self):
         relation = Relation(id=1, resolwe=MagicMock())
         collection = Collection(id=3, resolwe=MagicMock())
         collection.id = 3  # this is overriden when initialized
@@ -81,7 +78,7 @@ class TestRelation(unittest.TestCase):
         relation.type = 'compare'
         relation.label = None
         relation._samples = [sample_1, sample_2]
-        relation.positions = None
+        relation.entities = [{'entity': 1}, {'entity': 2}]
         self.assertEqual(
             str(relation),
             "Relation <id:1 type: 'compare', samples: [sample_1, sample_2]>"
@@ -90,7 +87,7 @@ class TestRelation(unittest.TestCase):
         relation.type = 'compare'
         relation.label = 'background'
         relation._samples = [sample_1, sample_2]
-        relation.positions = None
+        relation.entities = [{'entity': 1}, {'entity': 2}]
         self.assertEqual(
             str(relation),
             "Relation <id:1 type: 'compare', label: 'background', samples: [sample_1, sample_2]>"
@@ -99,7 +96,10 @@ class TestRelation(unittest.TestCase):
         relation.type = 'compare'
         relation.label = 'background'
         relation._samples = [sample_1, sample_2]
-        relation.positions = ['sample', 'background']
+        relation.entities = [
+            {'entity': 1, 'position': 'sample'},
+            {'entity': 2, 'position': 'background'},
+        ]
         self.assertEqual(
             str(relation),
             "Relation <id:1 type: 'compare', label: 'background', "
@@ -107,5 +107,70 @@ class TestRelation(unittest.TestCase):
         )
 
 
+class TestRelationIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.resolwe = MagicMock()
+        self.background = Relation(
+            id=1, resolwe=self.resolwe, type='compare', label='background', entities=[
+                {'entity': 1, 'position': 'sample'},
+                {'entity': 2, 'position': 'background'},
+            ])
+        self.replicates = Relation(
+            id=2, resolwe=self.resolwe, type='group', label='replicates', entities=[
+                {'entity': 1, 'position': None},
+                {'entity': 3, 'position': None},
+            ])
+        self.sample = Sample(id=1, resolwe=self.resolwe, name='Sample 1')
+        self.index = RelationIndex([self.background, self.replicates], samples=[self.sample])
+
+    def test_filter(self):
+        self.assertEqual(self.index.filter(1), [self.background, self.replicates])
+        self.assertEqual(self.index.filter(self.sample, type='group'), [self.replicates])
+        self.assertEqual(self.index.filter(1, label='background', position='sample'),
+                         [self.background])
+        self.assertEqual(self.index.filter(1, position='background'), [])
+        self.assertEqual(self.index.filter(4), [])
+
+    def test_for_collection(self):
+        self.resolwe.relation.filter.return_value = [self.background]
+        index = RelationIndex.for_collection(self.resolwe, Collection(id=5, resolwe=MagicMock()))
+
+        self.resolwe.relation.filter.assert_called_once_with(collection=5)
+        self.assertEqual(index.relations, [self.background])
+
+    def test_get_sample(self):
+        self.assertIs(self.index.get_sample(1), self.sample)
+
+        self.resolwe.sample.get.return_value = 'Sample 2'
+        self.assertEqual(self.index.get_sample(2), 'Sample 2')
+        self.assertEqual(self.index.get_sample(2), 'Sample 2')
+        self.resolwe.sample.get.assert_called_once_with(id=2)
+
+    def test_is_background(self):
+        self.assertFalse(self.index.is_background(1))
+        self.assertTrue(self.index.is_background(2))
+        self.assertFalse(self.index.is_background(3))
+
+    def test_get_background(self):
+        self.resolwe.sample.get.return_value = 'Sample 2'
+        self.assertEqual(self.sample.get_background(relation_index=self.index), 'Sample 2')
+        self.assertEqual(self.resolwe.relation.filter.call_count, 0)
+
+        sample = Sample(id=3, resolwe=self.resolwe, name='Sample 3')
+        self.assertIsNone(sample.get_background(fail_silently=True, relation_index=self.index))
+        with self.assertRaises(LookupError):
+            sample.get_background(relation_index=self.index)
+
+    def test_get_background_extra_filters(self):
+        # Index is not used with extra filters
+        self.resolwe.relation.filter.return_value = [self.background]
+        self.resolwe.sample.get.return_value = 'Sample 2'
+        self.assertEqual(
+            self.sample.get_background(relation_index=self.index, collection=5), 'Sample 2')
+        self.resolwe.relation.filter.assert_called_once_with(
+            type='compare', label='background', entity=[1], position=['sample'], collection=5)
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -3,23 +3,28 @@ Unit tests for resdk/resolwe.py file.
 """
 # pylint: disable=missing-docstring, protected-access
 
-import io
+import copy
 import os
+import threading
 import unittest
 
 import requests
 import six
 import slumber
 import yaml
-from mock import MagicMock, mock_open, patch
+from mock import MagicMock, patch
 from slumber.exceptions import SlumberHttpBaseException
 
 from resdk import resolwe
+from resdk.cache import CachingHTTPAdapter, DiskCache, IdentityMap, ResponseCache
+from resdk.constants import POOL_SIZE
 from resdk.exceptions import ResolweServerError, ValidationError
+from resdk.query import ResolweQuery
 from resdk.resolwe import (
     ResAuth, Resolwe, ResolweResource, version_str_to_tuple, version_tuple_to_str,
 )
 from resdk.resources import Collection, Data, Process
+from resdk.tests.mocks.data import DATA_SAMPLE
 
 BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 
@@ -98,6 +103,76 @@ class TestResolwe(unittest.TestCase):
         self.assertEqual(resolwe_querry_mock.call_count, 10)
         self.assertEqual(log_mock.getLogger.call_count, 1)
 
+    def test_create_session(self):
+        resolwe_mock = MagicMock(spec=Resolwe)
+        session = Resolwe._create_session(resolwe_mock, pool_size=7, max_retries=2)
+
+        self.assertIsInstance(session, requests.Session)
+        for prefix in ['http://', 'https://']:
+            adapter = session.get_adapter(prefix + 'some.url')
+            self.assertEqual(adapter._pool_maxsize, 7)
+            self.assertEqual(adapter.max_retries.total, 2)
+
+    @patch('resdk.resolwe.ResAuth')
+    @patch('resdk.resolwe.ResolweAPI')
+    def test_shared_session(self, resolwe_api_mock, resauth_mock):
+        res = Resolwe('a', 'b', 'http://some/url')
+
+        self.assertEqual(resauth_mock.call_args[1]['session'], res.session)
+        self.assertEqual(resolwe_api_mock.call_args[1]['session'], res.session)
+        self.assertEqual(res.session.auth, res.auth)
+
+    @patch('resdk.resolwe.ResAuth')
+    def test_cache(self, resauth_mock):
+        res = Resolwe('a', 'b', 'http://some/url')
+        self.assertIsNone(res.cache)
+        self.assertIsNone(res.api.process._store['cache'])
+
+        res = Resolwe('a', 'b', 'http://some/url', cache=True)
+        self.assertIsInstance(res.cache, ResponseCache)
+        self.assertIs(res.api.process(1)._store['cache'], res.cache)
+
+        response = MagicMock(status_code=200, content=b'[{"id": 1}]',
+                             headers={'content-type': 'application/json'})
+        res.session.request = MagicMock(return_value=response)
+        self.assertEqual(res.api.process.get(slug='alignment'), [{'id': 1}])
+        self.assertEqual(res.api.process.get(slug='alignment'), [{'id': 1}])
+        self.assertEqual(res.session.request.call_count, 1)
+
+        # write request invalidates the cache
+        res.api.process(1).patch({'name': 'New name'})
+        res.api.process.get(slug='alignment')
+        self.assertEqual(res.session.request.call_count, 3)
+
+        # data endpoint is not cached
+        res.api.data.get()
+        res.api.data.get()
+        self.assertEqual(res.session.request.call_count, 5)
+
+    @patch('resdk.resolwe.ResAuth')
+    def test_disk_cache(self, resauth_mock):
+        resauth_mock.return_value.username = 'bob'
+        disk_cache = MagicMock(spec=DiskCache)
+        res = Resolwe('bob', 'b', 'http://some/url', disk_cache=disk_cache)
+        self.assertIs(res.disk_cache, disk_cache)
+        self.assertEqual(res.pool_size, POOL_SIZE)
+
+        for prefix in ['http://', 'https://']:
+            adapter = res.session.get_adapter(prefix + 'some.url')
+            self.assertIsInstance(adapter, CachingHTTPAdapter)
+            self.assertIs(adapter.cache, disk_cache)
+            self.assertEqual(adapter.user, 'bob')
+            self.assertEqual(adapter._pool_maxsize, POOL_SIZE)
+
+        res = Resolwe('a', 'b', 'http://some/url')
+        self.assertNotIsInstance(res.session.get_adapter('http://some.url'), CachingHTTPAdapter)
+
+    @patch('resdk.resolwe.ResAuth')
+    def test_identity_map(self, resauth_mock):
+        self.assertIsNone(Resolwe('a', 'b', 'http://some/url').identity_map)
+        res = Resolwe('a', 'b', 'http://some/url', identity_map=True)
+        self.assertIsInstance(res.identity_map, IdentityMap)
+
     def test_repr(self):
         resolwe_mock = MagicMock(spec=Resolwe, url='www.abc.com')
 
@@ -146,6 +221,97 @@ class TestResolwe(unittest.TestCase):
         self.assertEqual(resauth_mock.call_args[0][1], 'bar')
 
 
+class TestWait(unittest.TestCase):
+
+    def setUp(self):
+        self.resolwe = MagicMock(spec=Resolwe, logger=MagicMock())
+        self.resolwe.api = MagicMock()
+        self.resolwe.data = ResolweQuery(MagicMock(identity_map=None), Data)
+        self.statuses = [
+            {1: 'PR', 2: 'WT', 3: 'PR'},
+            {1: 'PR', 2: 'PR', 3: 'PR'},
+            {1: 'PR', 2: 'OK', 3: 'ER'},
+            {1: 'OK'},
+        ]
+        self.filters = []
+        self.refreshed = []
+
+        def get(**filters):
+            ids = [int(id_) for id_ in filters['id__in'][0].split(',')]
+            if 'fields' not in filters:
+                # refresh of finished objects
+                self.refreshed.append(ids)
+                results = [self.payload(id_, 'OK', output={'fastq': {'file': 'reads.fq'}})
+                           for id_ in ids]
+                return {'count': len(results), 'results': results}
+
+            self.filters.append(filters)
+            statuses = self.statuses.pop(0)
+            results = [{'id': id_, 'status': statuses[id_]} for id_ in ids if id_ in statuses]
+            return {'count': len(results), 'results': results}
+
+        self.resolwe.data.api.get.side_effect = get
+
+    @staticmethod
+    def payload(id_, status, **fields):
+        payload = copy.deepcopy(DATA_SAMPLE[0])
+        payload.update(id=id_, status=status, **fields)
+        return payload
+
+    def data_list(self):
+        return [Data(resolwe=self.resolwe, **self.payload(id_, 'PR')) for id_ in [1, 2, 3]]
+
+    @patch('resdk.resolwe.time')
+    def test_wait(self, time_mock):
+        time_mock.time.return_value = 0
+        data_list = self.data_list()
+
+        finished = list(Resolwe.wait(self.resolwe, data_list, poll=1, max_poll=3))
+
+        self.assertEqual([data.id for data in finished], [2, 3, 1])
+        for data in data_list:
+            self.assertEqual(data.status, 'OK')
+            self.assertEqual(data.output, {'fastq': {'file': 'reads.fq'}})
+            self.assertIsInstance(data.process_output_schema, list)
+            # Refreshed object can be changed and saved
+            data.name = 'New name'
+            data.save()
+        # finished objects are refreshed with a single request per check
+        self.assertEqual(self.refreshed, [[2, 3], [1]])
+        self.assertEqual(self.filters[0]['id__in'], ['1,2,3'])
+        self.assertEqual(self.filters[0]['fields'], 'status,id')
+        self.assertEqual(self.filters[3]['id__in'], ['1'])
+        # backoff is reset when an object is finished
+        self.assertEqual([args[0][0] for args in time_mock.sleep.call_args_list], [2, 3, 1])
+
+    @patch('resdk.resolwe.time')
+    def test_timeout(self, time_mock):
+        time_mock.time.side_effect = [0, 1, 3, 6]
+        data_list = self.data_list()
+
+        finished = list(Resolwe.wait(self.resolwe, data_list, timeout=5, poll=1))
+
+        self.assertEqual(finished, [data_list[1], data_list[2]])
+        self.assertEqual(data_list[0].status, 'PR')
+        self.assertEqual([args[0][0] for args in time_mock.sleep.call_args_list], [2, 2])
+        self.assertEqual(self.resolwe.logger.warning.call_count, 1)
+
+    @patch('resdk.resolwe.time')
+    def test_deleted(self, time_mock):
+        time_mock.time.return_value = 0
+        self.statuses = [
+            {1: 'PR', 3: 'PR'},
+            {3: 'OK'},
+        ]
+        data_list = self.data_list()
+
+        finished = list(Resolwe.wait(self.resolwe, data_list, poll=1))
+
+        self.assertEqual(finished, [data_list[2]])
+        self.assertEqual(self.filters[1]['id__in'], ['1,3'])
+        self.assertEqual(self.resolwe.logger.warning.call_count, 2)
+
+
 class TestVersionConverters(unittest.TestCase):
 
     def test_version_string_to_tuple(self):
@@ -449,6 +615,8 @@ class TestRun(unittest.TestCase):
             **{'_get_process.return_value': MagicMock(spec=Process, slug='some:prc:slug:'),
                '_process_inputs.return_value': {}}
         )
+        resolwe_mock._data_payload.side_effect = (
+            lambda *args: Resolwe._data_payload(resolwe_mock, *args))
         resolwe_mock.collection = MagicMock()
         resolwe_mock.api = MagicMock(**{'process.get.return_value': self.process_mock,
                                         'data.post.return_value': {}})
@@ -484,58 +652,135 @@ class TestRun(unittest.TestCase):
         self.assertEqual(data, "Data object")
 
 
-class TestUploadFile(unittest.TestCase):
+class TestRunMany(unittest.TestCase):
 
     def setUp(self):
-        self.file_path = os.path.join(BASE_DIR, 'files', 'example.fastq')
-        self.config = {'url': 'http://some/url', 'auth': MagicMock(), 'logger': MagicMock()}
-
-    @patch('resdk.resolwe.requests')
-    @patch('resdk.resolwe.Resolwe', spec=True)
-    def test_always_ok(self, resolwe_mock, requests_mock):
-        resolwe_mock.configure_mock(**self.config)
-        # Immitate response form server - always status 200:
-        requests_response = {'files': [{'temp': 'fake_name'}]}
-        requests_mock.post.return_value = MagicMock(status_code=200,
-                                                    **{'json.return_value': requests_response})
+        self.resolwe = MagicMock(spec=Resolwe, identity_map=None)
+        self.resolwe.api = MagicMock()
+        self.resolwe._get_process.side_effect = lambda slug: MagicMock(spec=Process, slug=slug)
+        self.resolwe._process_inputs.side_effect = lambda inputs, process: inputs
+        self.resolwe._data_payload.side_effect = (
+            lambda *args, **kwargs: Resolwe._data_payload(self.resolwe, *args, **kwargs))
+
+        def post(data):
+            if data['input'].get('fail'):
+                raise ValueError('Invalid input')
+            return {'id': data['input']['id']}
+
+        self.resolwe.api.data.post.side_effect = post
+        self.resolwe.api.data.get_or_create.post.side_effect = post
+
+    def test_run_many(self):
+        sample1 = MagicMock(id=1)
+        sample2 = MagicMock(id=2)
+        specs = [
+            {'slug': 'alignment', 'input': {'id': 1}, 'sample': sample1},
+            {'slug': 'alignment', 'input': {'id': 2}, 'sample': sample2},
+            {'slug': 'macs', 'input': {'id': 3}, 'sample': sample1, 'collections': [5]},
+            {'slug': 'macs', 'input': {'id': 4, 'fail': True}, 'sample': sample2},
+            {'slug': 'macs', 'input': {'id': 5}, 'descriptor': {'a': 1}},
+        ]
 
-        response = Resolwe._upload_file(resolwe_mock, self.file_path)
+        progress = MagicMock()
+        results = Resolwe.run_many(self.resolwe, specs, max_workers=3, progress=progress)
 
-        self.assertEqual(response, 'fake_name')
+        self.assertEqual(len(results), 5)
+        self.assertEqual([data.id for data in results[:3]], [1, 2, 3])
+        self.assertIsInstance(results[3], ValueError)
+        self.assertIsInstance(results[4], ValueError)
 
-    @patch('resdk.resolwe.requests')
-    @patch('resdk.resolwe.Resolwe', spec=True)
-    def test_always_bad(self, resolwe_mock, requests_mock):
-        resolwe_mock.configure_mock(**self.config)
-        # Immitate response form server - always status 400
-        requests_mock.post.return_value = MagicMock(status_code=400)
+        # Each process is fetched once
+        self.assertEqual(self.resolwe._get_process.call_count, 2)
+        self.assertEqual(self.resolwe.api.data.post.call_count, 4)
+        self.assertIn(
+            {'process': 'macs', 'input': {'id': 3}, 'collections': [5]},
+            [args[0] for args, _ in self.resolwe.api.data.post.call_args_list],
+        )
+        # Data objects are added to samples with one request per sample
+        sample1.add_data.assert_called_once_with(results[0], results[2])
+        sample2.add_data.assert_called_once_with(results[1])
+        # Progress is reported for each spec
+        self.assertEqual(progress.call_count, 5)
+        self.assertIn(((specs[3], results[3]),), progress.call_args_list)
+        # Specs are not changed
+        self.assertEqual(specs[0], {'slug': 'alignment', 'input': {'id': 1}, 'sample': sample1})
+
+    def test_get_or_run(self):
+        results = Resolwe.run_many(self.resolwe, [{'slug': 'alignment', 'input': {'id': 1}}],
+                                   get_or_run=True)
+
+        self.assertEqual(results[0].id, 1)
+        self.assertEqual(self.resolwe.api.data.get_or_create.post.call_count, 1)
+        self.assertEqual(self.resolwe.api.data.post.call_count, 0)
+
+    def test_no_input(self):
+        self.resolwe.api.data.post.side_effect = lambda data: {'id': 7}
+
+        results = Resolwe.run_many(self.resolwe, [{'slug': 'upload-genome'}])
+
+        self.assertEqual(results[0].id, 7)
+        self.resolwe.api.data.post.assert_called_once_with(
+            {'process': 'upload-genome', 'input': {}})
+
+    def test_errors(self):
+        self.resolwe._get_process.side_effect = LookupError('Process not found')
+        sample = MagicMock(id=1, **{'add_data.side_effect': ValueError('Add failed')})
+
+        results = Resolwe.run_many(self.resolwe, [
+            {'slug': 'missing', 'input': {'id': 1}},
+            {'slug': 'missing', 'input': {'id': 2}},
+        ])
+        self.assertIsInstance(results[0], LookupError)
+        self.assertIs(results[0], results[1])
+        self.assertEqual(self.resolwe._get_process.call_count, 1)
+
+        self.resolwe._get_process.side_effect = lambda slug: MagicMock(spec=Process, slug=slug)
+        results = Resolwe.run_many(self.resolwe, [
+            {'slug': 'alignment', 'input': {'id': 1}, 'sample': sample},
+            {'slug': 'alignment', 'input': {'id': 2}, 'sample': sample},
+        ])
+        self.assertEqual([str(error) for error in results], ['Add failed', 'Add failed'])
+        self.assertEqual(sample.add_data.call_count, 1)
 
-        response = Resolwe._upload_file(resolwe_mock, self.file_path)
 
-        self.assertIsNone(response)
-        self.assertEqual(resolwe_mock.logger.warning.call_count, 4)
+class TestUploadFile(unittest.TestCase):
 
-    @patch('resdk.resolwe.requests')
+    @patch('resdk.resolwe.Uploader')
     @patch('resdk.resolwe.Resolwe', spec=True)
-    def test_one_bad_other_ok(self, resolwe_mock, requests_mock):
-        resolwe_mock.configure_mock(**self.config)
-        requests_response = {'files': [{'temp': 'fake_name'}]}
-        response_ok = MagicMock(status_code=200, **{'json.return_value': requests_response})
-        response_fails = MagicMock(status_code=400)
-        # Immitate response form server - one status 400, but other 200:
-        requests_mock.post.side_effect = [response_fails, response_ok, response_ok]
+    def test_upload(self, resolwe_mock, uploader_mock):
+        uploader_mock.return_value.upload.return_value = 'fake_name'
+        resolwe_mock.pool_size = 7
 
-        response = Resolwe._upload_file(resolwe_mock, self.file_path)
+        response = Resolwe._upload_file(resolwe_mock, '/some/file.fq', max_inflight=3)
 
         self.assertEqual(response, 'fake_name')
-        self.assertEqual(resolwe_mock.logger.warning.call_count, 1)
+        uploader_mock.assert_called_once_with(
+            resolwe_mock, max_inflight=3, journal=resolwe_mock.upload_journal, pool_size=7)
+        uploader_mock.return_value.upload.assert_called_once_with('/some/file.fq')
+
+    @patch('resdk.resolwe.UploadJournal')
+    @patch('resdk.resolwe.Resolwe', spec=True)
+    def test_upload_journal(self, resolwe_mock, journal_mock):
+        resolwe_mock._upload_journal = None
+        resolwe_mock._upload_journal_lock = threading.Lock()
+
+        journal = Resolwe.upload_journal.fget(resolwe_mock)
+        self.assertEqual(journal, journal_mock.return_value)
+        self.assertEqual(Resolwe.upload_journal.fget(resolwe_mock), journal)
+        self.assertEqual(journal_mock.call_count, 1)
 
 
 class TestDownload(unittest.TestCase):
 
     def setUp(self):
         self.file_list = ['/the/first/file.txt', '/the/second/file.py']
-        self.config = {'url': 'http://some/url', 'auth': MagicMock(), 'logger': MagicMock()}
+        self.config = {
+            'url': 'http://some/url',
+            'auth': MagicMock(),
+            'logger': MagicMock(),
+            'session': MagicMock(),
+            'pool_size': 7,
+        }
 
     @patch('resdk.resolwe.os')
     @patch('resdk.resolwe.Resolwe', spec=True)
@@ -545,7 +790,7 @@ class TestDownload(unittest.TestCase):
 
         message = "Download directory does not exist: .*"
         with six.assertRaisesRegex(self, ValueError, message):
-            Resolwe._download_files(resolwe_mock, self.file_list)
+            Resolwe._get_download_dir(resolwe_mock, '/bad/dir')
 
     @patch('resdk.resolwe.os')
     @patch('resdk.resolwe.Resolwe', spec=True)
@@ -556,43 +801,34 @@ class TestDownload(unittest.TestCase):
 
         resolwe_mock.logger.info.assert_called_once_with("No files to download.")
 
-    @patch('resdk.resolwe.open')
+    @patch('resdk.resolwe.Downloader')
     @patch('resdk.resolwe.os')
-    @patch('resdk.resolwe.requests')
     @patch('resdk.resolwe.Resolwe', spec=True)
-    def test_bad_response(self, resolwe_mock, requests_mock, os_mock, open_mock):
+    def test_download(self, resolwe_mock, os_mock, downloader_mock):
         resolwe_mock.configure_mock(**self.config)
-        os_mock.path.isfile.return_value = True
-        mock_open.return_value = MagicMock(spec=io.IOBase)
+        resolwe_mock._get_download_dir = lambda download_dir: download_dir
 
-        response = {'raise_for_status.side_effect': Exception("abc")}
-        requests_mock.get.return_value = MagicMock(ok=False, **response)
+        progress = MagicMock()
+        Resolwe._download_files(resolwe_mock, self.file_list, '/download/dir', max_workers=3,
+                                progress=progress)
 
-        with six.assertRaisesRegex(self, Exception, "abc"):
-            Resolwe._download_files(resolwe_mock, self.file_list[:1])
-        self.assertEqual(resolwe_mock.logger.info.call_count, 2)
+        downloader_mock.assert_called_once_with(
+            resolwe_mock, '/download/dir', max_workers=3, progress=progress, pool_size=7)
+        downloader_mock.return_value.download.assert_called_once_with(self.file_list)
 
-    @patch('resdk.resolwe.open')
-    @patch('resdk.resolwe.os')
-    @patch('resdk.resolwe.requests')
+    @patch('resdk.resolwe.Downloader')
     @patch('resdk.resolwe.Resolwe', spec=True)
-    def test_good_response(self, resolwe_mock, requests_mock, os_mock, open_mock):
+    def test_download_data(self, resolwe_mock, downloader_mock):
         resolwe_mock.configure_mock(**self.config)
-        os_mock.path.isfile.return_value = True
-
-        # When mocking open one wants it to return a "file-like" mock: (spec=io.IOBase)
-        mock_open.return_value = MagicMock(spec=io.IOBase)
-
-        requests_mock.get.return_value = MagicMock(ok=True,
-                                                   **{'iter_content.return_value': range(3)})
+        resolwe_mock._get_download_dir = lambda download_dir: download_dir
+        data = [MagicMock(), MagicMock()]
 
-        Resolwe._download_files(resolwe_mock, self.file_list)
-        self.assertEqual(resolwe_mock.logger.info.call_count, 3)
+        Resolwe._download_data(resolwe_mock, data, 'file.txt', None, '/download/dir')
 
-        # This asserts may seem wierd. To check what is happening behind the scenes:
-        # print(open_mock.mock_calls)
-        self.assertEqual(open_mock.return_value.__enter__.return_value.write.call_count, 6)
-        # Why 6? 2 files in self.file_list, each downloads 3 chunks (defined in response mock)
+        downloader_mock.assert_called_once_with(
+            resolwe_mock, '/download/dir', max_workers=1, progress=None, pool_size=7)
+        downloader_mock.return_value.download_data.assert_called_once_with(
+            data, 'file.txt', None)
 
 
 class TestResAuth(unittest.TestCase):
@@ -602,46 +838,50 @@ class TestResAuth(unittest.TestCase):
         auth_mock.configure_mock(sessionid=None, csrftoken=None)
         self.auth_mock = auth_mock
 
-    @patch('resdk.resolwe.requests')
-    def test_bad_url(self, requests_mock):
-        requests_mock.post = MagicMock(side_effect=[requests.exceptions.ConnectionError()])
+    def test_bad_url(self):
+        session = MagicMock()
+        session.post = MagicMock(side_effect=[requests.exceptions.ConnectionError()])
 
         with six.assertRaisesRegex(self, ValueError,
                                    'Server not accessible on www.abc.com. Wrong url?'):
-            ResAuth.__init__(self.auth_mock, username='usr', password='pwd', url='www.abc.com')
+            ResAuth.__init__(self.auth_mock, username='usr', password='pwd', url='www.abc.com',
+                             session=session)
 
-    @patch('resdk.resolwe.requests')
-    def test_bad_credentials(self, requests_mock):
-        requests_mock.post = MagicMock(return_value=MagicMock(status_code=400))
+    def test_bad_credentials(self):
+        session = MagicMock()
+        session.post = MagicMock(return_value=MagicMock(status_code=400))
 
         message = r'Response HTTP status code .* Invalid credentials?'
         with six.assertRaisesRegex(self, ValueError, message):
-            ResAuth.__init__(self.auth_mock, username='usr', password='pwd', url='www.abc.com')
+            ResAuth.__init__(self.auth_mock, username='usr', password='pwd', url='www.abc.com',
+                             session=session)
 
-    @patch('resdk.resolwe.requests')
-    def test_no_csrf_token(self, requests_mock):
+    def test_no_csrf_token(self):
         post_mock = MagicMock(status_code=200, cookies={'sessionid': 42})
-        requests_mock.post = MagicMock(return_value=post_mock)
+        session = MagicMock()
+        session.post = MagicMock(return_value=post_mock)
 
         message = 'Missing sessionid or csrftoken. Invalid credentials?'
         with six.assertRaisesRegex(self, Exception, message):
-            ResAuth.__init__(self.auth_mock, username='usr', password='pwd', url='www.abc.com')
+            ResAuth.__init__(self.auth_mock, username='usr', password='pwd', url='www.abc.com',
+                             session=session)
 
-    @patch('resdk.resolwe.requests')
-    def test_all_ok(self, requests_mock):
+    def test_all_ok(self):
         post_mock = MagicMock(status_code=200, cookies={'sessionid': 42, 'csrftoken': 43})
-        requests_mock.post = MagicMock(return_value=post_mock)
+        session = MagicMock()
+        session.post = MagicMock(return_value=post_mock)
 
-        ResAuth.__init__(self.auth_mock, username='usr', password='pwd', url='www.abc.com')
+        ResAuth.__init__(self.auth_mock, username='usr', password='pwd', url='www.abc.com',
+                             session=session)
         self.assertEqual(self.auth_mock.sessionid, 42)
         self.assertEqual(self.auth_mock.csrftoken, 43)
 
-    @patch('resdk.resolwe.requests')
-    def test_public_user(self, requests_mock):
+    def test_public_user(self):
         post_mock = MagicMock(status_code=200)
-        requests_mock.post = MagicMock(return_value=post_mock)
+        session = MagicMock()
+        session.post = MagicMock(return_value=post_mock)
 
-        ResAuth.__init__(self.auth_mock, url='www.abc.com')
+        ResAuth.__init__(self.auth_mock, url='www.abc.com', session=session)
         self.assertEqual(self.auth_mock.sessionid, None)
         self.assertEqual(self.auth_mock.csrftoken, None)
 
@@ -0,0 +1,460 @@
+"""
+Unit tests for resdk/transfer.py file.
+"""
+# pylint: disable=missing-docstring, protected-access
+
+import base64
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+
+import six
+from mock import MagicMock, patch
+
+from resdk.constants import POOL_SIZE
+from resdk.transfer import Downloader, MultipartChunk, Uploader, UploadJournal, upload_chunk_size
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+
+def md5_base64(content):
+    return base64.b64encode(hashlib.md5(content).digest()).decode('ascii')
+
+
+def response_mock(chunks, ok=True, status_code=200, headers=None):
+    if headers is None:
+        headers = {'Content-Length': str(sum(len(c) for c in chunks))}
+    return MagicMock(ok=ok, status_code=status_code, headers=headers,
+                     **{'iter_content.return_value': chunks})
+
+
+class TestDownloader(unittest.TestCase):
+
+    def setUp(self):
+        self.download_dir = tempfile.mkdtemp()
+        self.resolwe = MagicMock(url='http://some/url/')
+        self.resolwe.session.head.return_value = MagicMock(ok=False)
+
+    def tearDown(self):
+        shutil.rmtree(self.download_dir)
+
+    def read(self, *path):
+        with open(os.path.join(self.download_dir, *path), 'rb') as handle:
+            return handle.read()
+
+    def test_download(self):
+        self.resolwe.session.get.side_effect = [
+            response_mock([b'ab', b'c']),
+            response_mock([b'def']),
+        ]
+
+        progress = MagicMock()
+        downloader = Downloader(self.resolwe, self.download_dir, progress=progress)
+        downloader.download(['1/file.txt', '2/subdir/other.txt'])
+
+        self.assertEqual(self.read('file.txt'), b'abc')
+        self.assertEqual(self.read('subdir', 'other.txt'), b'def')
+        self.resolwe.session.get.assert_any_call(
+            'http://some/url/data/1/file.txt', stream=True,
+            headers={'Accept-Encoding': 'identity'})
+        self.assertEqual(downloader.downloaded_files, 2)
+        self.assertEqual(downloader.downloaded_bytes, 6)
+        self.assertEqual(downloader.progress['1/file.txt'], (3, 3))
+        self.assertEqual(
+            [call[0] for call in progress.call_args_list if call[0][0] == '1/file.txt'],
+            [('1/file.txt', 0, 3), ('1/file.txt', 2, 3), ('1/file.txt', 3, 3)])
+
+    def test_max_workers(self):
+        self.assertEqual(Downloader(self.resolwe, self.download_dir, 0).max_workers, 1)
+        self.assertEqual(Downloader(self.resolwe, self.download_dir, 100).max_workers, POOL_SIZE)
+        self.assertEqual(
+            Downloader(self.resolwe, self.download_dir, 8, pool_size=3).max_workers, 3)
+        self.assertEqual(Uploader(self.resolwe, max_inflight=8, pool_size=3).max_inflight, 3)
+
+    def test_download_parallel(self):
+        files = ['{}/file{}.txt'.format(i, i) for i in range(10)]
+        self.resolwe.session.get.side_effect = lambda url, **kwargs: response_mock(
+            [url[-9:].encode('utf-8')])
+
+        downloader = Downloader(self.resolwe, self.download_dir, max_workers=4)
+        downloader.download(files)
+
+        self.assertEqual(downloader.downloaded_files, 10)
+        self.assertEqual(self.read('file7.txt'), b'file7.txt')
+
+    def test_bad_response(self):
+        response = response_mock([], ok=False)
+        response.raise_for_status.side_effect = Exception("abc")
+        self.resolwe.session.get.return_value = response
+
+        downloader = Downloader(self.resolwe, self.download_dir, max_workers=2)
+        with six.assertRaisesRegex(self, Exception, "abc"):
+            downloader.download(['1/file.txt'])
+
+        self.assertFalse(os.path.exists(os.path.join(self.download_dir, 'file.txt')))
+
+    def write(self, content, *path):
+        with open(os.path.join(self.download_dir, *path), 'wb') as handle:
+            handle.write(content)
+
+    def test_resume(self):
+        self.write(b'abc', 'file.txt.part')
+        self.resolwe.session.get.return_value = response_mock(
+            [b'def'], status_code=206, headers={'Content-Range': 'bytes 3-5/6'})
+
+        downloader = Downloader(self.resolwe, self.download_dir)
+        downloader.download(['1/file.txt'])
+
+        self.resolwe.session.get.assert_called_once_with(
+            'http://some/url/data/1/file.txt', stream=True,
+            headers={'Accept-Encoding': 'identity', 'Range': 'bytes=3-'})
+        self.assertEqual(self.read('file.txt'), b'abcdef')
+        self.assertFalse(os.path.exists(os.path.join(self.download_dir, 'file.txt.part')))
+        self.assertEqual(downloader.downloaded_bytes, 3)
+
+    def test_resume_not_supported(self):
+        self.write(b'abc', 'file.txt.part')
+        self.resolwe.session.get.return_value = response_mock([b'ABCDEF'])
+
+        Downloader(self.resolwe, self.download_dir).download(['1/file.txt'])
+
+        self.assertEqual(self.read('file.txt'), b'ABCDEF')
+
+    def test_incomplete(self):
+        self.resolwe.session.get.return_value = response_mock(
+            [b'abc'], headers={'Content-Length': '6'})
+
+        with six.assertRaisesRegex(self, IOError, "incomplete"):
+            Downloader(self.resolwe, self.download_dir).download(['1/file.txt'])
+
+        self.assertEqual(self.read('file.txt.part'), b'abc')
+        self.assertFalse(os.path.exists(os.path.join(self.download_dir, 'file.txt')))
+
+    def test_encoded_content(self):
+        # Server ignores Accept-Encoding, content is decoded by requests
+        self.resolwe.session.get.return_value = response_mock(
+            [b'abcdef'], headers={'Content-Length': '3', 'Content-Encoding': 'gzip'})
+
+        Downloader(self.resolwe, self.download_dir).download(['1/file.txt'])
+
+        self.assertEqual(self.read('file.txt'), b'abcdef')
+        self.assertFalse(os.path.exists(os.path.join(self.download_dir, 'file.txt.part')))
+
+        # Size of encoded content cannot be compared to the local file
+        self.resolwe.session.head.return_value = MagicMock(
+            ok=True, headers={'Content-Length': '6', 'Content-Encoding': 'gzip'})
+        self.resolwe.session.get.reset_mock()
+        Downloader(self.resolwe, self.download_dir).download(['1/file.txt'])
+        self.assertEqual(self.resolwe.session.get.call_count, 1)
+        self.resolwe.session.head.assert_called_with(
+            'http://some/url/data/1/file.txt', allow_redirects=True,
+            headers={'Accept-Encoding': 'identity'})
+
+    def test_resume_encoded_content(self):
+        self.write(b'abc', 'file.txt.part')
+        self.resolwe.session.get.side_effect = [
+            response_mock([b'xyz'], status_code=206,
+                          headers={'Content-Range': 'bytes 3-5/6', 'Content-Encoding': 'gzip'}),
+            response_mock([b'abcdef'], headers={'Content-Encoding': 'gzip'}),
+        ]
+
+        Downloader(self.resolwe, self.download_dir).download(['1/file.txt'])
+
+        self.assertEqual(self.read('file.txt'), b'abcdef')
+        self.resolwe.session.get.assert_called_with(
+            'http://some/url/data/1/file.txt', stream=True,
+            headers={'Accept-Encoding': 'identity'})
+
+    def test_checksum(self):
+        self.resolwe.session.get.return_value = response_mock(
+            [b'abc'], headers={'Content-MD5': md5_base64(b'xyz')})
+
+        with six.assertRaisesRegex(self, IOError, "Checksum"):
+            Downloader(self.resolwe, self.download_dir).download(['1/file.txt'])
+
+        self.resolwe.session.get.return_value = response_mock(
+            [b'abc'], headers={'Content-MD5': md5_base64(b'abc')})
+        Downloader(self.resolwe, self.download_dir).download(['1/file.txt'])
+        self.assertEqual(self.read('file.txt'), b'abc')
+
+    def test_skip_downloaded(self):
+        self.write(b'abc', 'file.txt')
+        self.resolwe.session.head.return_value = MagicMock(
+            ok=True, headers={'Content-Length': '3', 'Content-MD5': md5_base64(b'abc')})
+
+        downloader = Downloader(self.resolwe, self.download_dir)
+        downloader.download(['1/file.txt'])
+
+        self.assertEqual(self.resolwe.session.get.call_count, 0)
+        self.assertEqual(downloader.skipped_files, 1)
+
+        # Local file differs from the one on the server
+        self.resolwe.session.head.return_value = MagicMock(
+            ok=True, headers={'Content-Length': '3', 'Content-MD5': md5_base64(b'xyz')})
+        self.resolwe.session.get.return_value = response_mock([b'xyz'])
+
+        downloader.download(['1/file.txt'])
+
+        self.assertEqual(self.read('file.txt'), b'xyz')
+
+    def test_download_data(self):
+        data1 = MagicMock(id=1, **{'files.return_value': ['reads.fq']})
+        data2 = MagicMock(id=2, **{'files.return_value': ['out.exp', 'dir/out.txt']})
+        self.resolwe.session.get.side_effect = lambda url, **kwargs: response_mock([b'x'])
+
+        for max_workers in [1, 3]:
+            downloader = Downloader(self.resolwe, self.download_dir, max_workers=max_workers)
+            downloader.download_data([data1, data2], field_name='output.exp')
+
+            data2.files.assert_called_with(None, 'output.exp')
+            self.assertEqual(downloader.downloaded_files, 3)
+            self.assertEqual(self.read('dir', 'out.txt'), b'x')
+
+    def test_download_data_connections(self):
+        lock = threading.Lock()
+        active = [0, 0]  # current and maximal number of concurrent requests
+
+        def request(result):
+            def call(*args, **kwargs):
+                with lock:
+                    active[0] += 1
+                    active[1] = max(active)
+                time.sleep(0.01)
+                with lock:
+                    active[0] -= 1
+                return result() if callable(result) else result
+            return call
+
+        data_objects = [
+            MagicMock(id=i, **{'files.side_effect': request(['file{}.txt'.format(i)])})
+            for i in range(8)
+        ]
+        self.resolwe.session.get.side_effect = request(lambda: response_mock([b'x']))
+
+        downloader = Downloader(self.resolwe, self.download_dir, max_workers=3)
+        downloader.download_data(data_objects)
+
+        self.assertEqual(downloader.downloaded_files, 8)
+        # Listing and downloading share the limit
+        self.assertLessEqual(active[1], 3)
+
+
+class TestUploader(unittest.TestCase):
+
+    def setUp(self):
+        self.file_path = os.path.join(BASE_DIR, 'files', 'example.fastq')
+        self.resolwe = MagicMock(url='http://some/url')
+        self.response_ok = MagicMock(
+            status_code=200, **{'json.return_value': {'files': [{'temp': 'fake_name'}]}})
+
+    def test_always_ok(self):
+        # Immitate response form server - always status 200:
+        self.resolwe.session.post.return_value = self.response_ok
+
+        response = Uploader(self.resolwe).upload(self.file_path)
+
+        self.assertEqual(response, 'fake_name')
+
+    @patch('resdk.transfer.logging')
+    def test_always_bad(self, logging_mock):
+        # Immitate response form server - always status 400
+        self.resolwe.session.post.return_value = MagicMock(status_code=400)
+
+        response = Uploader(self.resolwe).upload(self.file_path)
+
+        self.assertIsNone(response)
+        self.assertEqual(logging_mock.getLogger.return_value.warning.call_count, 4)
+
+    @patch('resdk.transfer.logging')
+    def test_one_bad_other_ok(self, logging_mock):
+        response_fails = MagicMock(status_code=400)
+        # Immitate response form server - one status 400, but other 200:
+        self.resolwe.session.post.side_effect = [response_fails, self.response_ok]
+
+        response = Uploader(self.resolwe).upload(self.file_path)
+
+        self.assertEqual(response, 'fake_name')
+        self.assertEqual(logging_mock.getLogger.return_value.warning.call_count, 1)
+
+    def test_chunks(self):
+        file_size = os.path.getsize(self.file_path)
+        self.resolwe.session.post.return_value = self.response_ok
+
+        for max_inflight in [1, 3]:
+            self.resolwe.reset_mock()
+            uploader = Uploader(self.resolwe, max_inflight=max_inflight, chunk_size=100)
+            response = uploader.upload(self.file_path)
+
+            self.assertEqual(response, 'fake_name')
+            self.assertEqual(uploader.uploaded_bytes, file_size)
+
+            calls = self.resolwe.session.post.call_args_list
+            chunk_numbers = [call[1]['data'].fields['_chunkNumber'] for call in calls]
+            self.assertEqual(sorted(chunk_numbers), list(range(len(calls))))
+            self.assertEqual(len(calls), (file_size + 99) // 100)
+            # The last chunk is uploaded last
+            self.assertEqual(chunk_numbers[-1], len(calls) - 1)
+            self.assertEqual(len(set(call[1]['headers']['X-File-Uid'] for call in calls)), 1)
+
+    def test_failed_chunk(self):
+        self.resolwe.session.post.return_value = MagicMock(status_code=500)
+
+        response = Uploader(self.resolwe, max_inflight=3, chunk_size=100).upload(self.file_path)
+
+        self.assertIsNone(response)
+
+    def test_multipart_chunk(self):
+        content = bytearray(b'0123456789' * 10)
+        body = MultipartChunk({'_chunkNumber': 3}, 'file.txt', memoryview(content)[10:30])
+
+        self.assertTrue(body.content_type.startswith('multipart/form-data; boundary='))
+        blocks = []
+        block = body.read(7)
+        while block:
+            blocks.append(block)
+            block = body.read(7)
+        payload = b''.join(blocks)
+        body.close()
+
+        self.assertEqual(len(payload), len(body))
+        self.assertIn(b'name="_chunkNumber"\r\n\r\n3\r\n', payload)
+        self.assertIn(b'filename="file.txt"', payload)
+        self.assertIn(b'\r\n\r\n' + b'0123456789' * 2 + b'\r\n--', payload)
+
+    def test_journal(self):
+        journal_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, journal_dir)
+        journal = UploadJournal(os.path.join(journal_dir, 'uploads', 'journal.json'))
+        file_size = os.path.getsize(self.file_path)
+        chunks_count = (file_size + 99) // 100
+
+        # Interrupt upload after 3 chunks
+        self.resolwe.session.post.side_effect = [self.response_ok] * 3 + [Exception("Killed")]
+        uploader = Uploader(self.resolwe, max_inflight=1, chunk_size=100, journal=journal)
+        with six.assertRaisesRegex(self, Exception, "Killed"):
+            uploader.upload(self.file_path)
+
+        entry = journal.get('http://some/url', self.file_path)
+        self.assertEqual(entry['chunks'], [0, 1, 2])
+        first_calls = self.resolwe.session.post.call_args_list
+
+        self.resolwe.reset_mock()
+        self.resolwe.session.post.side_effect = None
+        self.resolwe.session.post.return_value = self.response_ok
+        uploader = Uploader(self.resolwe, max_inflight=3, chunk_size=100, journal=journal)
+        self.assertEqual(uploader.upload(self.file_path), 'fake_name')
+
+        calls = self.resolwe.session.post.call_args_list
+        chunk_numbers = [call[1]['data'].fields['_chunkNumber'] for call in calls]
+        self.assertEqual(sorted(chunk_numbers), list(range(3, chunks_count)))
+        self.assertEqual(calls[0][1]['headers']['X-File-Uid'],
+                         first_calls[0][1]['headers']['X-File-Uid'])
+        self.assertEqual(uploader.uploaded_bytes, file_size)
+        # Finished upload is removed from the journal
+        self.assertIsNone(journal.get('http://some/url', self.file_path))
+
+    def test_journal_changed_file(self):
+        journal_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, journal_dir)
+        journal = UploadJournal(os.path.join(journal_dir, 'journal.json'))
+        file_path = os.path.join(journal_dir, 'example.fastq')
+        shutil.copy(self.file_path, file_path)
+
+        journal.start('http://some/url', file_path, 'session', 'uid', 100)
+        journal.acknowledge('http://some/url', file_path, 0)
+        self.assertEqual(journal.get('http://some/url', file_path)['chunks'], [0])
+        # Other server
+        self.assertIsNone(journal.get('http://other/url', file_path))
+        # Different chunk size
+        self.assertIsNone(journal.get('http://some/url', file_path, 200))
+        self.assertIsNone(journal.get('http://some/url', file_path))
+
+        # Modified file
+        journal.start('http://some/url', file_path, 'session', 'uid', 100)
+        stat = os.stat(file_path)
+        os.utime(file_path, (stat.st_atime, stat.st_mtime + 10))
+        self.assertIsNone(journal.get('http://some/url', file_path))
+
+    def test_journal_claim(self):
+        journal_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, journal_dir)
+        journal = UploadJournal(os.path.join(journal_dir, 'journal.json'))
+        url = 'http://some/url'
+
+        entry = journal.start(url, self.file_path, 'session', 'uid', 100, owner='first')
+        self.assertEqual(entry['owner'], 'first')
+        # Entry claimed by the first upload is not shared or replaced
+        self.assertIsNone(journal.get(url, self.file_path, owner='second'))
+        self.assertIsNone(journal.start(url, self.file_path, 'other', 'other', 100, 'second'))
+        journal.acknowledge(url, self.file_path, 0, owner='second')
+        journal.acknowledge(url, self.file_path, 1, owner='first')
+        self.assertEqual(journal.get(url, self.file_path)['chunks'], [1])
+
+        # Released entry is claimed by the next upload
+        journal.release(url, self.file_path, 'first')
+        entry = journal.get(url, self.file_path, owner='second')
+        self.assertEqual((entry['session_id'], entry['owner']), ('session', 'second'))
+        self.assertIsNone(journal.get(url, self.file_path, owner='first'))
+
+        # Claim expires
+        journal.claim_timeout = 0
+        self.assertEqual(journal.get(url, self.file_path, owner='first')['owner'], 'first')
+        journal.remove(url, self.file_path, 'first')
+        self.assertIsNone(journal.get(url, self.file_path))
+
+    def test_journal_expired(self):
+        journal_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, journal_dir)
+        journal = UploadJournal(os.path.join(journal_dir, 'journal.json'), max_age=3600)
+        url = 'http://some/url'
+        file_path = os.path.join(journal_dir, 'example.fastq')
+        shutil.copy(self.file_path, file_path)
+
+        journal.start(url, self.file_path, 'session', 'uid', 100)
+        journal.start(url, file_path, 'other', 'other', 100)
+        self.assertEqual(journal.get(url, self.file_path)['session_id'], 'session')
+
+        # Upload of the first file was started two hours ago
+        with patch('resdk.transfer.time.time', return_value=time.time() + 7200):
+            journal.start(url, file_path, 'new', 'new', 100)
+            self.assertIsNone(journal.get(url, self.file_path))
+            self.assertEqual(journal.get(url, file_path)['session_id'], 'new')
+
+        # Expired entries are removed from the journal file
+        self.assertEqual(list(journal._load()), [journal._key(url, file_path)])
+
+    def test_concurrent_uploads(self):
+        journal_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, journal_dir)
+        journal = UploadJournal(os.path.join(journal_dir, 'journal.json'))
+
+        # The same file is uploaded while the first upload is in progress
+        def post(*args, **kwargs):
+            if not post.nested:
+                post.nested = True
+                self.assertEqual(Uploader(self.resolwe, journal=journal).upload(self.file_path),
+                                 'fake_name')
+            return self.response_ok
+        post.nested = False
+        self.resolwe.session.post.side_effect = post
+
+        uploader = Uploader(self.resolwe, max_inflight=1, chunk_size=100, journal=journal)
+        self.assertEqual(uploader.upload(self.file_path), 'fake_name')
+
+        session_ids = {call[1]['headers']['Session-Id']
+                       for call in self.resolwe.session.post.call_args_list}
+        self.assertEqual(len(session_ids), 2)
+        self.assertIsNone(journal.get('http://some/url', self.file_path))
+
+    def test_chunk_size(self):
+        self.assertEqual(upload_chunk_size(0), 8000000)
+        self.assertEqual(upload_chunk_size(30 * 10 ** 9), 30000000)
+        self.assertEqual(upload_chunk_size(10 ** 12), 64000000)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -8,11 +8,12 @@ import unittest
 import six
 from mock import MagicMock, call, patch
 
+from resdk.query import ResolweQuery
 from resdk.resources import Collection, Data, Process, Relation, Sample
 from resdk.resources.utils import (
     _print_input_line, endswith_colon, fill_spaces, find_field, get_collection_id, get_data_id,
     get_process_id, get_relation_id, get_resolwe, get_resource_collection, get_sample_id,
-    get_samples, iterate_fields, iterate_schema,
+    get_samples, is_background, iterate_fields, iterate_schema,
 )
 
 PROCESS_OUTPUT_SCHEMA = [
@@ -211,6 +212,14 @@ class TestUtils(unittest.TestCase):
         collection_2._samples = ['sample_2']
         self.assertEqual(get_samples([collection_1, collection_2]), ['sample_1', 'sample_2'])
 
+        # data and collections of samples are prefetched only if requested
+        collection._samples = ResolweQuery(MagicMock(), Sample)
+        self.assertEqual(get_samples(collection), collection._samples)
+        self.assertEqual(get_samples(collection, prefetch=True)._prefetch,
+                         ('data', 'collections'))
+        collection._samples._cache = ['sample_1']
+        self.assertEqual(get_samples(collection, prefetch=True), collection._samples)
+
         data = Data(id=1, resolwe=MagicMock())
         data._sample = 'sample_1'
         self.assertEqual(get_samples(data), ['sample_1'])
@@ -276,6 +285,18 @@ class TestUtils(unittest.TestCase):
         with self.assertRaises(TypeError):
             get_resolwe(relation, sample)
 
+    def test_is_background(self):
+        sample = Sample(id=1, resolwe=MagicMock())
+        sample.resolwe.relation.filter.return_value.exists.return_value = True
+        self.assertTrue(is_background(sample))
+        sample.resolwe.relation.filter.assert_called_once_with(
+            type='compare', label='background', entity=1, position='background')
+
+        relation_index = MagicMock(**{'is_background.return_value': False})
+        self.assertFalse(is_background(sample, relation_index))
+        relation_index.is_background.assert_called_once_with(sample)
+        self.assertEqual(sample.resolwe.relation.filter.call_count, 1)
+
 
 if __name__ == '__main__':
     unittest.main()
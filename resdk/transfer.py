@@ -0,0 +1,878 @@
+""".. Ignore pydocstyle D400.
+
+========
+Transfer
+========
+
+Transfer files between the Resolwe server and the local file system.
+
+.. autoclass:: resdk.transfer.Downloader
+   :members:
+
+.. autoclass:: resdk.transfer.Uploader
+   :members:
+
+.. autoclass:: resdk.transfer.MultipartChunk
+   :members:
+
+.. autoclass:: resdk.transfer.UploadJournal
+   :members:
+
+"""
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import base64
+import hashlib
+import json
+import logging
+import math
+import mmap
+import os
+import threading
+import time
+import uuid
+from multiprocessing.pool import ThreadPool
+
+import appdirs
+from six.moves.urllib.parse import urljoin  # pylint: disable=wrong-import-order
+
+from . import __about__ as about
+from .constants import (
+    CHUNK_SIZE, POOL_SIZE, UPLOAD_CLAIM_TIMEOUT, UPLOAD_INFLIGHT_CHUNKS, UPLOAD_JOURNAL_MAX_AGE,
+    UPLOAD_MAX_CHUNK_SIZE, UPLOAD_MIN_CHUNK_SIZE, UPLOAD_TARGET_CHUNKS,
+)
+
+
+def md5_checksum(file_path):
+    """Return base64 encoded MD5 checksum of the file.
+
+    This is the format of the ``Content-MD5`` HTTP header.
+
+    """
+    md5 = hashlib.md5()
+    with open(file_path, 'rb') as file_handle:
+        for chunk in iter(lambda: file_handle.read(CHUNK_SIZE), b''):
+            md5.update(chunk)
+
+    return base64.b64encode(md5.digest()).decode('ascii')
+
+
+def upload_chunk_size(file_size):
+    """Return size of chunks in which the file of given size is uploaded.
+
+    Small files are uploaded in chunks of ``UPLOAD_MIN_CHUNK_SIZE``
+    bytes. Chunks of larger files are increased to keep their number
+    close to ``UPLOAD_TARGET_CHUNKS``, up to ``UPLOAD_MAX_CHUNK_SIZE``.
+
+    """
+    chunk_size = int(math.ceil(file_size / UPLOAD_TARGET_CHUNKS))
+    return min(UPLOAD_MAX_CHUNK_SIZE, max(UPLOAD_MIN_CHUNK_SIZE, chunk_size))
+
+
+def replace_file(src, dst):
+    """Atomically rename ``src`` to ``dst``, overwriting ``dst`` if it exists."""
+    if hasattr(os, 'replace'):
+        os.replace(src, dst)  # pylint: disable=no-member
+    else:
+        # Python 2 can only overwrite the destination on POSIX systems
+        if os.name == 'nt' and os.path.exists(dst):
+            os.remove(dst)
+        os.rename(src, dst)
+
+
+class Downloader(object):
+    """Download files from the Resolwe server.
+
+    Files are downloaded by a pool of ``max_workers`` threads, which
+    share the HTTP session of the given Resolwe instance. With the
+    default of a single worker, files are downloaded one after another.
+    Number of workers is limited to ``pool_size``, the number of
+    connections kept alive by the session.
+
+    :param resolwe: Resolwe instance
+    :type resolwe: Resolwe object
+    :param str download_dir: download directory
+    :param int max_workers: number of files downloaded concurrently
+    :param progress: function called with the file URI, the number of
+        its downloaded bytes and its total size (``None`` if unknown)
+        whenever a part of the file is downloaded
+    :param int pool_size: number of connections kept alive by the
+        session of the Resolwe instance
+
+    """
+
+    #: files are requested without content encoding, so their size can
+    #: be checked and interrupted downloads resumed
+    request_headers = {'Accept-Encoding': 'identity'}
+
+    def __init__(self, resolwe, download_dir, max_workers=1, progress=None,
+                 pool_size=POOL_SIZE):
+        """Initialize attributes."""
+        self.resolwe = resolwe
+        self.download_dir = download_dir
+        self.max_workers = max(1, min(max_workers, pool_size))
+        self.progress_callback = progress
+
+        #: progress of each file, ``{file_uri: (downloaded bytes, total bytes)}``
+        self.progress = {}
+        #: number of downloaded files
+        self.downloaded_files = 0
+        #: number of downloaded bytes
+        self.downloaded_bytes = 0
+        #: number of files skipped because they were already downloaded
+        self.skipped_files = 0
+
+        self._lock = threading.Lock()
+        self._start_time = None
+
+        self.logger = logging.getLogger(__name__)
+
+    def _update_progress(self, file_uri, size, total=None):
+        """Add ``size`` bytes to the progress of the file."""
+        with self._lock:
+            downloaded, _ = self.progress.get(file_uri, (0, None))
+            self.progress[file_uri] = (downloaded + size, total)
+            self.downloaded_bytes += size
+
+        if self.progress_callback is not None:
+            self.progress_callback(file_uri, downloaded + size, total)
+
+    def _get_local_path(self, file_uri):
+        """Return local path of the file and create its directory."""
+        file_name = os.path.basename(file_uri)
+        file_path = os.path.dirname(file_uri)
+
+        # Remove data id from path
+        file_path = file_path.split('/', 1)[1] if '/' in file_path else ''
+        full_path = os.path.join(self.download_dir, file_path)
+        if not os.path.isdir(full_path):
+            try:
+                os.makedirs(full_path)
+            except OSError:
+                # Directory could be created by another worker meanwhile
+                if not os.path.isdir(full_path):
+                    raise
+
+        return os.path.join(file_path, file_name)
+
+    @staticmethod
+    def _is_encoded(response):
+        """Return ``True`` if content of the response is encoded (i.e. compressed)."""
+        return response.headers.get('Content-Encoding', 'identity').lower() != 'identity'
+
+    def _is_downloaded(self, file_url, local_file):
+        """Check if local file matches the file on the server.
+
+        Size of the local file is compared to the size reported by the
+        server. If the server also reports MD5 checksum of the file,
+        checksums are compared as well.
+
+        """
+        response = self.resolwe.session.head(
+            file_url, allow_redirects=True, headers=self.request_headers)
+        if not response.ok or self._is_encoded(response):
+            return False
+
+        size = response.headers.get('Content-Length')
+        if size is None or int(size) != os.path.getsize(local_file):
+            return False
+
+        checksum = response.headers.get('Content-MD5')
+        if checksum is not None and checksum != md5_checksum(local_file):
+            return False
+
+        return True
+
+    def _download_file(self, file_uri):
+        """Download a single file.
+
+        File is downloaded to a temporary ``.part`` file, which is
+        renamed when the download is complete. If the ``.part`` file
+        already exists, the download is resumed from its end. Files
+        that were already downloaded are skipped.
+
+        """
+        local_path = self._get_local_path(file_uri)
+        local_file = os.path.join(self.download_dir, local_path)
+        part_file = '{}.part'.format(local_file)
+        file_url = urljoin(self.resolwe.url, 'data/{}'.format(file_uri))
+
+        if os.path.isfile(local_file) and self._is_downloaded(file_url, local_file):
+            self.logger.info("* %s (already downloaded)", local_path)
+            with self._lock:
+                self.skipped_files += 1
+            return
+
+        self.logger.info("* %s", local_path)
+
+        offset = os.path.getsize(part_file) if os.path.isfile(part_file) else 0
+        headers = dict(self.request_headers)
+        if offset:
+            headers['Range'] = 'bytes={}-'.format(offset)
+        response = self.resolwe.session.get(file_url, stream=True, headers=headers)
+
+        encoded_range = response.status_code == 206 and self._is_encoded(response)
+        if offset and (response.status_code == 416 or encoded_range):
+            # Partial file is not valid anymore or the range is of encoded
+            # content, download the whole file
+            response.close()
+            offset = 0
+            response = self.resolwe.session.get(
+                file_url, stream=True, headers=self.request_headers)
+
+        try:
+            if not response.ok:
+                response.raise_for_status()
+
+            if response.status_code == 206:
+                # Content-Range header is in form 'bytes <start>-<end>/<total>'
+                total = response.headers.get('Content-Range', '').rpartition('/')[2]
+                total = int(total) if total.isdigit() else None
+            else:
+                # Server ignored the Range header and returned the whole file
+                offset = 0
+                total = response.headers.get('Content-Length')
+                total = int(total) if total is not None else None
+
+            if self._is_encoded(response):
+                # Server ignored the Accept-Encoding header, content is
+                # decoded, so its size does not match Content-Length
+                total = None
+
+            with self._lock:
+                self.progress[file_uri] = (offset, total)
+            if self.progress_callback is not None:
+                self.progress_callback(file_uri, offset, total)
+
+            with open(part_file, 'ab' if offset else 'wb') as file_handle:
+                for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                    file_handle.write(chunk)
+                    self._update_progress(file_uri, len(chunk), total)
+
+            checksum = None
+            if response.status_code != 206:
+                checksum = response.headers.get('Content-MD5')
+        finally:
+            response.close()
+
+        if total is not None and os.path.getsize(part_file) != total:
+            raise IOError("Download of {} is incomplete, run download again to resume it.".format(
+                local_path))
+
+        if checksum is not None and checksum != md5_checksum(part_file):
+            os.remove(part_file)
+            raise IOError("Checksum of downloaded file {} does not match.".format(local_path))
+
+        replace_file(part_file, local_file)
+
+        with self._lock:
+            self.downloaded_files += 1
+
+    def _log_throughput(self):
+        """Log aggregated download statistics."""
+        elapsed = time.time() - self._start_time
+        megabytes = self.downloaded_bytes / 1e6
+        self.logger.info(
+            "Downloaded %s file(s), %.1f MB in %.1f s (%.1f MB/s), skipped %s file(s)",
+            self.downloaded_files, megabytes, elapsed, megabytes / elapsed if elapsed else 0,
+            self.skipped_files
+        )
+
+    def download(self, files):
+        """Download files.
+
+        :param files: files to download
+        :type files: list of file URI
+
+        """
+        self._start_time = time.time()
+
+        if self.max_workers == 1:
+            for file_uri in files:
+                self._download_file(file_uri)
+        else:
+            pool = ThreadPool(self.max_workers)
+            try:
+                # Iterate over results to re-raise errors from workers
+                for _ in pool.imap_unordered(self._download_file, files):
+                    pass
+            finally:
+                pool.terminate()
+                pool.join()
+
+        self._log_throughput()
+
+    def download_data(self, data_objects, file_name=None, field_name=None):
+        """Download files of given data objects.
+
+        Listing files of data objects is overlapped with downloading
+        files of the data objects that were already listed. Together,
+        at most ``max_workers`` files are listed or downloaded at once.
+
+        :param data_objects: data objects whose files are downloaded
+        :type data_objects: list of Data objects
+        :param str file_name: download only files with given name
+        :param str field_name: download only files in given output field
+
+        """
+        # Listing and downloading share connections of the session
+        connections = threading.BoundedSemaphore(self.max_workers)
+
+        def list_files(data):
+            """Return list of file URIs of the data object."""
+            with connections:
+                file_names = data.files(file_name, field_name)
+            return ['{}/{}'.format(data.id, fname) for fname in file_names]
+
+        def download_file(file_uri):
+            """Download the file."""
+            with connections:
+                self._download_file(file_uri)
+
+        if self.max_workers == 1:
+            self.download(
+                file_uri for data in data_objects for file_uri in list_files(data)
+            )
+            return
+
+        self._start_time = time.time()
+        # Fetch data objects before handing them to the pool
+        data_objects = list(data_objects)
+
+        list_pool = ThreadPool(self.max_workers)
+        download_pool = ThreadPool(self.max_workers)
+        try:
+            pending = []
+            for data_files in list_pool.imap(list_files, data_objects):
+                pending.extend(
+                    download_pool.apply_async(download_file, (file_uri,))
+                    for file_uri in data_files
+                )
+
+            for result in pending:
+                result.get()
+        finally:
+            for pool in (list_pool, download_pool):
+                pool.terminate()
+                pool.join()
+
+        self._log_throughput()
+
+
+class MultipartChunk(object):
+    """Streaming ``multipart/form-data`` body of an uploaded chunk.
+
+    The body consists of form ``fields`` and a file part with the
+    ``content`` of the chunk. The content is not copied into the body,
+    it is read from the given buffer (for example a slice of a
+    memory-mapped file) in small blocks while the request is sent.
+
+    :param dict fields: form fields
+    :param str file_name: name of the uploaded file
+    :param content: content of the chunk
+    :type content: bytes-like object
+
+    """
+
+    def __init__(self, fields, file_name, content):
+        """Initialize attributes."""
+        self.fields = fields
+        boundary = uuid.uuid4().hex
+        #: value of the ``Content-Type`` header of the request
+        self.content_type = 'multipart/form-data; boundary={}'.format(boundary)
+
+        head = [
+            '--{}\r\nContent-Disposition: form-data; name="{}"\r\n\r\n{}\r\n'.format(
+                boundary, name, value)
+            for name, value in sorted(fields.items())
+        ]
+        head.append(
+            '--{}\r\nContent-Disposition: form-data; name="file"; filename="{}"\r\n'
+            'Content-Type: application/octet-stream\r\n\r\n'.format(boundary, file_name)
+        )
+        tail = '\r\n--{}--\r\n'.format(boundary)
+
+        self._parts = [
+            ''.join(head).encode('utf-8'),
+            memoryview(content) if not isinstance(content, bytes) else content,
+            tail.encode('utf-8'),
+        ]
+        self._length = sum(len(part) for part in self._parts)
+        self._part = 0
+        self._offset = 0
+
+    def __len__(self):
+        """Return length of the body."""
+        return self._length
+
+    def read(self, size=-1):
+        """Read at most ``size`` bytes of the body."""
+        if size is None or size < 0:
+            size = self._length
+
+        blocks = []
+        while size > 0 and self._part < len(self._parts):
+            part = self._parts[self._part]
+            block = part[self._offset:self._offset + size]
+            blocks.append(block)
+            size -= len(block)
+            self._offset += len(block)
+            if self._offset >= len(part):
+                self._part += 1
+                self._offset = 0
+
+        return b''.join(blocks)
+
+    def close(self):
+        """Release the buffer with content of the chunk."""
+        content = self._parts[1]
+        if hasattr(content, 'release'):
+            content.release()
+
+
+def memory_map(file_):
+    """Return read-only memory map of the file and its memory view.
+
+    Memory view is used to slice the file without copying it. Empty
+    files cannot be mapped, so empty bytes are returned instead.
+
+    """
+    if os.fstat(file_.fileno()).st_size == 0:
+        return b'', memoryview(b'')
+
+    mapped = mmap.mmap(file_.fileno(), 0, access=mmap.ACCESS_READ)
+    if hasattr(mapped, 'madvise') and hasattr(mmap, 'MADV_SEQUENTIAL'):
+        mapped.madvise(mmap.MADV_SEQUENTIAL)  # pylint: disable=no-member
+
+    try:
+        return mapped, memoryview(mapped)
+    except TypeError:
+        # Memory map does not support memory views in Python 2, so
+        # slices of it are copied.
+        return mapped, mapped
+
+
+class UploadJournal(object):
+    """Local journal of unfinished uploads.
+
+    For each file that is being uploaded the journal stores its size
+    and modification time, the upload session and the numbers of chunks
+    that were accepted by the server. When upload of the same, unchanged
+    file is repeated (possibly by another process), these chunks are not
+    uploaded again.
+
+    Each entry is claimed by the upload that is in progress (its
+    ``owner``), so concurrent uploads of the same file do not share the
+    upload session. The claim is refreshed with every accepted chunk and
+    it expires after ``claim_timeout`` seconds, so uploads of a killed
+    process can be continued.
+
+    Entries of uploads started more than ``max_age`` seconds ago are
+    removed, as their upload sessions may have expired on the server.
+
+    Journal is stored as a JSON file, by default in user's data
+    directory. It is rewritten atomically on every change.
+
+    :param str path: path of the journal file
+    :param float claim_timeout: time in seconds after which an
+        unrefreshed claim of an entry expires
+    :param float max_age: time in seconds after the start of an upload
+        after which its entry is removed
+
+    """
+
+    def __init__(self, path=None, claim_timeout=UPLOAD_CLAIM_TIMEOUT,
+                 max_age=UPLOAD_JOURNAL_MAX_AGE):
+        """Initialize attributes."""
+        if path is None:
+            path = os.path.join(
+                appdirs.user_data_dir(about.__title__, about.__author__), 'uploads.json'
+            )
+        self.path = path
+        self.claim_timeout = claim_timeout
+        self.max_age = max_age
+
+        self._lock = threading.Lock()
+        self.logger = logging.getLogger(__name__)
+
+    def _load(self):
+        """Return all entries of the journal."""
+        try:
+            with open(self.path) as handle:
+                return json.load(handle)
+        except (IOError, OSError, ValueError):
+            return {}
+
+    def _save(self, entries):
+        """Write all entries of the journal."""
+        directory = os.path.dirname(self.path)
+        try:
+            os.makedirs(directory)
+        except OSError:
+            if not os.path.isdir(directory):
+                raise
+
+        temp_path = '{}.{}.tmp'.format(self.path, uuid.uuid4().hex)
+        with open(temp_path, 'w') as handle:
+            json.dump(entries, handle)
+        replace_file(temp_path, self.path)
+
+    @staticmethod
+    def _key(url, file_path):
+        """Return key of the file uploaded to the given server."""
+        return '{} {}'.format(url, os.path.abspath(file_path))
+
+    def _is_claimed(self, entry, owner):
+        """Return ``True`` if the entry is claimed by another upload."""
+        return (
+            entry.get('owner') not in (None, owner)
+            and time.time() - entry.get('claimed', 0) < self.claim_timeout
+        )
+
+    def _remove_expired(self, entries):
+        """Remove entries of uploads started more than ``max_age`` seconds ago.
+
+        :return: ``True`` if any entry was removed
+
+        """
+        now = time.time()
+        expired = [key for key, entry in entries.items()
+                   if now - entry.get('started', 0) > self.max_age]
+        for key in expired:
+            del entries[key]
+        return bool(expired)
+
+    def get(self, url, file_path, chunk_size=None, owner=None):
+        """Return journal entry of unfinished upload of the file.
+
+        Entry is returned only if the file has not changed since the
+        upload started and it was uploaded in chunks of the given size
+        (if it is given), otherwise it is removed from the journal.
+        Expired entries (see ``max_age``) are removed as well.
+
+        If ``owner`` is given, the entry is claimed by it. Entry that is
+        claimed by another upload in progress is not returned.
+
+        :param str url: url of the Resolwe server
+        :param str file_path: path of the uploaded file
+        :param int chunk_size: size of chunks
+        :param str owner: identifier of the upload that claims the entry
+
+        :return: journal entry or ``None``
+        :rtype: dict
+
+        """
+        key = self._key(url, file_path)
+        stat = os.stat(file_path)
+        with self._lock:
+            entries = self._load()
+            if self._remove_expired(entries):
+                self._save(entries)
+
+            entry = entries.get(key)
+            if entry is None:
+                return None
+
+            if owner is not None and self._is_claimed(entry, owner):
+                self.logger.info("File %s is already being uploaded.", file_path)
+                return None
+
+            if (entry['size'] == stat.st_size and entry['mtime'] == stat.st_mtime
+                    and chunk_size in (None, entry['chunk_size'])):
+                if owner is not None:
+                    entry.update(owner=owner, claimed=time.time())
+                    self._save(entries)
+                return entry
+
+            del entries[key]
+            self._save(entries)
+
+        self.logger.info("File %s has changed, upload will start from the beginning.", file_path)
+        return None
+
+    def start(self, url, file_path, session_id, file_uid, chunk_size, owner=None):
+        """Record a new upload of the file.
+
+        Entry claimed by another upload in progress is not replaced.
+
+        :return: journal entry or ``None`` if the file is already being
+            uploaded
+        :rtype: dict
+
+        """
+        key = self._key(url, file_path)
+        stat = os.stat(file_path)
+        now = time.time()
+        entry = {
+            'size': stat.st_size,
+            'mtime': stat.st_mtime,
+            'session_id': session_id,
+            'file_uid': file_uid,
+            'chunk_size': chunk_size,
+            'chunks': [],
+            'owner': owner,
+            'claimed': now,
+            'started': now,
+        }
+        with self._lock:
+            entries = self._load()
+            if key in entries and self._is_claimed(entries[key], owner):
+                return None
+
+            entries[key] = entry
+            self._save(entries)
+
+        return entry
+
+    def acknowledge(self, url, file_path, chunk_number, owner=None):
+        """Record that the chunk was accepted by the server.
+
+        Chunks are recorded only if the entry is (still) claimed by the
+        given owner and the claim is refreshed.
+
+        """
+        key = self._key(url, file_path)
+        with self._lock:
+            entries = self._load()
+            entry = entries.get(key)
+            if entry is None or entry.get('owner') != owner:
+                return
+
+            if chunk_number not in entry['chunks']:
+                entry['chunks'].append(chunk_number)
+            entry['claimed'] = time.time()
+            self._save(entries)
+
+    def release(self, url, file_path, owner):
+        """Release the claim of the entry of the interrupted upload."""
+        key = self._key(url, file_path)
+        with self._lock:
+            entries = self._load()
+            entry = entries.get(key)
+            if entry is not None and entry.get('owner') == owner:
+                entry['owner'] = None
+                self._save(entries)
+
+    def remove(self, url, file_path, owner=None):
+        """Remove entry of the finished upload of the file."""
+        key = self._key(url, file_path)
+        with self._lock:
+            entries = self._load()
+            entry = entries.get(key)
+            if entry is not None and entry.get('owner') == owner:
+                del entries[key]
+                self._save(entries)
+
+
+class Uploader(object):
+    """Upload files to the Resolwe server.
+
+    File is uploaded in chunks and up to ``max_inflight`` chunks are
+    uploaded concurrently over the HTTP session of the given Resolwe
+    instance. The last chunk is uploaded only after all other chunks
+    were accepted by the server.
+
+    If ``journal`` is given, accepted chunks are recorded in it and
+    interrupted upload of the file is continued where it stopped.
+
+    Chunks are not read into memory. The file is memory-mapped and
+    each chunk is streamed from the mapping while it is sent, so memory
+    usage does not depend on the chunk size.
+
+    :param resolwe: Resolwe instance
+    :type resolwe: Resolwe object
+    :param int max_inflight: number of chunks uploaded concurrently
+    :param int chunk_size: size of chunks in bytes, by default it is
+        determined from the size of the file
+    :param journal: journal of unfinished uploads
+    :type journal: UploadJournal
+    :param int pool_size: number of connections kept alive by the
+        session of the Resolwe instance, ``max_inflight`` is limited to it
+
+    """
+
+    #: number of attempts to upload a chunk
+    retries = 5
+
+    def __init__(self, resolwe, max_inflight=UPLOAD_INFLIGHT_CHUNKS, chunk_size=None,
+                 journal=None, pool_size=POOL_SIZE):
+        """Initialize attributes."""
+        self.resolwe = resolwe
+        self.max_inflight = max(1, min(max_inflight, pool_size))
+        self.chunk_size = chunk_size
+        self.journal = journal
+
+        #: number of uploaded bytes of the current file
+        self.uploaded_bytes = 0
+
+        self._lock = threading.Lock()
+        self.logger = logging.getLogger(__name__)
+
+    def _post_chunk(self, upload, chunk_number, chunk):
+        """Upload a single chunk.
+
+        :return: response of the server or ``None`` if upload failed
+            in all attempts
+
+        """
+        # stuff in fields will be in response.POST on server
+        fields = {
+            '_chunkSize': upload['chunk_size'],
+            '_totalSize': upload['file_size'],
+            '_chunkNumber': chunk_number,
+            '_currentChunkSize': len(chunk),
+        }
+
+        response = None
+        for i in range(self.retries):
+            if i > 0 and response is not None:
+                self.logger.warning(
+                    "Chunk upload failed (error %s): repeating for chunk number %s",
+                    response.status_code,
+                    chunk_number)
+
+            body = MultipartChunk(fields, upload['base_name'], chunk)
+            try:
+                response = self.resolwe.session.post(
+                    urljoin(self.resolwe.url, 'upload/'),
+                    data=body,
+                    headers={
+                        'Content-Type': body.content_type,
+                        'Session-Id': upload['session_id'],
+                        'X-File-Uid': upload['file_uid']}
+                )
+            finally:
+                body.close()
+
+            if response.status_code in [200, 201]:
+                break
+        else:
+            # Upload of a chunk failed (all retries)
+            return None
+
+        if upload['journaled']:
+            self.journal.acknowledge(
+                self.resolwe.url, upload['file_path'], chunk_number, upload['owner'])
+
+        with self._lock:
+            self.uploaded_bytes += len(chunk)
+            progress = 100. * self.uploaded_bytes / upload['file_size']
+
+        self.logger.info("%.0f %% Uploaded %s", progress, upload['file_path'])
+        return response
+
+    def _post_chunks(self, upload, content, chunk_numbers):
+        """Upload chunks concurrently.
+
+        :return: ``True`` if all chunks were uploaded and ``False``
+            otherwise
+
+        """
+        failed = threading.Event()
+        chunk_size = upload['chunk_size']
+
+        def post_chunk(chunk_number):
+            """Upload chunk unless upload of another chunk failed."""
+            if failed.is_set():
+                return
+
+            start = chunk_number * chunk_size
+            if self._post_chunk(upload, chunk_number, content[start:start + chunk_size]) is None:
+                failed.set()
+
+        if self.max_inflight == 1:
+            for chunk_number in chunk_numbers:
+                post_chunk(chunk_number)
+        else:
+            pool = ThreadPool(self.max_inflight)
+            try:
+                for _ in pool.imap_unordered(post_chunk, chunk_numbers):
+                    pass
+            finally:
+                pool.terminate()
+                pool.join()
+
+        return not failed.is_set()
+
+    def upload(self, file_path):
+        """Upload a single file.
+
+        :param str file_path: File path
+
+        :return: name of the uploaded file on the server or ``None``
+            if upload failed
+
+        """
+        file_size = os.path.getsize(file_path)
+        # Identifier of this upload, it claims the entry in the journal
+        owner = uuid.uuid4().hex
+
+        entry = None
+        if self.journal is not None:
+            entry = self.journal.get(self.resolwe.url, file_path, self.chunk_size, owner)
+
+        if entry is not None:
+            chunk_size = entry['chunk_size']
+            session_id = entry['session_id']
+            file_uid = entry['file_uid']
+        else:
+            chunk_size = self.chunk_size or upload_chunk_size(file_size)
+            session_id = str(uuid.uuid4())
+            file_uid = str(uuid.uuid4())
+            if self.journal is not None:
+                entry = self.journal.start(
+                    self.resolwe.url, file_path, session_id, file_uid, chunk_size, owner)
+
+        chunks_count = max(1, int(math.ceil(file_size / chunk_size)))
+        done_chunks = set(entry['chunks']) if entry is not None else set()
+        chunk_numbers = [
+            number for number in range(chunks_count - 1) if number not in done_chunks
+        ]
+
+        upload = {
+            'file_path': file_path,
+            'base_name': os.path.basename(file_path),
+            'file_size': file_size,
+            'chunk_size': chunk_size,
+            'session_id': session_id,
+            'file_uid': file_uid,
+            'owner': owner,
+            # Uploads of the file that is already being uploaded are not journaled
+            'journaled': entry is not None,
+        }
+        self.uploaded_bytes = (chunks_count - 1 - len(chunk_numbers)) * chunk_size
+        if self.uploaded_bytes:
+            self.logger.info(
+                "Resuming upload of %s from %s bytes.", file_path, self.uploaded_bytes)
+
+        response = None
+        try:
+            with open(file_path, 'rb') as file_:
+                mapped, content = memory_map(file_)
+                try:
+                    if self._post_chunks(upload, content, chunk_numbers):
+                        start = (chunks_count - 1) * chunk_size
+                        response = self._post_chunk(
+                            upload, chunks_count - 1, content[start:start + chunk_size])
+                finally:
+                    if hasattr(content, 'release'):
+                        content.release()
+                    if isinstance(mapped, mmap.mmap):
+                        try:
+                            mapped.close()
+                        except BufferError:
+                            # Slices of the mapping are still referenced
+                            # (by a traceback), it is closed when they are
+                            # garbage collected.
+                            pass
+        finally:
+            if upload['journaled'] and response is None:
+                self.journal.release(self.resolwe.url, file_path, owner)
+
+        if response is None:
+            return None
+
+        if upload['journaled']:
+            self.journal.remove(self.resolwe.url, file_path, owner)
+
+        return response.json()['files'][0]['temp']
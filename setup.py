@@ -41,7 +41,7 @@ setup(
 
     zip_safe=False,
     install_requires=(
-        'requests>=2.6.0',
+        'requests>=2.12.0',
         'slumber>=0.7.1',
         'appdirs>=1.4.0',
         'six>=1.10.0',
@@ -50,7 +50,11 @@ setup(
         'openpyxl>=2.5.3',
     ),
     extras_require={
+        'async': [
+            'aiohttp>=3.0; python_version >= "3.5.3"',
+        ],
         'docs': [
+            'aiohttp>=3.0; python_version >= "3.5.3"',
             'sphinx>=1.4.1',
             'sphinx_rtd_theme>=0.1.9',
         ],
@@ -58,6 +62,9 @@ setup(
             'twine',
             'wheel',
         ],
+        'pandas': [
+            'pandas',
+        ],
         'test': [
             'check-manifest',
             'isort',